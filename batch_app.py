@@ -0,0 +1,138 @@
+# batch_app.py
+import os
+
+from main_app import MainApp
+
+# Nombre por defecto del lote (prefijo del dataset compartido de la Fase 2)
+NOMBRE_LOTE = "lote"
+
+
+def read_targets_file(filename: str) -> list[str]:
+    """Cuentas objetivo de un archivo de texto: una por línea; se ignoran '#' y las líneas vacías."""
+    with open(filename, encoding='utf-8') as file:
+        lines = (line.split('#', 1)[0].strip().lstrip('@') for line in file)
+        return [line for line in lines if line]
+
+
+class BatchApp(MainApp):
+    """
+    Varias cuentas objetivo en un solo lote.
+
+    La Fase 1 descarga la lista de seguidos de cada cuenta; la Fase 2 carga una sola vez cada
+    username de la unión de todas las listas (un dataset compartido del lote) y después reparte
+    los registros en el archivo de datos de cada cuenta; la Fase 3 analiza y grafica cada cuenta
+    en paralelo (ver report_renderer.py) con un resumen HTML del lote.
+    """
+
+    def __init__(self, username, password, targets, limit, batch_name=NOMBRE_LOTE, **kwargs):
+        self.targets = list(dict.fromkeys(targets))
+        if not self.targets:
+            raise ValueError("El lote no tiene cuentas objetivo.")
+        super().__init__(username, password, batch_name, limit, **kwargs)
+        # Dataset compartido: no usa el sufijo _profile_data para no confundirse con una cuenta
+        self.output_data_file = self._output_path(f"{batch_name}_batch_profiles{self.data_extension}")
+        self.report_xlsx_file = self._output_path(f"{batch_name}_batch_profiles.xlsx")
+        print(f"📦 Lote '{batch_name}' con {len(self.targets)} cuentas: {', '.join(self.targets)}")
+
+    def _following_lists(self) -> dict[str, str]:
+        return {target: self._target_files(target)[0] for target in self.targets}
+
+    def _download_following(self, downloader, on_usernames=None):
+        """Descarga la lista de cada cuenta del lote; al reanudar se reutilizan las ya descargadas."""
+        from profile_scraper import ProfileScraper
+
+        for i, (target, csv_file) in enumerate(self._following_lists().items(), start=1):
+            if downloader.stop_requested.is_set():
+                break
+            print(f"\n--- 📦 Cuenta {i}/{len(self.targets)}: {target} ---")
+            if self.resume and os.path.exists(csv_file):
+                print(f"⏩ La lista de seguidos de {target} ya existe ('{csv_file}'); no se vuelve a descargar.")
+                if on_usernames:
+                    on_usernames(ProfileScraper(None).read_usernames_from_csv(csv_file))
+                continue
+            try:
+                downloader.download_and_save_followers(target, self.limit, csv_file, on_usernames=on_usernames)
+            except Exception as e:
+                # Una cuenta que falla no detiene al resto del lote
+                print(f"Error en la Fase 1 de {target}: {e}")
+
+    def _read_following(self) -> list[str] | None:
+        lists = self._target_usernames()
+        if not lists:
+            return None
+        for target in self.targets:
+            if target not in lists:
+                print(f"⚠️ No hay lista de seguidos de {target}; se omite del lote.")
+
+        usernames = list(dict.fromkeys(u for names in lists.values() for u in names))
+        total = sum(len(names) for names in lists.values())
+        saved = total - len(usernames)
+        print(f"📦 {total} seguidos en {len(lists)} listas, {len(usernames)} perfiles únicos: "
+              f"{saved} cargas evitadas ({100 * saved / total if total else 0:.0f}%).")
+        self.metrics.count('usernames_lote', total, tipo='total')
+        self.metrics.count('usernames_lote', len(usernames), tipo='unicos')
+        return usernames
+
+    def _target_usernames(self) -> dict[str, list[str]]:
+        """Usernames de la lista de seguidos de cada cuenta (solo las que tienen CSV)."""
+        from profile_scraper import ProfileScraper
+
+        reader = ProfileScraper(None)
+        return {target: reader.read_usernames_from_csv(csv_file)
+                for target, csv_file in self._following_lists().items() if os.path.exists(csv_file)}
+
+    def _split_batch_dataset(self) -> dict[str, str]:
+        """Reparte el dataset compartido en el archivo de datos de cada cuenta; devuelve cuenta -> archivo."""
+        from storage import open_store
+
+        store = open_store(self.output_data_file)
+        if not store.exists():
+            print(f"⚠️ No existe el dataset del lote '{self.output_data_file}'.")
+            return {}
+
+        lists = {target: list(set(names)) for target, names in self._target_usernames().items()}
+        frames = {target: [] for target in lists}
+        for chunk in store.iter_chunks():
+            for target, names in lists.items():
+                part = chunk[chunk['username'].isin(names)]
+                if len(part):
+                    frames[target].append(part)
+
+        outputs = {}
+        for target, parts in frames.items():
+            if not parts:
+                print(f"⚠️ {target}: ningún perfil de su lista está en el dataset del lote.")
+                continue
+            data_file = self._target_files(target)[1]
+            open_store(data_file).write_frames(parts)
+            outputs[target] = data_file
+            print(f"🗂️ {target}: {sum(len(part) for part in parts)} perfiles en '{data_file}'.")
+        return outputs
+
+    def _export_report(self):
+        """Tras la Fase 2: datos de cada cuenta a partir del dataset compartido (y sus XLSX)."""
+        from storage import export_xlsx, open_store
+
+        for target, data_file in self._split_batch_dataset().items():
+            if self.export_xlsx and self.output_format != 'xlsx':
+                export_xlsx(open_store(data_file), self._target_files(target)[2])
+
+    def _run_phase_3_analyze(self):
+        """FASE 3 del lote: análisis de Benford y gráfico de cada cuenta, en paralelo, con resumen HTML."""
+        from report_renderer import render_reports
+
+        targets = [(target, self._target_files(target)[1]) for target in self.targets]
+        available = [(target, data_file) for target, data_file in targets if os.path.exists(data_file)]
+        if not available:
+            print("\nNecesitas ejecutar la Fase 2 primero. No hay datos de ninguna cuenta del lote.")
+            return
+
+        print("\n--- Fase 3 del lote: Análisis de Benford y Gráficos por Cuenta ---")
+        summaries = render_reports(available, self.output_dir, chunksize=self.chunksize,
+                                   incremental=self.incremental)
+        for summary in summaries:
+            if summary['error'] or not summary.get('n'):
+                continue
+            verdict = "✅ Conforme" if summary['conforme'] else "⚠️ No conforme"
+            print(f"   {summary['objetivo']:<30} n={summary['n']:<7} MAD={summary['mad']:.4f} "
+                  f"({summary['conformidad']}) {verdict}")
@@ -0,0 +1,176 @@
+# benchmarks/run_benchmarks.py
+# Benchmarks de la Fase 3 y de los formatos de almacenamiento con datos sintéticos.
+#
+#   python benchmarks/run_benchmarks.py --filas 10000 100000 1000000 --salida base.json
+#   python benchmarks/run_benchmarks.py --comparar base.json   (sale con código 1 si hay regresiones)
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from benford import benford_report
+from count_parser import parse_counts
+from data_analyzer import DataAnalyzer
+from digit_stats import DigitAccumulator
+from report_renderer import render_benford_chart
+from storage import FORMAT_EXTENSIONS, open_store, typed_profiles
+from synthetic import generate_profiles
+
+FILAS_POR_DEFECTO = (10_000, 100_000, 1_000_000)
+FORMATOS = tuple(FORMAT_EXTENSIONS)
+# openpyxl tarda minutos por encima de este tamaño: el XLSX es solo un formato de reporte
+MAX_FILAS_XLSX = 100_000
+# Ratio de tiempo (actual / referencia) a partir del cual un caso cuenta como regresión
+UMBRAL_REGRESION = 1.25
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(function, repeat: int = 3, memory: bool = True) -> dict:
+    """Mejor tiempo de `repeat` ejecuciones y, en una ejecución aparte, el pico de memoria (tracemalloc)."""
+    times = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                function()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return {'segundos': min(times), 'segundos_repeticiones': times, 'memoria_pico_mb': peak_mb}
+
+
+def _cases(frame: pd.DataFrame, workdir: str, formats):
+    """(caso, formato, función) de todos los benchmarks para un conjunto de datos."""
+    followers = frame['seguidores']
+    numeric = parse_counts(followers).dropna()
+    numeric = numeric[numeric > 0].to_numpy(dtype=np.int64)
+
+    yield 'parse_counts', None, lambda: parse_counts(followers)
+    yield 'analisis_digitos', None, lambda: benford_report(DigitAccumulator().update(numeric))
+
+    def plot():
+        render_benford_chart(DigitAccumulator().update(numeric).first_digit_frequencies(),
+                             os.path.join(workdir, 'benford.png'))
+
+    yield 'grafico', None, plot
+    # Los datos sintéticos vienen en el formato antiguo (sentinelas); los almacenes guardan el esquema tipado
+    yield 'tipado', None, lambda: typed_profiles(frame)
+    typed = typed_profiles(frame)
+
+    for fmt in formats:
+        if fmt == 'xlsx' and len(frame) > MAX_FILAS_XLSX:
+            continue
+        path = os.path.join(workdir, f"perfiles{FORMAT_EXTENSIONS[fmt]}")
+        store = open_store(path)
+        yield 'escritura', fmt, lambda: store.write_frames([typed])
+        # El archivo escrito lo reutilizan los casos siguientes
+        yield 'lectura', fmt, lambda: store.read(columns=['username', 'seguidores'])
+        yield 'limpieza', fmt, lambda: DataAnalyzer(path).clean_and_prepare_data()
+        yield 'streaming', fmt, lambda: DataAnalyzer(path).stream_digit_counts()
+
+
+def run(rows_list=FILAS_POR_DEFECTO, formats=FORMATOS, repeat: int = 3, memory: bool = True,
+        seed: int = 0) -> dict:
+    """Ejecuta todos los casos para cada tamaño y devuelve los resultados en un dict serializable."""
+    results = []
+    for rows in rows_list:
+        frame = generate_profiles(rows, seed=seed)
+        # Con los tamaños grandes basta una repetición
+        repetitions = repeat if rows <= 1_000_000 else 1
+        with tempfile.TemporaryDirectory(prefix="benchmark_") as workdir:
+            for case, fmt, function in _cases(frame, workdir, formats):
+                measurement = measure(function, repetitions, memory)
+                results.append({'caso': case, 'formato': fmt, 'filas': rows, **measurement})
+                memory_text = (f", pico {measurement['memoria_pico_mb']:.1f} MB"
+                               if measurement['memoria_pico_mb'] is not None else "")
+                print(f"  {rows:>10,} filas | {case:<16} {fmt or '':<8} "
+                      f"{measurement['segundos']:8.3f} s{memory_text}")
+        del frame
+
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+            'repeticiones': repeat,
+            'semilla': seed,
+        },
+        'resultados': results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = UMBRAL_REGRESION) -> list[dict]:
+    """Casos comunes con su ratio de tiempo frente a la referencia; marca las regresiones."""
+    reference = {(r['caso'], r['formato'], r['filas']): r for r in baseline['resultados']}
+    rows = []
+    for result in current['resultados']:
+        base = reference.get((result['caso'], result['formato'], result['filas']))
+        if base is None or not base['segundos']:
+            continue
+        ratio = result['segundos'] / base['segundos']
+        rows.append({'caso': result['caso'], 'formato': result['formato'], 'filas': result['filas'],
+                     'ratio': ratio, 'regresion': ratio > threshold})
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks de análisis y de E/S con datos sintéticos.")
+    parser.add_argument('--filas', type=int, nargs='+', default=list(FILAS_POR_DEFECTO),
+                        help="Tamaños de los conjuntos de datos (p. ej. 10000 100000 1000000 10000000)")
+    parser.add_argument('--formatos', nargs='+', default=list(FORMATOS), choices=FORMATOS)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--sin-memoria', action='store_true', help="No medir el pico de memoria (más rápido)")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--salida', help="Archivo JSON de resultados (por defecto benchmark_<commit>.json)")
+    parser.add_argument('--comparar', help="JSON de referencia con el que comparar los tiempos")
+    parser.add_argument('--umbral', type=float, default=UMBRAL_REGRESION)
+    args = parser.parse_args()
+
+    print("⏱️ Ejecutando benchmarks...")
+    report = run(args.filas, args.formatos, args.repeticiones, not args.sin_memoria, args.semilla)
+
+    output = args.salida or f"benchmark_{report['meta']['commit'] or 'local'}.json"
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f"📄 Resultados guardados en: **{output}**")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as file:
+            comparison = compare(report, json.load(file), args.umbral)
+        regressions = [row for row in comparison if row['regresion']]
+        for row in comparison:
+            mark = "⚠️" if row['regresion'] else "  "
+            print(f"{mark} {row['filas']:>10,} filas | {row['caso']:<16} {row['formato'] or '':<8} x{row['ratio']:.2f}")
+        if regressions:
+            print(f"❌ {len(regressions)} casos más lentos que la referencia (umbral x{args.umbral}).")
+            sys.exit(1)
+        print("✅ Sin regresiones respecto a la referencia.")
@@ -0,0 +1,74 @@
+# benchmarks/synthetic.py
+# Datos sintéticos de la Fase 2 con la mezcla de formatos que produce el scraper real.
+import numpy as np
+import pandas as pd
+
+from count_parser import SENTINELAS
+
+# Proporciones de cada forma del conteo de seguidores (el resto son dígitos sin separadores)
+MEZCLA_POR_DEFECTO = {
+    'sentinela': 0.08,   # PRIVADA, NO_EXISTE, TIMEOUT...
+    'sufijo': 0.20,      # 12,3 mil / 1.2M / 45K / 1,2 mill. (solo conteos >= 10.000)
+    'separador': 0.12,   # 1.234 / 1,234 / 1 234 (espacio duro)
+}
+_SUFIJOS = np.array(['K', 'M', ' mil', ' mill.'])
+
+
+def _log_uniform_counts(rng, n: int, low: float = 0, high: float = 8) -> np.ndarray:
+    """Conteos log-uniformes entre 10**low y 10**high (siguen la Ley de Benford)."""
+    return np.floor(10 ** rng.uniform(low, high, n)).astype(np.int64)
+
+
+def _suffix_texts(rng, counts: np.ndarray) -> np.ndarray:
+    """Conteos abreviados con sufijo, con coma o punto decimal según el idioma de la interfaz."""
+    millions = counts >= 1_000_000
+    scaled = np.where(millions, counts / 1_000_000, counts / 1_000)
+    numbers = np.char.mod('%.1f', scaled)
+    spanish = rng.random(len(counts)) < 0.5
+    numbers = np.where(spanish, np.char.replace(numbers, '.', ','), numbers)
+    # K / " mil" para miles, M / " mill." para millones
+    suffixes = np.where(millions, np.where(spanish, _SUFIJOS[3], _SUFIJOS[1]),
+                        np.where(spanish, _SUFIJOS[2], _SUFIJOS[0]))
+    return np.char.add(numbers, suffixes)
+
+
+def _separator_texts(rng, counts: np.ndarray) -> np.ndarray:
+    """Conteos con separador de miles (punto, coma o espacio duro)."""
+    texts = pd.Series(counts).map('{:,}'.format).to_numpy(dtype=str)
+    separators = rng.choice(np.array(['.', ',', ' ']), len(counts))
+    for separator in ('.', ' '):
+        mask = separators == separator
+        texts[mask] = np.char.replace(texts[mask], ',', separator)
+    return texts
+
+
+def generate_profiles(rows: int, seed: int = 0, mix: dict | None = None) -> pd.DataFrame:
+    """
+    DataFrame de `rows` perfiles sintéticos reproducibles en el formato antiguo de la Fase 2
+    (conteos como texto con sentinelas): es la entrada de parse_counts y de storage.typed_profiles.
+    """
+    mix = mix or MEZCLA_POR_DEFECTO
+    rng = np.random.default_rng(seed)
+
+    counts = _log_uniform_counts(rng, rows)
+    followers = counts.astype(str).astype(object)
+
+    roll = rng.random(rows)
+    sentinel = roll < mix['sentinela']
+    suffix = ~sentinel & (roll < mix['sentinela'] + mix['sufijo']) & (counts >= 10_000)
+    separator = (~sentinel & ~suffix & (roll >= 1 - mix['separador'])) & (counts >= 1_000)
+
+    followers[sentinel] = rng.choice(np.array(SENTINELAS), sentinel.sum())
+    followers[suffix] = _suffix_texts(rng, counts[suffix])
+    followers[separator] = _separator_texts(rng, counts[separator])
+
+    following = _log_uniform_counts(rng, rows, 0, 4).astype(str).astype(object)
+    following[sentinel] = followers[sentinel]
+
+    frame = pd.DataFrame({
+        'username': pd.Series(np.arange(rows)).map('usuario_{:08d}'.format),
+        'seguidores': followers,
+        'seguidos': following,
+        'biografia': np.where(rng.random(rows) < 0.6, "Perfil sintético de benchmark", ""),
+    })
+    return frame.astype('string')
@@ -0,0 +1,207 @@
+# benford.py
+import math
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from digit_stats import DigitAccumulator
+
+# Bandas de conformidad de Nigrini para el MAD: (límite superior, veredicto)
+MAD_BANDS = {
+    'first_digit': ((0.006, 'Conformidad cercana'), (0.012, 'Conformidad aceptable'),
+                    (0.015, 'Conformidad marginal')),
+    'second_digit': ((0.008, 'Conformidad cercana'), (0.010, 'Conformidad aceptable'),
+                     (0.012, 'Conformidad marginal')),
+    'first_two_digits': ((0.0012, 'Conformidad cercana'), (0.0018, 'Conformidad aceptable'),
+                         (0.0022, 'Conformidad marginal')),
+}
+NON_CONFORMITY = 'No conformidad'
+# Bandas del MAD que cuentan como conformes (la marginal no)
+CONFORMING_BANDS = ('Conformidad cercana', 'Conformidad aceptable')
+
+# Valor crítico de Z (dos colas, 5%) y coeficiente de Kolmogorov-Smirnov al 5%
+Z_CRITICAL = 1.96
+KS_COEFFICIENT = 1.36
+
+
+def _expected_first_digit() -> np.ndarray:
+    digits = np.arange(1, 10)
+    return np.log10(1 + 1 / digits)
+
+
+def _expected_second_digit() -> np.ndarray:
+    first = np.arange(1, 10)[:, None]
+    second = np.arange(0, 10)[None, :]
+    return np.log10(1 + 1 / (10 * first + second)).sum(axis=0)
+
+
+def _expected_first_two_digits() -> np.ndarray:
+    digits = np.arange(10, 100)
+    return np.log10(1 + 1 / digits)
+
+
+# Distribuciones teóricas: (dígitos, probabilidades)
+EXPECTED = {
+    'first_digit': (np.arange(1, 10), _expected_first_digit()),
+    'second_digit': (np.arange(0, 10), _expected_second_digit()),
+    'first_two_digits': (np.arange(10, 100), _expected_first_two_digits()),
+    'last_two_digits': (np.arange(0, 100), np.full(100, 0.01)),
+}
+
+
+def _chi_square_sf(x: float, dof: int) -> float:
+    """P(X > x) para una chi-cuadrado con dof grados de libertad (forma cerrada, sin SciPy)."""
+    if x <= 0:
+        return 1.0
+    half = x / 2
+    if dof % 2 == 0:
+        term = total = math.exp(-half)
+        for i in range(1, dof // 2):
+            term *= half / i
+            total += term
+        return min(total, 1.0)
+
+    root = math.sqrt(x)
+    total = math.erfc(root / math.sqrt(2))
+    term = math.sqrt(2 / math.pi) * math.exp(-half) * root
+    for i in range(1, (dof - 1) // 2 + 1):
+        total += term
+        term *= x / (2 * i + 1)
+    return min(total, 1.0)
+
+
+def _kolmogorov_sf(statistic: float) -> float:
+    """Probabilidad asintótica de Kolmogorov P(K > statistic)."""
+    if statistic <= 0:
+        return 1.0
+    total = 0.0
+    for k in range(1, 101):
+        term = 2 * (-1) ** (k - 1) * math.exp(-2 * k * k * statistic * statistic)
+        total += term
+        if abs(term) < 1e-12:
+            break
+    return min(max(total, 0.0), 1.0)
+
+
+@dataclass
+class DigitTestResult:
+    """Resultado de las pruebas de Benford para una distribución de dígitos."""
+
+    name: str
+    digits: np.ndarray
+    counts: np.ndarray
+    expected: np.ndarray
+    n: int
+    chi_square: float = math.nan
+    chi_square_p: float = math.nan
+    dof: int = 0
+    mad: float = math.nan
+    mad_conformity: str | None = None
+    ks_statistic: float = math.nan
+    ks_critical: float = math.nan
+    ks_p: float = math.nan
+    z_stats: np.ndarray = field(default_factory=lambda: np.array([]))
+
+    @property
+    def observed(self) -> np.ndarray:
+        """Proporciones observadas por dígito."""
+        return self.counts / self.n if self.n else np.zeros(len(self.counts))
+
+    @property
+    def significant_digits(self) -> np.ndarray:
+        """Dígitos cuya Z supera el valor crítico al 5%."""
+        return self.digits[self.z_stats > Z_CRITICAL]
+
+    @property
+    def conforms(self) -> bool:
+        """
+        Veredicto por la banda de Nigrini del MAD (cercana o aceptable), que no depende de n:
+        con decenas de miles de conteos chi-cuadrado y KS rechazan casi cualquier dato real, así
+        que solo se informan. Sin bandas (últimos dos dígitos) decide chi-cuadrado y KS al 5%.
+        """
+        if self.mad_conformity is not None:
+            return self.mad_conformity in CONFORMING_BANDS
+        return bool(self.chi_square_p >= 0.05 and self.ks_statistic <= self.ks_critical)
+
+
+@dataclass
+class BenfordReport:
+    """Conjunto completo de pruebas de Benford sobre un mismo conjunto de conteos."""
+
+    n: int
+    first_digit: DigitTestResult
+    second_digit: DigitTestResult
+    first_two_digits: DigitTestResult
+    last_two_digits: DigitTestResult
+
+    def tests(self) -> list[DigitTestResult]:
+        return [self.first_digit, self.second_digit, self.first_two_digits, self.last_two_digits]
+
+    def summary(self) -> str:
+        """Resumen legible de todas las pruebas."""
+        lines = [f"Registros analizados: {self.n}"]
+        for test in self.tests():
+            if not test.n:
+                lines.append(f"  {test.name}: sin datos suficientes")
+                continue
+            lines.append(
+                f"  {test.name}: n={test.n}, chi2={test.chi_square:.2f} (p={test.chi_square_p:.4f}), "
+                f"MAD={test.mad:.5f}{f' [{test.mad_conformity}]' if test.mad_conformity else ''}, "
+                f"KS={test.ks_statistic:.4f} (crítico {test.ks_critical:.4f}), "
+                f"dígitos con Z>{Z_CRITICAL}: {test.significant_digits.tolist()}"
+            )
+        return "\n".join(lines)
+
+
+def _mad_conformity(name: str, mad: float) -> str | None:
+    bands = MAD_BANDS.get(name)
+    if bands is None:
+        return None
+    for upper, verdict in bands:
+        if mad <= upper:
+            return verdict
+    return NON_CONFORMITY
+
+
+def digit_test(name: str, counts: np.ndarray) -> DigitTestResult:
+    """Chi-cuadrado, MAD, KS y Z por dígito para un histograma contra su distribución de Benford."""
+    digits, expected = EXPECTED[name]
+    counts = np.asarray(counts, dtype=np.int64)[digits]
+    n = int(counts.sum())
+    result = DigitTestResult(name=name, digits=digits, counts=counts, expected=expected, n=n)
+    if not n:
+        return result
+
+    observed = counts / n
+    expected_counts = expected * n
+
+    result.chi_square = float(((counts - expected_counts) ** 2 / expected_counts).sum())
+    result.dof = len(digits) - 1
+    result.chi_square_p = _chi_square_sf(result.chi_square, result.dof)
+
+    result.mad = float(np.abs(observed - expected).mean())
+    result.mad_conformity = _mad_conformity(name, result.mad)
+
+    result.ks_statistic = float(np.abs(np.cumsum(observed) - np.cumsum(expected)).max())
+    result.ks_critical = KS_COEFFICIENT / math.sqrt(n)
+    result.ks_p = _kolmogorov_sf(result.ks_statistic * math.sqrt(n))
+
+    # Z de Nigrini con corrección por continuidad (solo si es menor que la diferencia)
+    difference = np.abs(observed - expected)
+    correction = 1 / (2 * n)
+    difference = np.where(correction < difference, difference - correction, difference)
+    result.z_stats = difference / np.sqrt(expected * (1 - expected) / n)
+    return result
+
+
+def benford_report(accumulator: DigitAccumulator) -> BenfordReport:
+    """Ejecuta todas las pruebas sobre los histogramas de un acumulador."""
+    return BenfordReport(
+        n=accumulator.valid,
+        **{name: digit_test(name, getattr(accumulator, name)) for name in EXPECTED},
+    )
+
+
+def benford_report_from_values(values) -> BenfordReport:
+    """Atajo: acumula un array de conteos (NaN = no válido) y ejecuta todas las pruebas."""
+    return benford_report(DigitAccumulator().update(values))
@@ -0,0 +1,336 @@
+# bio_index.py
+# Índice de búsqueda sobre las biografías de la Fase 2: tokens normalizados (sin tildes ni
+# mayúsculas) en un índice invertido SQLite junto al archivo de datos, con filtros por rango
+# de seguidores/seguidos.
+#
+#   python bio_index.py nayeli.nxx_profile_data.parquet futbol "vida sana" --min-seguidores 1000
+import argparse
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+from collections import deque
+
+import pandas as pd
+
+_REGEX_TOKEN = re.compile(r'\w+')
+
+
+def normalize_text(text) -> str:
+    """Minúsculas y sin tildes ni diacríticos: 'Fútbol ⚽ y MÚSICA' -> 'futbol ⚽ y musica'."""
+    decomposed = unicodedata.normalize('NFKD', str(text or '')).casefold()
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text) -> list[str]:
+    """Palabras normalizadas del texto (letras, dígitos y '_' de cualquier alfabeto; '#futbol' -> 'futbol')."""
+    return _REGEX_TOKEN.findall(normalize_text(text))
+
+
+def bio_index_path(data_path: str) -> str:
+    """Archivo del índice de biografías de un archivo de datos de la Fase 2."""
+    return f"{data_path}.bioindex.sqlite"
+
+
+class AhoCorasick:
+    """
+    Autómata de Aho-Corasick: encuentra todos los patrones presentes en un texto en una sola
+    pasada, sin importar cuántos patrones haya.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [set()]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(set())
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._output[state].add(index)
+
+        # Enlaces de fallo en anchura: el sufijo propio más largo que también es prefijo de un patrón
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for char, child in self._goto[state].items():
+                pending.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                # Los hijos de la raíz fallan a la raíz
+                self._fail[child] = self._goto[fallback].get(char, 0) if state else 0
+                self._output[child] |= self._output[self._fail[child]]
+
+    def find(self, text: str) -> set[int]:
+        """Índices de los patrones que aparecen en el texto."""
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            if self._output[state]:
+                found |= self._output[state]
+        return found
+
+
+class BioIndex:
+    """
+    Índice invertido de biografías persistido en SQLite.
+
+    Cada perfil guarda sus conteos ya convertidos a entero (para los filtros por rango) y su
+    biografía normalizada; la tabla de tokens relaciona cada palabra con los perfiles que la
+    contienen. Una búsqueda filtra con el índice (palabra exacta o prefijo) dentro de SQLite y
+    verifica frases y palabras encontradas con una pasada de Aho-Corasick por biografía.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        with self.conn:
+            self.conn.executescript(
+                "CREATE TABLE IF NOT EXISTS perfiles ("
+                " id INTEGER PRIMARY KEY, username TEXT UNIQUE NOT NULL, seguidores INTEGER, seguidos INTEGER,"
+                " biografia TEXT, normalizada TEXT NOT NULL);"
+                "CREATE TABLE IF NOT EXISTS tokens ("
+                " token TEXT NOT NULL, perfil INTEGER NOT NULL, PRIMARY KEY (token, perfil)) WITHOUT ROWID;"
+                "CREATE TABLE IF NOT EXISTS vocabulario (token TEXT PRIMARY KEY, perfiles INTEGER NOT NULL);"
+                "CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT);"
+            )
+
+    @staticmethod
+    def _source_signature(data_path: str) -> str:
+        stat = os.stat(data_path)
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    def is_current(self, data_path: str) -> bool:
+        """El índice corresponde a la versión actual del archivo de datos."""
+        row = self.conn.execute("SELECT valor FROM meta WHERE clave = 'fuente'").fetchone()
+        return row is not None and os.path.exists(data_path) and row[0] == self._source_signature(data_path)
+
+    def build(self, data_path: str, chunksize: int = 100_000) -> int:
+        """(Re)construye el índice a partir del archivo de datos; devuelve los perfiles indexados."""
+        from storage import open_store
+
+        store = open_store(data_path)
+        wanted = [c for c in ('username', 'seguidores', 'seguidos', 'biografia') if c in store.columns()]
+        start = time.perf_counter()
+        total = 0
+        with self.conn:
+            self.conn.execute("DROP INDEX IF EXISTS idx_seguidores")
+            self.conn.execute("DROP INDEX IF EXISTS idx_seguidos")
+            self.conn.execute("DELETE FROM tokens")
+            self.conn.execute("DELETE FROM vocabulario")
+            self.conn.execute("DELETE FROM perfiles")
+            for chunk in store.iter_chunks(columns=wanted, chunksize=chunksize):
+                chunk = chunk.dropna(subset=['username'])
+                empty = [None] * len(chunk)
+                # Conteos Int64 y biografías del esquema tipado (<NA> -> None para SQLite)
+                followers, following, bios = (_values(chunk[c]) if c in chunk else empty
+                                              for c in ('seguidores', 'seguidos', 'biografia'))
+                rows, postings = [], []
+                for profile_id, username, n_followers, n_following, bio in zip(
+                        range(total + 1, total + len(chunk) + 1), chunk['username'], followers, following, bios):
+                    tokens = tokenize(bio)
+                    rows.append((profile_id, username, n_followers, n_following, bio, " ".join(tokens)))
+                    postings.extend((token, profile_id) for token in set(tokens))
+                self.conn.executemany("INSERT OR REPLACE INTO perfiles VALUES (?, ?, ?, ?, ?, ?)", rows)
+                self.conn.executemany("INSERT OR IGNORE INTO tokens VALUES (?, ?)", postings)
+                total += len(rows)
+            self.conn.execute("INSERT INTO vocabulario SELECT token, count(*) FROM tokens GROUP BY token")
+            self.conn.execute("CREATE INDEX idx_seguidores ON perfiles (seguidores)")
+            self.conn.execute("CREATE INDEX idx_seguidos ON perfiles (seguidos)")
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('fuente', ?)", (self._source_signature(data_path),))
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('perfiles', ?)", (str(total),))
+        self.conn.execute("ANALYZE")
+        print(f"🔎 Índice de biografías: {total} perfiles indexados en {time.perf_counter() - start:.1f} s "
+              f"('{self.path}').")
+        return total
+
+    def _expand(self, token: str, prefix: bool) -> dict[str, int]:
+        """Tokens del vocabulario que cumplen el token (él mismo, o los que empiezan por él) y sus perfiles."""
+        if prefix:
+            # Rango sobre la clave primaria (token <= t < token + el mayor carácter), no LIKE
+            return dict(self.conn.execute("SELECT token, perfiles FROM vocabulario WHERE token >= ? AND token < ?",
+                                          (token, token + '\U0010ffff')))
+        return dict(self.conn.execute("SELECT token, perfiles FROM vocabulario WHERE token = ?", (token,)))
+
+    @staticmethod
+    def _group_condition(tokens, correlated: bool) -> str:
+        """El perfil contiene alguno de los tokens (una búsqueda por token en la clave primaria)."""
+        placeholders = ', '.join('?' * len(tokens))
+        if correlated:
+            return f"EXISTS (SELECT 1 FROM tokens WHERE token IN ({placeholders}) AND perfil = p.id)"
+        return f"p.id IN (SELECT perfil FROM tokens WHERE token IN ({placeholders}))"
+
+    def _keyword_condition(self, patterns: list[list[str]], match_all: bool, prefix: bool,
+                           limit: int | None) -> tuple[str | None, list]:
+        """
+        Condición SQL de las palabras clave, combinadas con OR (alguna) o AND (todas); None si
+        ningún perfil puede cumplirla. Cada token de una palabra clave es un grupo de tokens del
+        vocabulario (varios con prefijo) y el perfil debe contener algún token de cada grupo.
+        """
+        keywords = []
+        for tokens in patterns:
+            groups = [self._expand(token, prefix) for token in tokens]
+            if all(groups):
+                keywords.append(groups)
+            elif match_all:
+                return None, []
+        if not keywords:
+            return None, []
+        if not match_all:
+            # Listas largas de palabras sueltas: un único grupo con todos sus tokens
+            singles = {t: n for groups in keywords if len(groups) == 1 for t, n in groups[0].items()}
+            keywords = [groups for groups in keywords if len(groups) > 1] + ([[singles]] if singles else [])
+
+        # Cota de coincidencias: por el grupo más raro de cada palabra clave
+        estimates = [min(sum(group.values()) for group in groups) for groups in keywords]
+        estimate = min(estimates) if match_all else sum(estimates)
+        probes = sum(len(group) for groups in keywords for group in groups)
+        # Palabras frecuentes: recorrer los perfiles por seguidores comprobando cada uno hasta el
+        # límite (unos limit * total / coincidencias perfiles, con `probes` búsquedas cada uno) sale
+        # más barato que reunir y ordenar todas las coincidencias (proporcional a su número)
+        correlated = bool(limit) and limit * self.size() * probes < estimate * estimate
+
+        clauses, params = [], []
+        for groups in keywords:
+            clauses.append(" AND ".join(self._group_condition(group, correlated) for group in groups))
+            params += [token for group in groups for token in group]
+        joiner = ' AND ' if match_all else ' OR '
+        return f"({joiner.join(f'({clause})' for clause in clauses)})", params
+
+    def search(self, keywords=(), match_all: bool = False, prefix: bool = False,
+               followers: tuple = (None, None), following: tuple = (None, None), limit: int | None = 100):
+        """
+        Perfiles cuya biografía contiene alguna (o todas, con match_all) de las palabras clave,
+        ordenados por seguidores. Las palabras clave se normalizan igual que las biografías; una
+        palabra clave con espacios es una frase. Con prefix=True 'futbol' también encuentra
+        'futbolista', y en una frase cada palabra cuenta como prefijo ('fot vi' encuentra 'foto
+        viaje'). followers/following son rangos (mínimo, máximo) inclusivos; None = sin límite.
+        Devuelve un DataFrame con username, seguidores, seguidos, biografia y palabras encontradas.
+        """
+        columns = ['username', 'seguidores', 'seguidos', 'biografia', 'palabras']
+        keywords = list(dict.fromkeys(k for k in keywords if tokenize(k)))
+        patterns = [tokenize(k) for k in keywords]
+
+        conditions, params = [], []
+        if patterns:
+            clause, clause_params = self._keyword_condition(patterns, match_all, prefix, limit)
+            if clause is None:
+                return pd.DataFrame([], columns=columns)
+            conditions.append(clause)
+            params += clause_params
+        for column, (low, high) in (('seguidores', followers), ('seguidos', following)):
+            if low is not None:
+                conditions.append(f"p.{column} >= ?")
+                params.append(low)
+            if high is not None:
+                conditions.append(f"p.{column} <= ?")
+                params.append(high)
+
+        # El índice ya da resultados exactos salvo en las frases (tokens en orden y seguidos),
+        # así que sin frases el LIMIT va en la consulta y SQLite para al llegar a él
+        has_phrases = any(len(tokens) > 1 for tokens in patterns)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql_limit = f"LIMIT {int(limit)}" if limit and not has_phrases else ""
+        cursor = self.conn.execute(
+            f"SELECT p.username, p.seguidores, p.seguidos, p.biografia, p.normalizada FROM perfiles p {where} "
+            f"ORDER BY p.seguidores DESC {sql_limit}", params)
+
+        # Una pasada de Aho-Corasick por biografía: frases completas y qué palabras aparecen
+        # (con espacios alrededor para respetar los límites de palabra; sin el final si es prefijo).
+        # Con prefijo, en una frase cada palabra es un prefijo ('fot vi' -> 'foto viaje'), igual
+        # que en el filtro del índice: el autómata busca la primera palabra y una expresión
+        # regular confirma la frase en las biografías candidatas
+        prefix_phrases = {index: re.compile(r'(?<!\S)' + r'\w* '.join(map(re.escape, tokens)))
+                          for index, tokens in enumerate(patterns) if prefix and len(tokens) > 1}
+        matcher = AhoCorasick(f" {tokens[0]}" if index in prefix_phrases
+                              else f" {' '.join(tokens)}{'' if prefix else ' '}"
+                              for index, tokens in enumerate(patterns))
+        results = []
+        for username, n_followers, n_following, bio, normalized in cursor:
+            found = sorted(index for index in matcher.find(f" {normalized} ")
+                           if index not in prefix_phrases or prefix_phrases[index].search(normalized))
+            if has_phrases and (len(found) < len(patterns) if match_all else not found):
+                continue
+            results.append((username, n_followers, n_following, bio, [keywords[i] for i in found]))
+            if limit and len(results) >= limit:
+                break
+        return pd.DataFrame(results, columns=columns)
+
+    def size(self) -> int:
+        """Perfiles indexados."""
+        row = self.conn.execute("SELECT valor FROM meta WHERE clave = 'perfiles'").fetchone()
+        return int(row[0]) if row else 0
+
+    def close(self):
+        self.conn.close()
+
+
+def _values(column: pd.Series) -> list:
+    """Valores de una columna como objetos de Python (None en lugar de <NA>)."""
+    return column.astype(object).where(column.notna(), None).tolist()
+
+
+def open_bio_index(data_path: str, rebuild: bool = False) -> BioIndex:
+    """Abre el índice del archivo de datos, construyéndolo si falta o si los datos cambiaron."""
+    index = BioIndex(bio_index_path(data_path))
+    if rebuild or not index.is_current(data_path):
+        index.build(data_path)
+    return index
+
+
+def read_keywords_file(filename: str) -> list[str]:
+    """Palabras clave de un archivo de texto: una (o una frase) por línea; se ignoran '#' y vacías."""
+    with open(filename, encoding='utf-8') as file:
+        lines = (line.split('#', 1)[0].strip() for line in file)
+        return [line for line in lines if line]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Búsqueda por palabras clave en las biografías de la Fase 2.")
+    parser.add_argument('datos', help="Archivo de datos de la Fase 2 (parquet, sqlite, csv o xlsx)")
+    parser.add_argument('palabras', nargs='*', help="Palabras clave o frases (sin tildes ni mayúsculas da igual)")
+    parser.add_argument('--archivo-palabras', help="Archivo con una palabra clave o frase por línea")
+    parser.add_argument('--todas', action='store_true', help="Exigir todas las palabras clave (por defecto, alguna)")
+    parser.add_argument('--prefijo', action='store_true',
+                        help="'futbol' encuentra también 'futbolista' (en una frase, cada palabra es un prefijo)")
+    parser.add_argument('--min-seguidores', type=int)
+    parser.add_argument('--max-seguidores', type=int)
+    parser.add_argument('--min-seguidos', type=int)
+    parser.add_argument('--max-seguidos', type=int)
+    parser.add_argument('--resultados', type=int, default=50, help="Máximo de perfiles a mostrar (0 = todos)")
+    parser.add_argument('--reconstruir', action='store_true', help="Reconstruir el índice aunque esté al día")
+    parser.add_argument('--csv', help="Guardar los resultados en este CSV")
+    args = parser.parse_intermixed_args()
+
+    keywords = list(args.palabras)
+    if args.archivo_palabras:
+        keywords += read_keywords_file(args.archivo_palabras)
+
+    bio_index = open_bio_index(args.datos, rebuild=args.reconstruir)
+    try:
+        start = time.perf_counter()
+        matches = bio_index.search(keywords, match_all=args.todas, prefix=args.prefijo,
+                                   followers=(args.min_seguidores, args.max_seguidores),
+                                   following=(args.min_seguidos, args.max_seguidos),
+                                   limit=args.resultados or None)
+        elapsed = (time.perf_counter() - start) * 1000
+    finally:
+        bio_index.close()
+
+    print(f"🔎 {len(matches)} perfiles en {elapsed:.1f} ms.")
+    for row in matches.itertuples():
+        print(f"   @{row.username:<30} {row.seguidores if row.seguidores is not None else '-':>10} seguidores | "
+              f"{', '.join(row.palabras)} | {(row.biografia or '')[:60]!r}")
+    if args.csv:
+        matches.to_csv(args.csv, index=False)
+        print(f"📄 Resultados guardados en: **{args.csv}**")
@@ -0,0 +1,267 @@
+# browser_session.py
+import json
+import os
+import time
+from urllib.parse import urljoin, urlparse
+
+from selenium import webdriver
+from selenium.webdriver import Chrome
+from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from webdriver_manager.chrome import ChromeDriverManager
+
+from metrics import get_metrics
+
+BASE_URL = "https://www.instagram.com/"
+
+# Pop-ups que aparecen tras el login: (etiqueta, selectores XPath)
+SAVE_LOGIN_POPUP = ("Guardar información", [
+    "//div[contains(text(), 'Guardar información')]/following-sibling::div//button[contains(text(), 'Ahora no')]",
+    "//div[contains(text(), 'Save Your Login Info')]/following-sibling::div//button[contains(text(), 'Not Now')]",
+    "//button[contains(text(), 'Ahora no')]",
+    "//button[contains(text(), 'Not Now')]",
+])
+NOTIFICATIONS_POPUP = ("Notificaciones", [
+    "//button[contains(text(), 'Ahora no')]",
+    "//button[contains(text(), 'Not Now')]",
+    "//button[contains(text(), 'No ahora')]",
+])
+# Tiempo máximo (segundos) que se espera a que aparezca un pop-up opcional
+POPUP_TIMEOUT = 5
+
+
+class BrowserSession:
+    """
+    Sesión de navegador única compartida por las fases del programa.
+
+    Guarda en disco la ruta resuelta de ChromeDriver y las cookies de nuestra cuenta,
+    de modo que las ejecuciones siguientes no vuelven a descargar el driver ni a hacer login.
+    """
+
+    def __init__(self, username, password, headless=False, cookies_file="session_cookies.json",
+                 driver_path_file=".chromedriver_path", base_url=BASE_URL):
+        self.username = username
+        self.password = password
+        self.headless = headless
+        self.cookies_file = cookies_file
+        self.driver_path_file = driver_path_file
+        # Sitio contra el que se trabaja: Instagram o un servidor local de fixtures
+        self.base_url = base_url if base_url.endswith('/') else base_url + '/'
+        self.host = urlparse(self.base_url).netloc
+        self.driver = None
+        self.logged_in = False
+
+    # --- Driver ---
+
+    def _resolve_driver_path(self) -> str:
+        """Ruta de ChromeDriver: la guardada en disco si sigue existiendo, si no la resuelve y la guarda."""
+        if self.driver_path_file and os.path.exists(self.driver_path_file):
+            with open(self.driver_path_file, encoding='utf-8') as file:
+                cached_path = file.read().strip()
+            if cached_path and os.path.exists(cached_path):
+                return cached_path
+
+        driver_path = ChromeDriverManager().install()
+        if self.driver_path_file:
+            with open(self.driver_path_file, 'w', encoding='utf-8') as file:
+                file.write(driver_path)
+        return driver_path
+
+    def start(self):
+        """Inicializa y configura el driver de Chrome (una sola vez por sesión)."""
+        if self.driver:
+            return self.driver
+
+        options = webdriver.ChromeOptions()
+        options.add_argument("--window-size=1600,900")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_argument(
+            "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36"
+        )
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-gpu")
+
+        if self.headless:
+            options.add_argument("--headless=new")
+
+        with get_metrics().timer('arranque_navegador'):
+            service = Service(self._resolve_driver_path())
+            self.driver = Chrome(service=service, options=options)
+        return self.driver
+
+    def profile_url(self, username: str) -> str:
+        """URL del perfil de un usuario en el sitio configurado."""
+        return urljoin(self.base_url, f"{username}/")
+
+    def _is_past_login(self, url: str) -> bool:
+        """La URL actual es del sitio y ya no es la página de login."""
+        return self.host in url and "login" not in url
+
+    def wait_for(self, timeout=15):
+        """Función de conveniencia para WebDriverWait."""
+        return WebDriverWait(self.driver, timeout)
+
+    def wait_until_loaded(self, timeout=10):
+        """Espera a que el documento actual termine de cargar (document.readyState)."""
+        self.wait_for(timeout).until(lambda d: d.execute_script("return document.readyState") == "complete")
+
+    # --- Cookies ---
+
+    def _save_cookies(self):
+        """Guarda las cookies de la sesión actual (escritura atómica, la comparten varios procesos)."""
+        if not self.cookies_file:
+            return
+        tmp_file = f"{self.cookies_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as file:
+            json.dump(self.driver.get_cookies(), file)
+        os.replace(tmp_file, self.cookies_file)
+
+    def _restore_cookies(self) -> bool:
+        """Carga las cookies guardadas en el navegador; devuelve False si no hay o están caducadas."""
+        if not self.cookies_file or not os.path.exists(self.cookies_file):
+            return False
+        try:
+            with open(self.cookies_file, encoding='utf-8') as file:
+                cookies = json.load(file)
+        except (OSError, ValueError):
+            return False
+
+        now = time.time()
+        cookies = [c for c in cookies if not c.get('expiry') or c['expiry'] > now]
+        if not cookies:
+            return False
+
+        # Las cookies solo se pueden añadir estando en el dominio
+        self.driver.get(self.base_url)
+        for cookie in cookies:
+            try:
+                self.driver.add_cookie(cookie)
+            except Exception:
+                continue
+        self.driver.get(self.base_url)
+        return self._is_logged_in()
+
+    def _is_logged_in(self) -> bool:
+        """La sesión es válida si hay cookie de sesión y no se muestra el formulario de login."""
+        try:
+            if not self.driver.get_cookie('sessionid'):
+                return False
+            self.wait_until_loaded()
+            return not self.driver.find_elements(By.NAME, "username")
+        except Exception:
+            return False
+
+    # --- Login ---
+
+    def login(self) -> bool:
+        """Deja la sesión iniciada: reutiliza las cookies guardadas o hace el login completo."""
+        if self.logged_in:
+            return True
+        self.start()
+
+        with get_metrics().timer('login', via='cookies') as timer:
+            restored = self._restore_cookies()
+            timer.set(estado='OK' if restored else 'FALLO')
+        if restored:
+            print("✅ Sesión restaurada desde cookies guardadas (sin login).")
+            self.logged_in = True
+            return True
+
+        with get_metrics().timer('login', via='credenciales') as timer:
+            self.logged_in = self._login_with_credentials()
+            timer.set(estado='OK' if self.logged_in else 'FALLO')
+        if self.logged_in:
+            try:
+                self._save_cookies()
+            except Exception as e:
+                print(f"⚠️ No se pudieron guardar las cookies de sesión: {e}")
+        return self.logged_in
+
+    def _find_popup_button(self, selectors):
+        """Primer botón visible de un pop-up, o False si aún no se ha mostrado."""
+        for selector in selectors:
+            try:
+                for element in self.driver.find_elements(By.XPATH, selector):
+                    if element and element.is_displayed():
+                        return element
+            except Exception:
+                continue
+        return False
+
+    def _close_popup(self, popup, timeout=POPUP_TIMEOUT):
+        """Cierra un pop-up post-login si aparece en `timeout` segundos y espera a que desaparezca."""
+        label, selectors = popup
+        try:
+            button = self.wait_for(timeout).until(lambda d: self._find_popup_button(selectors))
+        except TimeoutException:
+            return False
+        self.driver.execute_script("arguments[0].click();", button)
+        print(f"   -> Pop-up '{label}' cerrado.")
+        try:
+            self.wait_for(timeout).until(EC.invisibility_of_element(button))
+        except TimeoutException:
+            pass
+        return True
+
+    def _login_with_credentials(self) -> bool:
+        """Realiza el login en Instagram y maneja pop-ups post-login."""
+        wait = self.wait_for(20)
+        self.driver.get(self.base_url)
+
+        try:
+            user_input = wait.until(EC.presence_of_element_located((By.NAME, "username")))
+            pass_input = wait.until(EC.presence_of_element_located((By.NAME, "password")))
+        except Exception:
+            print("Timeout: No se encontraron los campos de login.")
+            return False
+
+        # Enviar credenciales
+        user_input.clear()
+        user_input.send_keys(self.username)
+        pass_input.clear()
+        pass_input.send_keys(self.password)
+
+        try:
+            # Intentar clic en el botón de login
+            submit_btn = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[./div[text()='Iniciar sesión']]")))
+            submit_btn.click()
+        except Exception:
+            print("No se pudo hacer clic en el botón de login.")
+            return False
+
+        # Manejo de pop-ups y espera al feed
+        try:
+            # 1. Esperar a que la URL cambie (éxito del login)
+            wait.until(lambda d: self._is_past_login(d.current_url))
+            self.wait_until_loaded(20)
+            print("✅ Login exitoso, intentando cerrar notificaciones/guardado.")
+
+            # 2. Pop-ups "Guardar información de inicio de sesión" y "Activar notificaciones":
+            #    se espera a que se muestren (hasta POPUP_TIMEOUT) en lugar de pausas fijas
+            self._close_popup(SAVE_LOGIN_POPUP)
+            self._close_popup(NOTIFICATIONS_POPUP)
+            return True
+
+        except Exception as e:
+            print(f"Fallo al detectar la sesión iniciada o al cerrar pop-ups: {e}")
+            # Aunque falle el cierre de pop-ups, si el login fue exitoso, continuar
+            try:
+                if self._is_past_login(self.driver.current_url):
+                    print("⚠Login exitoso pero no se pudieron cerrar algunos pop-ups. Continuando...")
+                    return True
+            except Exception:
+                pass
+            return False
+
+    def close(self):
+        """Cierra el navegador de la sesión."""
+        if self.driver:
+            self.driver.quit()
+            self.driver = None
+            self.logged_in = False
+            print("Cerrando navegador.")
@@ -0,0 +1,134 @@
+# count_parser.py
+import re
+
+import numpy as np
+import pandas as pd
+
+from profile_record import ProfileStatus
+
+# Valores especiales que el scraper escribía en lugar de un conteo (archivos en formato antiguo)
+SENTINELAS = tuple(status.name for status in ProfileStatus if status != ProfileStatus.OK)
+
+# Multiplicadores por sufijo (en minúsculas). "mil" es miles en español, "mill." millones.
+MULTIPLICADORES = {
+    'k': 1_000,
+    'mil': 1_000,
+    'm': 1_000_000,
+    'mill': 1_000_000,
+    'mill.': 1_000_000,
+    'millones': 1_000_000,
+    'millón': 1_000_000,
+    'b': 1_000_000_000,
+}
+
+# Espacios aceptados como separador de miles: normal, duro (U+00A0) y estrecho (U+202F).
+# profile_parser usa el mismo conjunto en la meta descripción.
+ESPACIOS_MILES = ' \u00a0\u202f'
+
+# Número (con separadores de miles/decimales) seguido opcionalmente de un sufijo.
+_PATRON_CONTEO = (
+    rf'(?P<numero>\d(?:[\d.,{ESPACIOS_MILES}]*\d)?)\s*'
+    r'(?P<sufijo>mill(?:ones|\.)?|millón|mil|k|m|b)?(?![a-záéíóúñ])'
+)
+_REGEX_CONTEO = re.compile(_PATRON_CONTEO, re.IGNORECASE)
+_REGEX_SENTINELA = re.compile('|'.join(SENTINELAS))
+# Todos los separadores excepto el último (el último es el decimal cuando hay sufijo)
+_REGEX_SEPARADORES_NO_FINALES = rf'[.,{ESPACIOS_MILES}](?=.*[.,])'
+_REGEX_SEPARADORES = rf'[.,{ESPACIOS_MILES}]'
+_REGEX_ESPACIOS = rf'[{ESPACIOS_MILES}]'
+
+
+def _normalizar_numero(numero: str, con_sufijo: bool) -> float:
+    """Convierte la parte numérica a float según si lleva sufijo (decimal) o no (miles)."""
+    if con_sufijo:
+        # "1,2" / "1.2" / "1.234,5" -> el último separador es el decimal
+        numero = re.sub(_REGEX_SEPARADORES_NO_FINALES, '', numero).replace(',', '.')
+        numero = re.sub(_REGEX_ESPACIOS, '', numero)
+        return float(numero)
+    # Sin sufijo los separadores solo pueden ser de miles: "1.234" / "1,234" / "1 234"
+    return float(re.sub(_REGEX_SEPARADORES, '', numero))
+
+
+def parse_count(value) -> int | None:
+    """Convierte un conteo ("1.234", "1,2 mil", "12.5M", 1234...) a entero, o None si no es válido."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool):
+        if pd.isna(value):
+            return None
+        return int(value)
+
+    texto = str(value).strip()
+    if not texto or _REGEX_SENTINELA.search(texto.upper()):
+        return None
+
+    match = _REGEX_CONTEO.search(texto)
+    if not match:
+        return None
+
+    sufijo = match.group('sufijo')
+    try:
+        numero = _normalizar_numero(match.group('numero'), sufijo is not None)
+    except ValueError:
+        return None
+    multiplicador = MULTIPLICADORES[sufijo.lower()] if sufijo else 1
+    return int(round(numero * multiplicador))
+
+
+def parse_counts(values):
+    """
+    Versión vectorizada de parse_count para una columna completa.
+
+    Acepta una Series de pandas o un array de NumPy y devuelve el mismo tipo con
+    valores float64 (NaN para sentinelas y textos no numéricos).
+    """
+    es_array = not isinstance(values, pd.Series)
+    serie = pd.Series(values) if es_array else values
+
+    # Camino rápido: la columna ya es numérica
+    if pd.api.types.is_numeric_dtype(serie.dtype) and not pd.api.types.is_bool_dtype(serie.dtype):
+        resultado = serie.astype('float64')
+        return resultado.to_numpy() if es_array else resultado
+
+    texto = serie.astype('string').str.strip()
+    resultado = np.full(len(serie), np.nan)
+
+    # Valores que ya venían como número dentro de una columna object (p.ej. XLSX mixto)
+    if serie.dtype == object:
+        numericos = serie.map(type).isin((int, float)).to_numpy()
+        resultado[numericos] = pd.to_numeric(serie[numericos], errors='coerce')
+    else:
+        numericos = np.zeros(len(serie), dtype=bool)
+
+    # Camino rápido: solo dígitos (el caso más común en exportaciones grandes)
+    solo_digitos = texto.str.fullmatch(r'\d+').fillna(False).to_numpy(dtype=bool) & ~numericos
+    resultado[solo_digitos] = pd.to_numeric(texto[solo_digitos]).to_numpy(dtype='float64')
+
+    sentinela = texto.str.upper().str.contains(_REGEX_SENTINELA.pattern, regex=True, na=False)
+    pendientes = ~numericos & ~solo_digitos & ~sentinela.to_numpy(dtype=bool) & texto.notna().to_numpy()
+    if pendientes.any():
+        resultado[pendientes] = _parse_with_suffix(texto[pendientes])
+
+    resultado = pd.Series(resultado, index=serie.index, dtype='float64')
+    return resultado.to_numpy() if es_array else resultado
+
+
+def _parse_with_suffix(texto: pd.Series) -> np.ndarray:
+    """Extrae número y sufijo (K, M, mil...) de textos que no son solo dígitos."""
+    partes = texto.str.extract(_PATRON_CONTEO, flags=re.IGNORECASE)
+
+    sufijo = partes['sufijo'].str.lower()
+    con_sufijo = sufijo.notna()
+    numero = partes['numero']
+
+    # Con sufijo: el último separador es el decimal
+    decimal = (numero.where(con_sufijo)
+               .str.replace(_REGEX_SEPARADORES_NO_FINALES, '', regex=True)
+               .str.replace(',', '.', regex=False)
+               .str.replace(_REGEX_ESPACIOS, '', regex=True))
+    # Sin sufijo: todos los separadores son de miles
+    entero = numero.where(~con_sufijo).str.replace(_REGEX_SEPARADORES, '', regex=True)
+
+    base = pd.to_numeric(decimal.fillna(entero), errors='coerce')
+    multiplicador = sufijo.map(MULTIPLICADORES).fillna(1).astype('float64')
+    return (base * multiplicador).round().to_numpy(dtype='float64')
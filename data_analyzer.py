@@ -1,8 +1,16 @@
 # data_analyzer.py
+import os
+
 import pandas as pd
-import matplotlib.pyplot as plt
-from collections import Counter
-import numpy as np
+
+from digit_stats import DigitAccumulator
+from benford import BenfordReport, benford_report
+from storage import open_store
+
+# Filas por chunk en el modo streaming
+DEFAULT_CHUNKSIZE = 100_000
+# Nombres aceptados para la columna de seguidores (el segundo por compatibilidad)
+FOLLOWER_COLUMNS = ('seguidores', 'followers_count')
 
 
 class DataAnalyzer:
@@ -11,61 +19,27 @@ class DataAnalyzer:
     def __init__(self, input_file_path):
         self.input_file_path = input_file_path
         self.df = pd.DataFrame()
+        self.report: BenfordReport | None = None
 
-    def _convert_count_to_numeric(self, count_val):
-        """Intenta convertir el conteo (que puede tener K, M, o puntos/comas) a un número entero."""
-        # Si ya es un número, retornarlo directamente
-        if isinstance(count_val, (int, float)):
-            if pd.isna(count_val):
-                return np.nan
-            return int(count_val) if count_val > 0 else np.nan
-        
-        # Si es NaN o None
-        if pd.isna(count_val) or count_val is None:
-            return np.nan
-        
-        # Convertir a string para procesar
-        if not isinstance(count_val, str):
-            try:
-                count_val = str(count_val)
-            except:
-                return np.nan
-
-        s = count_val.upper().replace(',', '').strip()
-
-        # Si contiene valores especiales, retornar NaN
-        if any(x in s for x in ['PRIVADA', 'NO_EXISTE', 'NO_ENCONTRADO', 'TIMEOUT', 'ERROR']):
-            return np.nan
-
-        if 'K' in s:
-            try:
-                return int(float(s.replace('K', '')) * 1000)
-            except:
-                return np.nan
-        if 'M' in s:
-            try:
-                return int(float(s.replace('M', '')) * 1000000)
-            except:
-                return np.nan
-
-        # Eliminar cualquier punto residual que no haya sido manejado por K/M
-        s = s.replace('.', '')
-
-        try:
-            return int(s) if s else np.nan
-        except ValueError:
-            return np.nan  # Retorna NaN para valores inválidos
+    def _follower_column(self, store) -> str:
+        """Nombre de la columna de seguidores en el archivo (acepta el nombre antiguo)."""
+        available = store.columns()
+        column = next((c for c in FOLLOWER_COLUMNS if c in available), None)
+        if column is None:
+            raise ValueError("No se encontró la columna 'seguidores' en el archivo.")
+        return column
 
     def clean_and_prepare_data(self):
-        """Lee el archivo (CSV o XLSX), elimina filas no numéricas y prepara los datos."""
+        """Lee el archivo (Parquet, SQLite, CSV o XLSX), elimina filas no numéricas y prepara los datos."""
+        store = open_store(self.input_file_path)
         try:
-            # Detectar formato y leer
-            if self.input_file_path.endswith('.xlsx'):
-                self.df = pd.read_excel(self.input_file_path, engine='openpyxl')
-                print(f"Leídos {len(self.df)} registros del archivo XLSX.")
-            else:
-                self.df = pd.read_csv(self.input_file_path)
-                print(f"Leídos {len(self.df)} registros del archivo CSV.")
+            if not store.exists():
+                raise FileNotFoundError(self.input_file_path)
+            # Leer solo las columnas necesarias para el análisis
+            column = self._follower_column(store)
+            wanted = [c for c in ('username', column) if c in store.columns()]
+            self.df = store.read(columns=wanted)
+            print(f"Leídos {len(self.df)} registros de '{self.input_file_path}'.")
         except FileNotFoundError:
             print(f"❌ Error: Archivo '{self.input_file_path}' no encontrado.")
             return
@@ -73,75 +47,151 @@ class DataAnalyzer:
             print(f"❌ Error al leer el archivo: {e}")
             return
 
-        # Verificar que existe la columna de seguidores
-        if 'seguidores' not in self.df.columns:
-            # Intentar con el nombre antiguo por compatibilidad
-            if 'followers_count' in self.df.columns:
-                self.df['seguidores'] = self.df['followers_count']
-            else:
-                print("❌ Error: No se encontró la columna 'seguidores' en el archivo.")
-                return
+        # Compatibilidad con el nombre antiguo de la columna
+        if column != 'seguidores':
+            self.df['seguidores'] = self.df[column]
 
-        # Aplicar la limpieza
-        self.df['followers_numeric'] = self.df['seguidores'].apply(self._convert_count_to_numeric)
+        # El almacén ya entrega los conteos como Int64 (<NA> en perfiles sin conteo)
+        self.df['followers_numeric'] = self.df['seguidores']
 
         # Filtrar las filas con conteos válidos (> 0)
         self.df.dropna(subset=['followers_numeric'], inplace=True)
         self.df = self.df[self.df['followers_numeric'] > 0]
 
-        self.df['followers_numeric'] = self.df['followers_numeric'].astype(int)
+        self.df['followers_numeric'] = self.df['followers_numeric'].astype('int64')
 
         print(f"✅ Limpieza completada. Quedan **{len(self.df)}** registros válidos para el análisis.")
 
+    # --- Modo streaming (memoria constante) ---
+
+    def _iter_follower_chunks(self, chunksize: int):
+        """Lee solo la columna de seguidores del archivo (Int64), en chunks de tamaño fijo."""
+        store = open_store(self.input_file_path)
+        if not store.exists():
+            raise FileNotFoundError(self.input_file_path)
+        column = self._follower_column(store)
+        for chunk in store.iter_chunks(columns=[column], chunksize=chunksize):
+            yield chunk[column]
+
+    def digit_counts(self, chunksize: int = DEFAULT_CHUNKSIZE,
+                     incremental: bool = False) -> tuple[DigitAccumulator, int]:
+        """
+        Histogramas de dígitos del archivo leído por chunks y cuántas filas se leyeron. Con
+        incremental parte del estado guardado del análisis anterior (ver digit_state.py) y solo
+        lee las filas nuevas o cambiadas. Los errores de lectura se propagan.
+        """
+        if incremental:
+            from digit_state import DigitState, digit_state_path
+
+            store = open_store(self.input_file_path)
+            if not store.exists():
+                raise FileNotFoundError(self.input_file_path)
+            state = DigitState(digit_state_path(self.input_file_path))
+            try:
+                return state.refresh(self.input_file_path, self._follower_column(store), chunksize)
+            finally:
+                state.close()
+
+        accumulator = DigitAccumulator()
+        for chunk in self._iter_follower_chunks(chunksize):
+            accumulator.update(chunk)
+        return accumulator, accumulator.rows
+
+    def stream_digit_counts(self, chunksize: int = DEFAULT_CHUNKSIZE) -> DigitAccumulator | None:
+        """Procesa el archivo por chunks y devuelve solo los histogramas y contadores acumulados."""
+        try:
+            accumulator, _ = self.digit_counts(chunksize)
+        except FileNotFoundError:
+            print(f"❌ Error: Archivo '{self.input_file_path}' no encontrado.")
+            return None
+        except Exception as e:
+            print(f"❌ Error al leer el archivo: {e}")
+            return None
+
+        print(f"Leídos {accumulator.rows} registros en modo streaming. "
+              f"✅ **{accumulator.valid}** registros válidos para el análisis.")
+        return accumulator
+
+    def incremental_digit_counts(self, chunksize: int = DEFAULT_CHUNKSIZE) -> tuple[DigitAccumulator | None, int]:
+        """
+        Como stream_digit_counts, pero partiendo del estado guardado del análisis anterior
+        (ver digit_state.py): solo se leen las filas nuevas o cambiadas. Devuelve también
+        cuántas filas se leyeron (0 = sin cambios desde el último análisis).
+        """
+        try:
+            accumulator, read = self.digit_counts(chunksize, incremental=True)
+        except FileNotFoundError:
+            print(f"❌ Error: Archivo '{self.input_file_path}' no encontrado.")
+            return None, 0
+        except Exception as e:
+            print(f"❌ Error al leer el archivo: {e}")
+            return None, 0
+
+        if not read:
+            print(f"♻️ Sin cambios desde el último análisis: {accumulator.rows} registros (estado guardado).")
+        elif read < accumulator.rows:
+            print(f"♻️ Análisis incremental: {read} registros nuevos o cambiados de {accumulator.rows}.")
+        else:
+            print(f"Leídos {accumulator.rows} registros en modo streaming.")
+        print(f"✅ **{accumulator.valid}** registros válidos para el análisis.")
+        return accumulator, read
+
+    def analyze_streaming(self, graph_filename: str, chunksize: int = DEFAULT_CHUNKSIZE,
+                          incremental: bool = False):
+        """
+        Análisis del primer dígito con memoria constante, sin construir self.df.
+
+        Con incremental=True se reutiliza el estado del análisis anterior y el gráfico solo se
+        regenera si los datos cambiaron (o si falta).
+        """
+        if incremental:
+            accumulator, read = self.incremental_digit_counts(chunksize)
+        else:
+            accumulator, read = self.stream_digit_counts(chunksize), None
+        if accumulator is None:
+            return None
+        if not accumulator.valid:
+            print("⚠️ No hay datos limpios para analizar.")
+            return accumulator
+
+        self.report = self._print_report(accumulator)
+        if read != 0 or not os.path.exists(graph_filename):
+            self._create_benford_plot(accumulator.first_digit_frequencies(), graph_filename)
+        else:
+            print(f"📸 Gráfico de Benford sin cambios: **{graph_filename}**")
+        return accumulator
+
     def analyze_and_plot_first_digit(self, graph_filename: str):
         """Saca el primer dígito, calcula frecuencias y grafica la Ley de Benford."""
         if self.df.empty:
             print("⚠️ No hay datos limpios para analizar.")
             return
 
-        # Sacar el primer dígito de la izquierda
-        self.df['first_digit'] = self.df['followers_numeric'].astype(str).str[0].astype(int)
-
-        # Conteo de cada dígito (1 al 9)
-        digit_counts = self.df['first_digit'].value_counts().sort_index()
-        total_count = digit_counts.sum()
-        frequencies = (digit_counts / total_count) * 100
-
-        print("\n--- Resultados del Análisis del Primer Dígito ---")
-        print(frequencies)
+        # Histogramas de dígitos por aritmética entera (sin convertir a texto)
+        accumulator = DigitAccumulator().update(self.df['followers_numeric'].to_numpy())
+        self.report = self._print_report(accumulator)
 
         # Gráfico
-        self._create_benford_plot(frequencies, graph_filename)
-
-    def _create_benford_plot(self, frequencies: pd.Series, filename: str):
-        """Genera y guarda el gráfico de Benford."""
+        self._create_benford_plot(accumulator.first_digit_frequencies(), graph_filename)
 
-        # Distribución teórica de Benford (%)
-        benford_data = {
-            1: 30.1, 2: 17.6, 3: 12.5, 4: 9.7, 5: 7.9,
-            6: 6.7, 7: 5.8, 8: 5.1, 9: 4.6
-        }
-        benford_df = pd.Series(benford_data)
+    def _print_report(self, accumulator: DigitAccumulator) -> BenfordReport:
+        """Ejecuta la batería de pruebas de Benford e imprime frecuencias y veredictos."""
+        report = benford_report(accumulator)
 
-        # Asegurar que el índice coincida (1-9)
-        frequencies = frequencies.reindex(range(1, 10), fill_value=0)
-
-        plt.figure(figsize=(10, 6))
-
-        # Gráfico de barras de las frecuencias reales
-        plt.bar(frequencies.index, frequencies.values, color='teal', alpha=0.7, label='Frecuencia Real')
+        print("\n--- Resultados del Análisis del Primer Dígito ---")
+        print(accumulator.first_digit_frequencies())
 
-        # Gráfico de línea de la Ley de Benford
-        plt.plot(benford_df.index, benford_df.values, marker='o', linestyle='--', color='red',
-                 label='Ley de Benford Teórica')
+        print("\n--- Pruebas de Conformidad (Benford) ---")
+        print(report.summary())
+        first = report.first_digit
+        if first.n:
+            veredicto = "✅ Conforme" if first.conforms else "⚠️ No conforme"
+            print(f"{veredicto} con la Ley de Benford (primer dígito, {first.mad_conformity}).")
+        return report
 
-        plt.title('Distribución del Primer Dígito de Seguidores (Análisis de Benford)')
-        plt.xlabel('Primer Dígito (1 al 9)')
-        plt.ylabel('Frecuencia (%)')
-        plt.xticks(range(1, 10))
-        plt.grid(axis='y', linestyle='--')
-        plt.legend()
-        plt.tight_layout()
+    def _create_benford_plot(self, frequencies: pd.Series, filename: str):
+        """Genera y guarda el gráfico de Benford (plantilla de figura reutilizable, sin pyplot)."""
+        from report_renderer import render_benford_chart
 
-        plt.savefig(filename)
-        print(f"📸 Gráfico de Benford guardado en: **{filename}**")
\ No newline at end of file
+        render_benford_chart(frequencies, filename)
+        print(f"📸 Gráfico de Benford guardado en: **{filename}**")
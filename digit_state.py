@@ -0,0 +1,150 @@
+# digit_state.py
+# Estado persistente del análisis de dígitos de un archivo de datos de la Fase 2: histogramas y
+# contadores ya calculados junto a una marca de lo procesado, en un SQLite al lado del archivo.
+# Un nuevo análisis solo lee lo que cambió desde la marca:
+#   - archivo sin cambios (mismo tamaño y fecha): no se lee nada;
+#   - salida SQLite: solo las filas con secuencia posterior a la marca (ver SQLiteStore), restando
+#     la contribución anterior de los perfiles reemplazados;
+#   - resto de formatos (se reescriben enteros en cada Fase 2): se vuelve a recorrer el archivo.
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from digit_stats import DigitAccumulator
+
+# Versión del formato del estado; si cambia, el estado se reconstruye
+VERSION_ESTADO = "1"
+
+
+def digit_state_path(data_path: str) -> str:
+    """Archivo del estado del análisis de un archivo de datos de la Fase 2."""
+    return f"{data_path}.digits.sqlite"
+
+
+class DigitState:
+    """
+    Histogramas de dígitos de un archivo de datos persistidos en SQLite.
+
+    Para las salidas SQLite guarda además el conteo que aportó cada username (tabla valores),
+    que es lo que se resta cuando ese perfil se vuelve a extraer con otro conteo.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        with self.conn:
+            self.conn.executescript(
+                "CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT NOT NULL);"
+                "CREATE TABLE IF NOT EXISTS histogramas (nombre TEXT PRIMARY KEY, conteos BLOB NOT NULL);"
+                "CREATE TABLE IF NOT EXISTS valores (username TEXT PRIMARY KEY, seguidores INTEGER) WITHOUT ROWID;"
+            )
+
+    @staticmethod
+    def _source_signature(data_path: str) -> str:
+        stat = os.stat(data_path)
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    def _meta(self) -> dict[str, str]:
+        return dict(self.conn.execute("SELECT clave, valor FROM meta"))
+
+    def load(self) -> DigitAccumulator | None:
+        """Acumulador guardado (None si todavía no hay estado)."""
+        meta = self._meta()
+        if meta.get('version') != VERSION_ESTADO:
+            return None
+        accumulator = DigitAccumulator()
+        for name, blob in self.conn.execute("SELECT nombre, conteos FROM histogramas"):
+            getattr(accumulator, name)[:] = np.frombuffer(blob, dtype=np.int64)
+        for name in DigitAccumulator.COUNTERS:
+            setattr(accumulator, name, int(meta.get(name, 0)))
+        return accumulator
+
+    def _save(self, accumulator: DigitAccumulator, **meta):
+        """Guarda histogramas, contadores y marcas (dentro de la transacción en curso)."""
+        self.conn.executemany("INSERT OR REPLACE INTO histogramas VALUES (?, ?)",
+                              [(name, getattr(accumulator, name).astype(np.int64).tobytes())
+                               for name in DigitAccumulator.HISTOGRAM_SIZES])
+        meta.update({name: getattr(accumulator, name) for name in DigitAccumulator.COUNTERS},
+                    version=VERSION_ESTADO)
+        self.conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                              [(key, str(value)) for key, value in meta.items()])
+
+    def refresh(self, data_path: str, column: str = 'seguidores',
+                chunksize: int = 100_000) -> tuple[DigitAccumulator, int]:
+        """
+        Pone el estado al día con el archivo de datos y devuelve (acumulador, filas leídas).
+        Cero filas leídas significa que el resultado no cambió desde el análisis anterior.
+        """
+        from storage import SQLiteStore, open_store
+
+        store = open_store(data_path)
+        if not store.exists():
+            raise FileNotFoundError(data_path)
+        signature = self._source_signature(data_path)
+        meta = self._meta()
+        accumulator = self.load()
+        same_source = accumulator is not None and meta.get('columna') == column
+
+        if same_source and meta.get('fuente') == signature:
+            return accumulator, 0
+        if (same_source and isinstance(store, SQLiteStore) and column == 'seguidores'
+                and 'marca' in meta and meta.get('generacion') == str(store.generation())):
+            return self._refresh_sqlite(store, accumulator, int(meta['marca']), signature)
+        return self._rebuild(store, column, chunksize, signature)
+
+    def _refresh_sqlite(self, store, accumulator: DigitAccumulator, mark: int,
+                        signature: str) -> tuple[DigitAccumulator, int]:
+        """Solo las filas posteriores a la marca: resta el conteo anterior de cada perfil y suma el nuevo."""
+        changes = store.changes_since(mark, columns=['username', 'seguidores'])
+        if len(changes):
+            # Último registro de cada username (las filas ya vienen ordenadas por secuencia)
+            changes = changes.drop_duplicates('username', keep='last')
+            previous = self._previous_values(changes['username'].tolist())
+            accumulator.subtract(DigitAccumulator().update(previous))
+            accumulator.update(changes['seguidores'])
+            mark = int(changes['seq'].max())
+        with self.conn:
+            self._save_values(changes)
+            self._save(accumulator, fuente=signature, marca=mark)
+        return accumulator, len(changes)
+
+    def _previous_values(self, usernames: list[str]) -> pd.Series:
+        """Conteos guardados de los usernames que ya estaban analizados (Int64, <NA> = sin conteo)."""
+        values = []
+        for start in range(0, len(usernames), 500):
+            batch = usernames[start:start + 500]
+            values.extend(row[0] for row in self.conn.execute(
+                f"SELECT seguidores FROM valores WHERE username IN ({', '.join('?' * len(batch))})", batch))
+        return pd.Series(values, dtype='Int64')
+
+    def _save_values(self, frame: pd.DataFrame):
+        values = frame['seguidores'].astype(object).where(frame['seguidores'].notna(), None)
+        self.conn.executemany("INSERT OR REPLACE INTO valores VALUES (?, ?)", zip(frame['username'], values))
+
+    def _rebuild(self, store, column: str, chunksize: int, signature: str) -> tuple[DigitAccumulator, int]:
+        """Recorre el archivo completo; en SQLite guarda también los conteos por username y la marca."""
+        from storage import SQLiteStore
+
+        sqlite_source = isinstance(store, SQLiteStore) and column == 'seguidores'
+        columns = ['username', column] if sqlite_source else [column]
+        meta = dict(fuente=signature, columna=column)
+        if sqlite_source:
+            # Marca tomada antes de leer: lo que se inserte durante la lectura se vuelve a leer la
+            # próxima vez (su conteo ya estará en valores y se restará antes de sumarlo de nuevo)
+            meta.update(marca=store.watermark(), generacion=store.generation())
+
+        accumulator = DigitAccumulator()
+        with self.conn:
+            self.conn.execute("DELETE FROM valores")
+            self.conn.execute("DELETE FROM meta")
+            for chunk in store.iter_chunks(columns=columns, chunksize=chunksize):
+                accumulator.update(chunk[column])
+                if sqlite_source:
+                    self._save_values(chunk)
+            self._save(accumulator, **meta)
+        return accumulator, accumulator.rows
+
+    def close(self):
+        self.conn.close()
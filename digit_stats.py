@@ -0,0 +1,108 @@
+# digit_stats.py
+import numpy as np
+import pandas as pd
+
+
+def _exponents(values: np.ndarray) -> np.ndarray:
+    """Exponente decimal (número de dígitos - 1) de cada entero positivo."""
+    exponent = np.floor(np.log10(values)).astype(np.int64)
+    power = 10 ** exponent
+    # Corregir errores de redondeo de log10 cerca de potencias de 10
+    exponent -= values < power
+    exponent += values // 10 >= power
+    return exponent
+
+
+def first_digits(values: np.ndarray) -> np.ndarray:
+    """Primer dígito de cada entero positivo usando aritmética (sin convertir a texto)."""
+    values = np.asarray(values, dtype=np.int64)
+    return values // 10 ** _exponents(values)
+
+
+def digit_histograms(values: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Histogramas de primer dígito, segundo dígito, dos primeros y dos últimos dígitos en una pasada.
+
+    El segundo dígito y los dos primeros solo cuentan valores >= 10; los dos últimos,
+    valores >= 100 (para no solaparse con los primeros dígitos).
+    """
+    values = np.asarray(values, dtype=np.int64)
+    exponent = _exponents(values)
+
+    first = values // 10 ** exponent
+    two_or_more = exponent >= 1
+    first_two = values[two_or_more] // 10 ** (exponent[two_or_more] - 1)
+    last_two = values[exponent >= 2] % 100
+
+    return {
+        'first_digit': np.bincount(first, minlength=10),
+        'second_digit': np.bincount(first_two % 10, minlength=10),
+        'first_two_digits': np.bincount(first_two, minlength=100),
+        'last_two_digits': np.bincount(last_two, minlength=100),
+    }
+
+
+class DigitAccumulator:
+    """Histogramas de dígitos y contadores acumulados por chunks; se pueden combinar entre sí."""
+
+    HISTOGRAM_SIZES = {'first_digit': 10, 'second_digit': 10, 'first_two_digits': 100, 'last_two_digits': 100}
+    COUNTERS = ('rows', 'valid', 'non_numeric', 'non_positive')
+
+    def __init__(self):
+        self.first_digit = np.zeros(10, dtype=np.int64)
+        self.second_digit = np.zeros(10, dtype=np.int64)
+        self.first_two_digits = np.zeros(100, dtype=np.int64)
+        self.last_two_digits = np.zeros(100, dtype=np.int64)
+        self.rows = 0
+        self.valid = 0
+        self.non_numeric = 0
+        self.non_positive = 0
+
+    def update(self, numeric_values) -> "DigitAccumulator":
+        """
+        Agrega un chunk de conteos: una columna entera (Int64, <NA> = sin conteo) se procesa
+        en int64 directamente; cualquier otro valor se trata como número (NaN = no numérico).
+        """
+        if isinstance(numeric_values, pd.Series) and pd.api.types.is_integer_dtype(numeric_values.dtype):
+            present = numeric_values.notna().to_numpy()
+            values = numeric_values.to_numpy(dtype=np.int64, na_value=0)
+            positive = present & (values >= 1)
+        else:
+            values = np.asarray(numeric_values, dtype=np.float64)
+            present = np.isfinite(values)
+            positive = present & (values >= 1)
+
+        self.rows += len(values)
+        self.non_numeric += int((~present).sum())
+        self.non_positive += int((present & ~positive).sum())
+
+        valid_values = values[positive].astype(np.int64, copy=False)
+        self.valid += len(valid_values)
+        if len(valid_values):
+            for name, counts in digit_histograms(valid_values).items():
+                getattr(self, name)[:] += counts
+        return self
+
+    def merge(self, other: "DigitAccumulator", sign: int = 1) -> "DigitAccumulator":
+        """Suma los resultados parciales de otro acumulador (otro chunk u otro archivo); con sign=-1 los resta."""
+        for name in self.HISTOGRAM_SIZES:
+            getattr(self, name)[:] += sign * getattr(other, name)
+        for name in self.COUNTERS:
+            setattr(self, name, getattr(self, name) + sign * getattr(other, name))
+        return self
+
+    def subtract(self, other: "DigitAccumulator") -> "DigitAccumulator":
+        """Quita la contribución de otro acumulador (p. ej. los valores anteriores de filas que cambiaron)."""
+        return self.merge(other, sign=-1)
+
+    def __iadd__(self, other):
+        return self.merge(other)
+
+    def __add__(self, other):
+        return DigitAccumulator().merge(self).merge(other)
+
+    def first_digit_frequencies(self) -> pd.Series:
+        """Frecuencias (%) del primer dígito, indexadas del 1 al 9."""
+        counts = pd.Series(self.first_digit[1:], index=range(1, 10))
+        total = counts.sum()
+        return (counts / total) * 100 if total else counts.astype(float)
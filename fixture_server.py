@@ -0,0 +1,455 @@
+# fixture_server.py
+# Servidor HTTP local que imita las páginas de Instagram que usa el programa (login, perfil,
+# modal de seguidos, cuenta privada, perfil inexistente) y arnés para medir las tres fases sin red.
+import argparse
+import html
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURE_SESSION_ID = "fixture-session"
+ELEMENTOS_POR_PAGINA_MODAL = 12
+
+_BIO_WORDS = ["café", "viajes", "fotografía", "música", "diseño", "montaña", "libros", "cocina",
+              "arte", "mar", "ciencia", "yoga", "cine", "poesía", "deporte", "familia"]
+
+
+def _display_count(value: int) -> str:
+    """Conteo tal como lo muestra la interfaz en español: 1.234 / 12,3 mil / 1,2 mill."""
+    if value < 10_000:
+        return f"{value:,}".replace(',', '.')
+    if value < 1_000_000:
+        return f"{value / 1_000:.1f}".replace('.', ',') + " mil"
+    return f"{value / 1_000_000:.1f}".replace('.', ',') + " mill."
+
+
+class FixtureSite:
+    """Datos del sitio simulado: perfiles ({username: datos}) y listas de seguidos."""
+
+    def __init__(self, target: str, profiles: dict, following: dict):
+        self.target = target
+        self.profiles = profiles
+        self.following = following
+
+    def expected_record(self, username: str) -> "ProfileRecord":
+        """Registro que debería producir la Fase 2 para un perfil (según lo que muestra la página)."""
+        from count_parser import parse_count
+        from profile_record import ProfileRecord, ProfileStatus
+
+        profile = self.profiles.get(username)
+        if profile is None:
+            return ProfileRecord.failed(username, ProfileStatus.NO_EXISTE)
+        if profile['private']:
+            return ProfileRecord.failed(username, ProfileStatus.PRIVADA)
+        return ProfileRecord.from_counts(username, parse_count(_display_count(profile['followers'])),
+                                         parse_count(_display_count(profile['following'])), profile['bio'])
+
+
+def synthetic_site(target: str = "fixture.objetivo", following: int = 100, seed: int = 0,
+                   private_ratio: float = 0.05, missing_ratio: float = 0.02) -> FixtureSite:
+    """Sitio sintético reproducible: conteos log-uniformes (cumplen Benford), algunas privadas e inexistentes."""
+    rng = random.Random(seed)
+    usernames = [f"usuario_{i:05d}" for i in range(following)]
+    profiles = {target: {'followers': 1_234, 'following': following, 'bio': "Cuenta objetivo de prueba",
+                         'private': False}}
+
+    for username in usernames:
+        roll = rng.random()
+        if roll < missing_ratio:
+            continue  # Aparece en la lista pero su perfil ya no existe
+        profiles[username] = {
+            'followers': int(10 ** rng.uniform(1, 7)),
+            'following': int(10 ** rng.uniform(1, 3.5)),
+            'bio': " ".join(rng.sample(_BIO_WORDS, 3)).capitalize(),
+            'private': roll < missing_ratio + private_ratio,
+        }
+    return FixtureSite(target, profiles, {target: usernames})
+
+
+# --- Plantillas (mismas estructuras que buscan los selectores del programa) ---
+
+_LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Iniciar sesión</title></head><body>
+<form method="post" action="/accounts/login/">
+  <input name="username" type="text">
+  <input name="password" type="password">
+  <button type="submit"><div>Iniciar sesión</div></button>
+</form>
+</body></html>"""
+
+# Pop-ups post-login: aparecen con retraso y el segundo solo tras cerrar el primero
+_FEED_PAGE = """<!DOCTYPE html>
+<html><head><title>Inicio</title></head><body>
+<header><nav>Inicio</nav></header>
+<main id="feed"></main>
+<script>
+const delay = %(render_delay)d;
+function popup(title, onClose) {
+    const dialog = document.createElement('div');
+    dialog.setAttribute('role', 'dialog');
+    dialog.innerHTML = '<div>' + title + '</div><div><button>Ahora no</button></div>';
+    dialog.querySelector('button').addEventListener('click', () => { dialog.remove(); onClose(); });
+    document.body.appendChild(dialog);
+}
+if (%(show_popups)s) {
+    setTimeout(() => popup('Guardar información', () => setTimeout(
+        () => popup('Activar notificaciones', () => {}), delay)), delay);
+}
+</script>
+</body></html>"""
+
+_PROFILE_PAGE = """<!DOCTYPE html>
+<html><head>
+<title>@%(username)s</title>
+<meta property="og:description" content="%(meta)s">
+</head><body>
+<header><section>
+  <h2>%(username)s</h2>
+  <div id="stats"></div>
+  <div class="_aacl"><span>%(bio)s</span></div>
+</section></header>
+<script type="application/json" id="datos-visitante">%(viewer)s</script>
+<script type="application/json" id="sugeridas">%(suggested)s</script>
+<script type="application/json" id="datos-perfil">%(data)s</script>
+<script>
+// Los conteos se renderizan con retraso, como en la aplicación real
+setTimeout(() => {
+    document.getElementById('stats').innerHTML = `%(stats)s`;
+    const link = document.querySelector('a[href$="/following/"]');
+    link.addEventListener('click', event => { event.preventDefault(); openFollowing(); });
+}, %(render_delay)d);
+
+function openFollowing() {
+    if (document.querySelector('[role="dialog"]')) return;
+    const dialog = document.createElement('div');
+    dialog.setAttribute('role', 'dialog');
+    dialog.innerHTML = '<div style="height: 400px;"><div style="overflow-y: scroll; height: 400px; width: 320px;">'
+        + '<div id="items"></div></div></div>';
+    document.body.appendChild(dialog);
+    const scroller = dialog.querySelector('div[style*="overflow"]');
+    const items = dialog.querySelector('#items');
+    let offset = 0, loading = false, done = false;
+
+    function loadMore() {
+        if (loading || done) return;
+        loading = true;
+        fetch('/api/following/%(username)s/?offset=' + offset)
+            .then(response => response.json())
+            .then(batch => {
+                for (const name of batch) {
+                    const row = document.createElement('div');
+                    row.style.padding = '12px';
+                    row.innerHTML = '<a href="/' + name + '/">' + name + '</a>';
+                    items.appendChild(row);
+                }
+                offset += batch.length;
+                done = batch.length === 0;
+                loading = false;
+            });
+    }
+    scroller.addEventListener('scroll', () => {
+        if (scroller.scrollTop + scroller.clientHeight >= scroller.scrollHeight - 50) loadMore();
+    });
+    setTimeout(loadMore, %(render_delay)d);
+}
+</script>
+</body></html>"""
+
+_STATS = """<ul>
+  <li><span>%(posts)s</span> publicaciones</li>
+  <li><a href="/%(username)s/followers/"><span>%(followers)s</span> seguidores</a></li>
+  <li><a href="/%(username)s/following/"><span>%(following)s</span> seguidos</a></li>
+</ul>"""
+
+_PRIVATE_PAGE = """<!DOCTYPE html>
+<html><head><title>@%(username)s</title></head><body>
+<header><section><h2>%(username)s</h2></section></header>
+<main><h2>Esta cuenta es privada</h2></main>
+<script type="application/json" id="datos-perfil">{"username": "%(username)s", "is_private": true}</script>
+</body></html>"""
+
+_NOT_FOUND_PAGE = """<!DOCTYPE html>
+<html><head><title>Página no encontrada</title></head><body>
+<header><nav>Inicio</nav></header>
+<main><h2>Sorry, this page isn't available.</h2></main>
+</body></html>"""
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    """Atiende las rutas del sitio simulado (self.server es un _FixtureHTTPServer)."""
+
+    def log_message(self, format, *args):
+        pass  # Sin log por petición: ensuciaría las mediciones
+
+    def _session_cookie(self) -> str | None:
+        cookie = SimpleCookie(self.headers.get('Cookie', ''))
+        return cookie['sessionid'].value if 'sessionid' in cookie else None
+
+    def _send(self, status: int, body: str, content_type="text/html; charset=utf-8", headers=()):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _redirect(self, location: str, headers=()):
+        self.send_response(302)
+        self.send_header('Location', location)
+        self.send_header('Content-Length', '0')
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+
+    def do_GET(self):
+        self.server.record_request('GET')
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split('/') if part]
+
+        if not parts:
+            if self._session_cookie() != FIXTURE_SESSION_ID:
+                return self._redirect('/accounts/login/')
+            show_popups = 'true' if parse_qs(url.query).get('nuevo') else 'false'
+            return self._send(200, _FEED_PAGE % {'render_delay': self.server.render_delay_ms,
+                                                 'show_popups': show_popups})
+        if parts[:2] == ['accounts', 'login']:
+            return self._send(200, _LOGIN_PAGE)
+        if parts[:2] == ['api', 'following'] and len(parts) >= 3:
+            return self._following_batch(parts[2], parse_qs(url.query))
+        return self._profile(parts[0])
+
+    def do_POST(self):
+        self.server.record_request('POST')
+        if urlparse(self.path).path.rstrip('/') != '/accounts/login':
+            return self._send(404, _NOT_FOUND_PAGE)
+        length = int(self.headers.get('Content-Length', 0))
+        form = parse_qs(self.rfile.read(length).decode('utf-8'))
+        if not form.get('username') or not form.get('password'):
+            return self._send(200, _LOGIN_PAGE)
+        cookie = ('Set-Cookie', f"sessionid={FIXTURE_SESSION_ID}; Path=/")
+        return self._redirect('/?nuevo=1', headers=[cookie])
+
+    def _following_batch(self, username: str, query: dict):
+        following = self.server.site.following.get(username, [])
+        offset = int(query.get('offset', ['0'])[0])
+        batch = following[offset:offset + ELEMENTOS_POR_PAGINA_MODAL]
+        return self._send(200, json.dumps(batch), content_type='application/json')
+
+    def _profile(self, username: str):
+        profile = self.server.site.profiles.get(username)
+        if profile is None:
+            return self._send(404, _NOT_FOUND_PAGE)
+        if profile['private']:
+            return self._send(200, _PRIVATE_PAGE % {'username': html.escape(username)})
+
+        following = len(self.server.site.following.get(username, [])) or profile['following']
+        values = {
+            'username': html.escape(username),
+            'followers': _display_count(profile['followers']),
+            'following': _display_count(following),
+            'posts': profile['followers'] % 500,
+        }
+        page = _PROFILE_PAGE % {
+            'username': values['username'],
+            'bio': html.escape(profile['bio']),
+            'meta': f"{values['followers']} seguidores, {values['following']} seguidos, "
+                    f"{values['posts']} publicaciones",
+            # Como en la página real, hay JSON de otras cuentas (sesión iniciada y sugeridas) con
+            # sus propios conteos y privacidad: el parser solo debe usar el del perfil
+            'viewer': json.dumps({'viewer': {'username': "fixture_user", 'is_private': True,
+                                             'follower_count': 7, 'following_count': 3}}),
+            'suggested': json.dumps({'edges': [{'node': {'username': f"sugerida_{n}", 'is_private': n % 2 == 0,
+                                                         'edge_followed_by': {'count': 1_000 + n}}}
+                                               for n in range(3)]}),
+            'data': html.escape(json.dumps({'username': username, 'biography': profile['bio'], 'is_private': False}),
+                                quote=False),
+            'stats': _STATS % values,
+            'render_delay': self.server.render_delay_ms,
+        }
+        return self._send(200, page)
+
+
+class _FixtureHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, site: FixtureSite, latency: float, render_delay_ms: int):
+        super().__init__(address, _FixtureHandler)
+        self.site = site
+        self.latency = latency
+        self.render_delay_ms = render_delay_ms
+        self.requests = {'GET': 0, 'POST': 0}
+        self._lock = threading.Lock()
+
+    def record_request(self, method: str):
+        with self._lock:
+            self.requests[method] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+
+class FixtureServer:
+    """
+    Servidor local del sitio simulado en un hilo aparte.
+
+    `latency` añade un retardo fijo a cada respuesta (red) y `render_delay` retrasa el
+    renderizado de conteos, pop-ups y modal (JavaScript), para ejercitar las esperas.
+    """
+
+    def __init__(self, site: FixtureSite, host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0, render_delay: float = 0.2):
+        self._server = _FixtureHTTPServer((host, port), site, latency, int(render_delay * 1000))
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def requests(self) -> dict:
+        return dict(self._server.requests)
+
+    def start(self) -> str:
+        """Arranca el servidor y devuelve su URL base."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+            self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# --- Arnés de extremo a extremo ---
+
+def run_offline(following: int = 100, workers: int = 1, latency: float = 0.0, render_delay: float = 0.2,
+                headless: bool = True, seed: int = 0, output_format: str = "parquet",
+                workdir: str | None = None, overlap: bool = False) -> dict:
+    """
+    Ejecuta las Fases 1 -> 2 -> 3 contra el servidor local y devuelve tiempos y exactitud.
+
+    Trabaja en un directorio propio (cookies, caché, archivo de páginas y salidas no se
+    mezclan con los de una ejecución real) y sin pausas de ritmo, para medir solo el programa.
+    """
+    from main_app import ARCHIVO_RUTA_DRIVER, MainApp
+    from profile_record import ProfileRecord
+    from storage import open_store
+
+    site = synthetic_site(following=following, seed=seed)
+    workdir = workdir or tempfile.mkdtemp(prefix="fixture_run_")
+    previous_dir = os.getcwd()
+    # Reutilizar la ruta de ChromeDriver ya resuelta: el arnés debe funcionar sin red
+    if os.path.exists(ARCHIVO_RUTA_DRIVER):
+        shutil.copy(ARCHIVO_RUTA_DRIVER, os.path.join(workdir, ARCHIVO_RUTA_DRIVER))
+
+    with FixtureServer(site, latency=latency, render_delay=render_delay) as server:
+        os.chdir(workdir)
+        try:
+            # Con overlap, las Fases 1 y 2 se solapan (streaming de usernames hacia el pool)
+            app = MainApp("fixture_user", "fixture_pass", site.target, following, output_format=output_format,
+                          export_xlsx=False, resume=False, workers=workers, base_url=server.base_url,
+                          headless=headless, pacing=(0, 0), scroll_pacing=(0, 0), overlap=overlap)
+            # El proceso completo (opción 0), igual que desde el menú o la línea de comandos
+            app.run_phase(0)
+
+            store = open_store(app.output_data_file)
+            frame = store.read() if store.exists() else None
+        finally:
+            os.chdir(previous_dir)
+        requests = server.requests
+
+    # Duración de cada fase según las métricas de la ejecución ('fase_1', 'fase_2' o 'fase_1+2', 'fase_3')
+    timings = {f"fase_{dict(labels)['fase']}": seconds
+               for (name, labels), (_, seconds, _) in app.metrics.snapshot()['duraciones'].items() if name == 'fase'}
+    scraped = 0 if frame is None else len(frame)
+    scrape_seconds = timings.get('fase_1+2') or timings.get('fase_2')
+    correct = 0
+    if frame is not None:
+        for data in frame.to_dict('records'):
+            record, expected = ProfileRecord.from_dict(data), site.expected_record(data['username'])
+            correct += all(getattr(record, key) == getattr(expected, key) for key in ('seguidores', 'seguidos', 'estado'))
+
+    return {
+        'perfiles_lista': following,
+        'perfiles_procesados': scraped,
+        'perfiles_correctos': correct,
+        'navegadores': workers,
+        'latencia_red_s': latency,
+        'retardo_render_s': render_delay,
+        'tiempos_s': timings,
+        'fases_solapadas': overlap,
+        'perfiles_por_segundo': scraped / scrape_seconds if scraped and scrape_seconds else 0.0,
+        'segundos_por_perfil': scrape_seconds / scraped if scraped and scrape_seconds else 0.0,
+        'peticiones_http': requests,
+        'metricas': app.metrics.totals(),
+        'directorio': workdir,
+    }
+
+
+def _print_results(results: dict):
+    print("\n" + "=" * 40)
+    print("      🧪 RESULTADOS DEL ARNÉS OFFLINE")
+    print("=" * 40)
+    for phase, seconds in results['tiempos_s'].items():
+        print(f"  {phase}: {seconds:.2f} s")
+    print(f"  Perfiles: {results['perfiles_procesados']}/{results['perfiles_lista']} "
+          f"({results['perfiles_correctos']} con conteos correctos)")
+    scrape = 'Fases 1+2' if results['fases_solapadas'] else 'Fase 2'
+    print(f"  Rendimiento {scrape}: {results['perfiles_por_segundo']:.2f} perfiles/s "
+          f"({results['segundos_por_perfil']:.2f} s por perfil)")
+    print(f"  Peticiones HTTP: {results['peticiones_http']}")
+    print(f"  Archivos en: {results['directorio']}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Sitio local de pruebas y arnés de extremo a extremo sin red.")
+    parser.add_argument('--servir', action='store_true',
+                        help="Solo levantar el servidor (usar con python main_app.py completo --url-base <url>)")
+    parser.add_argument('--puerto', type=int, default=0)
+    parser.add_argument('--perfiles', type=int, default=100, help="Tamaño de la lista de seguidos simulada")
+    parser.add_argument('--navegadores', type=int, default=1)
+    parser.add_argument('--solapar', action='store_true', help="Solapar las Fases 1 y 2 (streaming de usernames)")
+    parser.add_argument('--latencia', type=float, default=0.0, help="Retardo de red por petición (s)")
+    parser.add_argument('--render', type=float, default=0.2, help="Retardo de renderizado en la página (s)")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--visible', action='store_true', help="Mostrar el navegador")
+    parser.add_argument('--json', help="Guardar los resultados en este archivo JSON")
+    args = parser.parse_args()
+
+    if args.servir:
+        fixture_site = synthetic_site(following=args.perfiles, seed=args.semilla)
+        server = FixtureServer(fixture_site, port=args.puerto, latency=args.latencia, render_delay=args.render)
+        print(f"🌐 Sitio de pruebas en {server.start()} (cuenta objetivo: {fixture_site.target}). Ctrl+C para salir.")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.stop()
+    else:
+        results = run_offline(following=args.perfiles, workers=args.navegadores, latency=args.latencia,
+                              render_delay=args.render, headless=not args.visible, seed=args.semilla,
+                              overlap=args.solapar)
+        _print_results(results)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as file:
+                json.dump(results, file, indent=2)
@@ -0,0 +1,446 @@
+# follower_history.py
+# Historial de conteos de seguidores/seguidos por perfil entre ejecuciones de la Fase 2, para
+# detectar saltos bruscos de seguidores.
+#
+# Cada captura representa el último conteo conocido de cada perfil en ese momento, con la fecha
+# en que se observó (una ejecución solo registra los perfiles que cargó, así que los demás
+# conservan su conteo y su fecha anteriores). Las capturas clave guardan el estado completo;
+# las demás solo la diferencia con su captura clave (perfiles nuevos, con otro conteo u
+# observados de nuevo): ids, conteos y fechas codificados como deltas en el entero más pequeño
+# que los contiene y comprimidos con np.savez_compressed. Reconstruir cualquier captura lee
+# como mucho dos archivos (su clave y su delta), así que las consultas entre dos fechas no
+# recorren todo el historial.
+#
+#   python follower_history.py registrar nayeli.nxx_profile_data.parquet --objetivo nayeli.nxx
+#   python follower_history.py cambios --desde 2026-10-01 --resultados 20
+#   python follower_history.py perfil usuario_1 usuario_2 --desde 2026-09-01
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Una captura clave cada tantas capturas, o antes si la diferencia ya ocupa esta fracción de la clave
+CAPTURAS_POR_CLAVE = 16
+FRACCION_MAXIMA_DELTA = 0.5
+# Conteo desconocido dentro de los arrays (p. ej. seguidos no encontrados); nunca sale en los resultados
+_SIN_CONTEO = -1
+# Valores de cada perfil en _Counts y su array en los .npz
+_ARRAYS = {'followers': 'seguidores', 'following': 'seguidos', 'observed': 'fechas'}
+_INT_TYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+def _compact(values: np.ndarray) -> np.ndarray:
+    """El array en el tipo entero más pequeño que contiene todos sus valores."""
+    if not len(values):
+        return values.astype(np.int8)
+    low, high = values.min(), values.max()
+    dtype = next(t for t in _INT_TYPES if np.iinfo(t).min <= low and high <= np.iinfo(t).max)
+    return values.astype(dtype)
+
+
+def _timestamp(value) -> float | None:
+    """Fecha como segundos epoch: acepta None, números, datetime y texto ISO ('2026-10-01', '2026-10-01 18:30')."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+class _Counts:
+    """
+    Último conteo conocido de cada perfil en una captura: ids ordenados, sus conteos y la fecha
+    (segundos epoch) en que se observaron, todo int64.
+    """
+
+    __slots__ = ('ids', 'followers', 'following', 'observed')
+
+    def __init__(self, ids: np.ndarray, followers: np.ndarray, following: np.ndarray, observed: np.ndarray):
+        self.ids = ids
+        self.followers = followers
+        self.following = following
+        self.observed = observed
+
+    @classmethod
+    def empty(cls) -> "_Counts":
+        return cls(*(np.empty(0, dtype=np.int64) for _ in range(4)))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def find(self, ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Posición de cada id en la captura y si está (las posiciones de los ausentes no valen)."""
+        positions = np.minimum(np.searchsorted(self.ids, ids), max(len(self.ids) - 1, 0))
+        found = self.ids[positions] == ids if len(self.ids) else np.zeros(len(ids), dtype=bool)
+        return positions, found
+
+    def merged(self, ids: np.ndarray, followers: np.ndarray, following: np.ndarray, observed: np.ndarray,
+               keep_known: bool = False) -> "_Counts":
+        """
+        Nueva captura con los conteos dados (ids ordenados) sobre esta. Con keep_known un conteo
+        desconocido no borra el último conocido.
+        """
+        all_ids = np.union1d(self.ids, ids)
+        merged = _Counts(all_ids, *(np.full(len(all_ids), _SIN_CONTEO, dtype=np.int64) for _ in range(3)))
+        old = np.searchsorted(all_ids, self.ids)
+        new = np.searchsorted(all_ids, ids)
+        for name, values in (('followers', followers), ('following', following), ('observed', observed)):
+            column = getattr(merged, name)
+            column[old] = getattr(self, name)
+            update = values != _SIN_CONTEO if keep_known else slice(None)
+            column[new[update]] = values[update]
+        return merged
+
+    def delta_from(self, key: "_Counts") -> dict[str, np.ndarray]:
+        """
+        Arrays de la diferencia con una captura clave: perfiles nuevos, con otro conteo u
+        observados de nuevo.
+        """
+        positions, found = key.find(self.ids)
+        base = {name: np.where(found, getattr(key, name)[positions], 0) for name in _ARRAYS}
+        changed = ~found
+        for name in _ARRAYS:
+            changed |= getattr(self, name) != base[name]
+        return {'ids': _compact(np.diff(self.ids[changed], prepend=0)),
+                **{column: _compact(getattr(self, name)[changed] - base[name][changed])
+                   for name, column in _ARRAYS.items()}}
+
+    def with_delta(self, arrays) -> "_Counts":
+        """Reconstruye la captura a partir de esta (su clave) y los arrays de delta_from."""
+        ids = np.cumsum(arrays['ids'], dtype=np.int64)
+        positions, found = self.find(ids)
+        values = [np.where(found, getattr(self, name)[positions], 0) + arrays[column].astype(np.int64)
+                  for name, column in _ARRAYS.items()]
+        return self.merged(ids, *values)
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """Arrays de una captura clave (ids como deltas)."""
+        return {'ids': _compact(np.diff(self.ids, prepend=0)),
+                **{column: _compact(getattr(self, name)) for name, column in _ARRAYS.items()}}
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "_Counts":
+        return cls(np.cumsum(arrays['ids'], dtype=np.int64),
+                   *(arrays[column].astype(np.int64) for column in _ARRAYS.values()))
+
+
+class FollowerHistory:
+    """
+    Serie temporal de conteos por perfil en disco: un índice SQLite (perfiles -> id numérico y
+    capturas con su fecha) y un archivo .npz comprimido por captura.
+    """
+
+    def __init__(self, root: str = "follower_history"):
+        self.root = root
+        os.makedirs(os.path.join(root, 'capturas'), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(root, 'index.sqlite'), timeout=30)
+        with self.conn:
+            self.conn.executescript(
+                "CREATE TABLE IF NOT EXISTS perfiles (id INTEGER PRIMARY KEY, username TEXT UNIQUE NOT NULL);"
+                "CREATE TABLE IF NOT EXISTS capturas ("
+                " id INTEGER PRIMARY KEY, fecha REAL NOT NULL, objetivo TEXT, clave INTEGER NOT NULL,"
+                " observados INTEGER NOT NULL, perfiles INTEGER NOT NULL, filas INTEGER NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS idx_capturas_fecha ON capturas (fecha);"
+            )
+        self._key_cache = {}  # Última captura clave leída: {id: _Counts}
+
+    def _capture_path(self, capture_id: int) -> str:
+        return os.path.join(self.root, 'capturas', f"{capture_id:06d}.npz")
+
+    # --- Escritura ---
+
+    def _profile_ids(self, usernames: pd.Series) -> np.ndarray:
+        """Id numérico de cada username (los nuevos se dan de alta)."""
+        self.conn.executemany("INSERT OR IGNORE INTO perfiles (username) VALUES (?)",
+                              ((name,) for name in usernames))
+        known = pd.read_sql_query("SELECT id, username FROM perfiles", self.conn)
+        return known['id'].to_numpy(np.int64)[pd.Index(known['username']).get_indexer(usernames)]
+
+    def _latest(self) -> tuple | None:
+        return self.conn.execute(
+            "SELECT id, fecha, clave FROM capturas ORDER BY fecha DESC, id DESC LIMIT 1").fetchone()
+
+    def record(self, frame: pd.DataFrame, target: str | None = None, taken_at=None) -> int | None:
+        """
+        Añade una captura con los conteos de un DataFrame de la Fase 2 (esquema tipado; solo
+        cuentan los perfiles con conteo de seguidores). Con una columna 'fecha' (segundos epoch)
+        cada perfil guarda cuándo se observó y la captura toma la más reciente; sin ella todos
+        toman `taken_at` (ahora por defecto). Los perfiles que no están en el DataFrame conservan
+        su conteo y su fecha anteriores. Devuelve el id de la captura (None si no hay perfiles).
+        """
+        frame = frame.dropna(subset=['username', 'seguidores']).drop_duplicates('username', keep='last')
+        if frame.empty:
+            return None
+        if 'fecha' in frame:
+            observed = frame['fecha'].to_numpy(float)
+            taken_at = observed.max()
+        else:
+            taken_at = _timestamp(taken_at) or time.time()
+            observed = np.full(len(frame), taken_at)
+        latest = self._latest()
+        if latest and taken_at < latest[1]:
+            raise ValueError("Las capturas del historial se añaden en orden: ya hay una posterior a esa fecha.")
+
+        with self.conn:
+            ids = self._profile_ids(frame['username'])
+            order = np.argsort(ids)
+            ids = ids[order]
+            followers = frame['seguidores'].to_numpy(np.int64)[order]
+            following = frame['seguidos'].to_numpy(np.int64, na_value=_SIN_CONTEO)[order]
+
+            previous = self._counts(latest[0]) if latest else _Counts.empty()
+            state = previous.merged(ids, followers, following, observed.astype(np.int64)[order], keep_known=True)
+
+            cursor = self.conn.execute(
+                "INSERT INTO capturas (fecha, objetivo, clave, observados, perfiles, filas) VALUES (?, ?, 0, ?, ?, 0)",
+                (taken_at, target, len(ids), len(state)))
+            capture_id = cursor.lastrowid
+            key_id = latest[2] if latest else None
+            arrays = None
+            if key_id is not None:
+                in_key = self.conn.execute("SELECT count(*) FROM capturas WHERE clave = ?", (key_id,)).fetchone()[0]
+                if in_key < CAPTURAS_POR_CLAVE:
+                    arrays = state.delta_from(self._load_key(key_id))
+                    if len(arrays['ids']) > FRACCION_MAXIMA_DELTA * len(state):
+                        arrays = None
+            if arrays is None:
+                key_id, arrays = capture_id, state.arrays()
+
+            path = self._capture_path(capture_id)
+            tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+            np.savez_compressed(tmp_path, **arrays)
+            os.replace(tmp_path, path)
+            self.conn.execute("UPDATE capturas SET clave = ?, filas = ? WHERE id = ?",
+                              (key_id, len(arrays['ids']), capture_id))
+        if key_id == capture_id:
+            self._key_cache = {capture_id: state}
+        return capture_id
+
+    def record_profiles(self, profiles, target: str | None = None) -> int | None:
+        """
+        Añade una captura con los perfiles cargados en una ejecución: tuplas (username,
+        seguidores, seguidos, fecha de carga en segundos epoch). Sin perfiles no se añade nada.
+        """
+        frame = pd.DataFrame(profiles, columns=['username', 'seguidores', 'seguidos', 'fecha'])
+        for column in ('seguidores', 'seguidos'):
+            frame[column] = frame[column].astype('Int64')
+        capture_id = self.record(frame, target=target)
+        if capture_id is None:
+            print("🕓 Ningún perfil cargado en esta ejecución: el historial de seguidores no cambia.")
+        else:
+            print(f"🕓 Captura {capture_id} del historial de seguidores: {len(frame)} perfiles cargados "
+                  f"('{self.root}').")
+        return capture_id
+
+    def record_store(self, data_path: str, target: str | None = None, taken_at=None,
+                     chunksize: int = 100_000) -> int | None:
+        """
+        Añade una captura con los perfiles de un archivo de datos de la Fase 2 (cualquier formato),
+        todos observados en `taken_at`.
+        """
+        from profile_record import ProfileStatus
+        from storage import open_store
+
+        columns = ['username', 'seguidores', 'seguidos', 'estado']
+        chunks = [chunk[chunk['estado'] == ProfileStatus.OK]
+                  for chunk in open_store(data_path).iter_chunks(columns=columns, chunksize=chunksize)]
+        frame = pd.concat(chunks) if chunks else pd.DataFrame(columns=columns)
+        capture_id = self.record(frame, target=target, taken_at=taken_at)
+        if capture_id is None:
+            print(f"🕓 '{data_path}' no tiene perfiles con conteo: el historial de seguidores no cambia.")
+        else:
+            print(f"🕓 Captura {capture_id} del historial de seguidores: {len(frame)} perfiles ('{self.root}').")
+        return capture_id
+
+    # --- Lectura ---
+
+    def _load_key(self, key_id: int) -> _Counts:
+        if key_id not in self._key_cache:
+            with np.load(self._capture_path(key_id)) as arrays:
+                self._key_cache = {key_id: _Counts.from_arrays(arrays)}
+        return self._key_cache[key_id]
+
+    def _counts(self, capture_id: int) -> _Counts:
+        """Estado completo de una captura (su clave más, si no es clave, su delta)."""
+        key_id = self.conn.execute("SELECT clave FROM capturas WHERE id = ?", (capture_id,)).fetchone()[0]
+        key = self._load_key(key_id)
+        if key_id == capture_id:
+            return key
+        with np.load(self._capture_path(capture_id)) as arrays:
+            return key.with_delta(arrays)
+
+    def _capture_at(self, when) -> tuple | None:
+        """(id, fecha) de la última captura en o antes de `when` (la más reciente si when es None)."""
+        query = "SELECT id, fecha FROM capturas"
+        params = ()
+        if when is not None:
+            query += " WHERE fecha <= ?"
+            params = (_timestamp(when),)
+        return self.conn.execute(query + " ORDER BY fecha DESC, id DESC LIMIT 1", params).fetchone()
+
+    def _usernames(self, ids) -> dict[int, str]:
+        ids = [int(i) for i in ids]
+        names = {}
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            names.update(self.conn.execute(
+                f"SELECT id, username FROM perfiles WHERE id IN ({', '.join('?' * len(batch))})", batch))
+        return names
+
+    def snapshots(self) -> pd.DataFrame:
+        """Capturas del historial: fecha, objetivo, si es clave, perfiles observados y tamaño en disco."""
+        df = pd.read_sql_query("SELECT id, fecha, objetivo, clave, observados, perfiles, filas FROM capturas "
+                               "ORDER BY fecha, id", self.conn)
+        df['clave'] = df['clave'] == df['id']
+        df['bytes'] = [os.path.getsize(self._capture_path(i)) for i in df['id']]
+        df['fecha'] = pd.to_datetime([datetime.fromtimestamp(t) for t in df['fecha']])
+        return df
+
+    def history(self, usernames, since=None, until=None) -> pd.DataFrame:
+        """
+        Conteos observados de los perfiles entre dos fechas (fecha, username, seguidores, seguidos):
+        un punto por cada vez que se cargó el perfil, con la fecha de esa carga.
+        """
+        names = list(dict.fromkeys(usernames))
+        ids_by_name = {}
+        for start in range(0, len(names), 500):
+            batch = names[start:start + 500]
+            ids_by_name.update(self.conn.execute(
+                f"SELECT username, id FROM perfiles WHERE username IN ({', '.join('?' * len(batch))})", batch))
+        names = [name for name in names if name in ids_by_name]
+        ids = np.array([ids_by_name[name] for name in names], dtype=np.int64)
+
+        since, until = _timestamp(since), _timestamp(until)
+        query, params = "SELECT id FROM capturas WHERE 1", []
+        for operator, value in (('>=', since), ('<=', until)):
+            if value is not None:
+                query += f" AND fecha {operator} ?"
+                params.append(value)
+        low = since if since is not None else -np.inf
+        high = until if until is not None else np.inf
+        frames = []
+        for (capture_id,) in self.conn.execute(query + " ORDER BY fecha, id", params).fetchall():
+            counts = self._counts(capture_id)
+            positions, found = counts.find(ids)
+            observed = counts.observed[positions[found]]
+            # Solo las cargas dentro del intervalo (los perfiles no cargados arrastran una fecha anterior)
+            inside = (observed >= low) & (observed <= high)
+            frames.append(pd.DataFrame({'fecha': observed[inside], 'username': np.array(names)[found][inside],
+                                        'seguidores': counts.followers[positions[found]][inside],
+                                        'seguidos': counts.following[positions[found]][inside]}))
+        columns = ['fecha', 'username', 'seguidores', 'seguidos']
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        # Un perfil no cargado de nuevo repite su última observación en las capturas siguientes
+        df = pd.concat(frames, ignore_index=True)[columns].drop_duplicates(['username', 'fecha'])
+        df = df.sort_values(['fecha', 'username'], kind='stable', ignore_index=True)
+        df['fecha'] = pd.to_datetime([datetime.fromtimestamp(t) for t in df['fecha']])
+        for column in ('seguidores', 'seguidos'):
+            df[column] = df[column].astype('Int64').mask(df[column] == _SIN_CONTEO)
+        return df
+
+    def changes(self, since=None, until=None, metric: str = 'seguidores', top: int | None = 20,
+                relative: bool = False, min_count: int = 1) -> pd.DataFrame:
+        """
+        Perfiles con el mayor cambio de `metric` ('seguidores' o 'seguidos') entre la captura
+        vigente en `since` (la primera si no hay ninguna anterior) y la vigente en `until` (la
+        última por defecto). Con relative se ordena por cambio porcentual; min_count descarta
+        perfiles con un conteo inicial menor. Solo se leen las dos capturas (y sus claves).
+
+        Solo entran los perfiles que se volvieron a cargar entre las dos capturas; por_dia y
+        crecimiento_diario_pct (crecimiento compuesto por día) usan los días entre sus dos cargas.
+        Devuelve username, antes, despues, cambio, cambio_pct, por_dia y crecimiento_diario_pct,
+        ordenado de mayor a menor cambio (absoluto o, con relative, porcentual).
+        """
+        columns = ['username', 'antes', 'despues', 'cambio', 'cambio_pct', 'por_dia', 'crecimiento_diario_pct']
+        end = self._capture_at(until)
+        start = (self._capture_at(since) if since is not None else None) or self.conn.execute(
+            "SELECT id, fecha FROM capturas ORDER BY fecha, id LIMIT 1").fetchone()
+        if end is None or start is None or start[1] > end[1]:
+            return pd.DataFrame(columns=columns)
+
+        attribute = {'seguidores': 'followers', 'seguidos': 'following'}[metric]
+        first, last = self._counts(start[0]), self._counts(end[0])
+        ids, in_first, in_last = np.intersect1d(first.ids, last.ids, assume_unique=True, return_indices=True)
+        before = getattr(first, attribute)[in_first]
+        after = getattr(last, attribute)[in_last]
+        days = (last.observed[in_last] - first.observed[in_first]) / 86_400
+        valid = (before >= max(min_count, 0)) & (after != _SIN_CONTEO) & (before != _SIN_CONTEO) & (days > 0)
+        ids, before, after, days = ids[valid], before[valid], after[valid], days[valid]
+
+        change = after - before
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percent = np.where(before > 0, 100 * change / before, np.nan)
+        score = np.abs(np.nan_to_num(percent) if relative else change)
+        if top is not None and top < len(score):
+            selected = np.argpartition(-score, top)[:top]
+        else:
+            selected = np.arange(len(score))
+        selected = selected[np.argsort(-score[selected], kind='stable')]
+
+        names = self._usernames(ids[selected])
+        days = days[selected]
+        df = pd.DataFrame({'username': [names[i] for i in ids[selected]], 'antes': before[selected],
+                           'despues': after[selected], 'cambio': change[selected], 'cambio_pct': percent[selected]})
+        df['por_dia'] = df['cambio'] / days
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = df['despues'].to_numpy(float) / df['antes'].to_numpy(float)
+            df['crecimiento_diario_pct'] = 100 * (ratio ** (1 / days) - 1)
+        return df[columns]
+
+    def close(self):
+        self.conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Historial de conteos de seguidores entre ejecuciones de la Fase 2.")
+    parser.add_argument('--historial', default="follower_history", help="Carpeta del historial")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    record = subparsers.add_parser('registrar', help="Añadir una captura desde un archivo de datos de la Fase 2")
+    record.add_argument('archivo')
+    record.add_argument('--objetivo', help="Cuenta objetivo de la que salen los datos")
+    record.add_argument('--fecha', help="Fecha de la captura (ISO; por defecto, la de modificación del archivo)")
+
+    changes = subparsers.add_parser('cambios', help="Perfiles con el mayor cambio entre dos fechas")
+    changes.add_argument('--desde', help="Fecha inicial (ISO); por defecto la primera captura")
+    changes.add_argument('--hasta', help="Fecha final (ISO); por defecto la última captura")
+    changes.add_argument('--seguidos', action='store_true', help="Comparar seguidos en lugar de seguidores")
+    changes.add_argument('--relativo', action='store_true', help="Ordenar por cambio porcentual")
+    changes.add_argument('--minimo', type=int, default=1, help="Conteo inicial mínimo para entrar en la lista")
+    changes.add_argument('--resultados', type=int, default=20)
+    changes.add_argument('--csv', help="Guardar la lista en un CSV")
+
+    profile = subparsers.add_parser('perfil', help="Evolución de uno o más perfiles")
+    profile.add_argument('usernames', nargs='+')
+    profile.add_argument('--desde')
+    profile.add_argument('--hasta')
+
+    subparsers.add_parser('capturas', help="Listar las capturas guardadas")
+    args = parser.parse_args()
+
+    history = FollowerHistory(args.historial)
+    try:
+        if args.comando == 'registrar':
+            try:
+                history.record_store(args.archivo, target=args.objetivo,
+                                     taken_at=args.fecha or os.path.getmtime(args.archivo))
+            except ValueError as e:
+                print(f"❌ {e}")
+        elif args.comando == 'cambios':
+            result = history.changes(args.desde, args.hasta, metric='seguidos' if args.seguidos else 'seguidores',
+                                     top=args.resultados, relative=args.relativo, min_count=args.minimo)
+            print(result.to_string(index=False) if len(result) else "Sin capturas suficientes para comparar.")
+            if args.csv:
+                result.to_csv(args.csv, index=False)
+        elif args.comando == 'perfil':
+            result = history.history(args.usernames, args.desde, args.hasta)
+            print(result.to_string(index=False) if len(result) else "Sin datos de esos perfiles.")
+        else:
+            print(history.snapshots().to_string(index=False))
+    finally:
+        history.close()
@@ -1,174 +1,106 @@
 # followers_downloader.py
 import os
-import time
-import random
 import csv
-from selenium import webdriver
-from selenium.webdriver import Chrome
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
+import threading
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException, NoSuchElementException
 
+from browser_session import BrowserSession
+from metrics import get_metrics
+from pacing import DEFAULT_SCROLL_PACING, PacingScheduler
+
+# Tiempo máximo (segundos) que se espera a que un scroll renderice usuarios nuevos
+ESPERA_RENDER_SCROLL = 6
+
+# Instala un MutationObserver sobre el contenedor del modal que guarda en una cola los
+# usernames de los enlaces a medida que aparecen (equivale al XPath
+# .//a[contains(@href,'/') and not(contains(@tabindex, '-1'))] filtrado por dominio).
+_COLLECTOR_INSTALL_SCRIPT = """
+const container = arguments[0];
+const hostFilter = arguments[1];
+const selector = 'a[href*="/"]:not([tabindex*="-1"])';
+if (window.__seguidosCollector) window.__seguidosCollector.observer.disconnect();
+const state = {seen: new Set(), queue: [], observer: null};
+
+function record(link) {
+    const href = link.href;
+    if (!href || !href.includes(hostFilter)) return;
+    const username = href.split('/').slice(-2)[0];
+    if (username && !state.seen.has(username)) {
+        state.seen.add(username);
+        state.queue.push(username);
+    }
+}
+function scan(node) {
+    if (node.nodeType !== Node.ELEMENT_NODE) return;
+    if (node.matches(selector)) record(node);
+    node.querySelectorAll(selector).forEach(record);
+}
+
+scan(container);
+state.observer = new MutationObserver(mutations => {
+    for (const mutation of mutations) {
+        if (mutation.type === 'attributes') scan(mutation.target);
+        else mutation.addedNodes.forEach(scan);
+    }
+});
+state.observer.observe(container, {childList: true, subtree: true, attributes: true, attributeFilter: ['href']});
+window.__seguidosCollector = state;
+"""
+
+# Devuelve y vacía la cola de usernames nuevos desde la última llamada
+_COLLECTOR_DRAIN_SCRIPT = """
+const state = window.__seguidosCollector;
+if (!state) return [];
+const batch = state.queue;
+state.queue = [];
+return batch;
+"""
+
 
 class FollowersDownloader:
     """Clase para la descarga inicial de nombres de usuario seguidos de una cuenta objetivo."""
 
-    def __init__(self, username, password):
-        self.username = username
-        self.password = password
-        self.driver = None
-
-    # --- Métodos de Utilidad (Iniciador y Espera) ---
-
-    def _init_driver(self, headless=False):
-        """Inicializa y configura el driver de Chrome."""
-        options = webdriver.ChromeOptions()
-        options.add_argument("--window-size=1600,900")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument(
-            "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36"
-        )
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-
-        if headless:
-            options.add_argument("--headless=new")
-
-        service = Service(ChromeDriverManager().install())
-        self.driver = Chrome(service=service, options=options)
-        return self.driver
-
-    def _wait_for(self, timeout=15):
-        """Función de conveniencia para WebDriverWait."""
-        return WebDriverWait(self.driver, timeout)
-
-    # --- Lógica de Login (Corregida con manejo de pop-ups) ---
-    def _login_instagram(self) -> bool:
-        """Realiza el login en Instagram y maneja pop-ups post-login."""
-        if not self.driver:
-            self._init_driver(headless=False)
+    def __init__(self, session: BrowserSession, scroll_pacer=None):
+        self.session = session
+        # Ritmo entre scrolls del modal; la espera al renderizado es aparte (ESPERA_RENDER_SCROLL)
+        self.scroll_pacer = scroll_pacer or PacingScheduler("scroll", *DEFAULT_SCROLL_PACING)
+        # Parada pedida desde otro hilo (p. ej. la Fase 2 solapada terminó antes): se comprueba en cada scroll
+        self.stop_requested = threading.Event()
 
-        wait = self._wait_for(20)
-        self.driver.get("https://www.instagram.com/")
+    def stop(self):
+        """Pide que el scroll en curso termine en la siguiente vuelta (la lista incompleta no se guarda)."""
+        self.stop_requested.set()
 
-        try:
-            user_input = wait.until(EC.presence_of_element_located((By.NAME, "username")))
-            pass_input = wait.until(EC.presence_of_element_located((By.NAME, "password")))
-        except Exception:
-            print("Timeout: No se encontraron los campos de login.")
-            return False
+    @property
+    def driver(self):
+        return self.session.driver
 
-        # Enviar credenciales
-        user_input.clear()
-        user_input.send_keys(self.username)
-        pass_input.clear()
-        pass_input.send_keys(self.password)
+    # --- Métodos de Utilidad (Espera y Login) ---
 
-        try:
-            # Intentar clic en el botón de login
-            submit_btn = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[./div[text()='Iniciar sesión']]")))
-            submit_btn.click()
-        except Exception:
-            print("No se pudo hacer clic en el botón de login.")
-            return False
-
-        # Manejo de pop-ups y espera al feed
-        try:
-            # 1. Esperar a que la URL cambie (éxito del login)
-            wait.until(lambda d: "instagram.com" in d.current_url and "login" not in d.current_url)
-            time.sleep(3)
-            print("✅ Login exitoso, intentando cerrar notificaciones/guardado.")
-
-            # 2. Intentar cerrar el pop-up "Guardar información de inicio de sesión"
-            try:
-                # Esperar un poco más para que aparezcan los pop-ups
-                time.sleep(2)
-                # Buscar el botón con múltiples estrategias
-                save_popup_selectors = [
-                    "//div[contains(text(), 'Guardar información')]/following-sibling::div//button[contains(text(), 'Ahora no')]",
-                    "//div[contains(text(), 'Save Your Login Info')]/following-sibling::div//button[contains(text(), 'Not Now')]",
-                    "//button[contains(text(), 'Ahora no')]",
-                    "//button[contains(text(), 'Not Now')]"
-                ]
-                
-                popup_closed = False
-                for selector in save_popup_selectors:
-                    try:
-                        elements = self.driver.find_elements(By.XPATH, selector)
-                        for element in elements:
-                            if element and element.is_displayed():
-                                self.driver.execute_script("arguments[0].click();", element)
-                                print("   -> Pop-up 'Guardar información' cerrado.")
-                                time.sleep(2)
-                                popup_closed = True
-                                break
-                        if popup_closed:
-                            break
-                    except Exception:
-                        continue
-            except Exception as e:
-                # Si no se puede cerrar, continuar de todas formas
-                pass
-
-            # 3. Intentar cerrar el pop-up "Activar notificaciones"
-            try:
-                time.sleep(1)
-                notification_selectors = [
-                    "//button[contains(text(), 'Ahora no')]",
-                    "//button[contains(text(), 'Not Now')]",
-                    "//button[contains(text(), 'No ahora')]"
-                ]
-                
-                notification_closed = False
-                for selector in notification_selectors:
-                    try:
-                        elements = self.driver.find_elements(By.XPATH, selector)
-                        for element in elements:
-                            if element and element.is_displayed():
-                                self.driver.execute_script("arguments[0].click();", element)
-                                print("   -> Pop-up 'Notificaciones' cerrado.")
-                                time.sleep(2)
-                                notification_closed = True
-                                break
-                        if notification_closed:
-                            break
-                    except Exception:
-                        continue
-            except Exception as e:
-                # Si no se puede cerrar, continuar de todas formas
-                pass
-
-            return True
+    def _wait_for(self, timeout=15):
+        """Función de conveniencia para WebDriverWait."""
+        return self.session.wait_for(timeout)
 
-        except Exception as e:
-            print(f"Fallo al detectar la sesión iniciada o al cerrar pop-ups: {e}")
-            # Aunque falle el cierre de pop-ups, si el login fue exitoso, continuar
-            try:
-                # Verificar si realmente estamos logueados
-                if "instagram.com" in self.driver.current_url and "login" not in self.driver.current_url:
-                    print("⚠Login exitoso pero no se pudieron cerrar algunos pop-ups. Continuando...")
-                    return True
-            except:
-                pass
-            return False
+    def _login_instagram(self) -> bool:
+        """Inicia (o reutiliza) la sesión compartida del navegador."""
+        return self.session.login()
 
     # --- Lógica de Búsqueda (Corregida con navegación directa) ---
     def _buscar_usuario(self, username_objetivo):
         """Navega directamente al perfil del usuario objetivo después del login."""
         wait = WebDriverWait(self.driver, 15)
-        profile_url = f"https://www.instagram.com/{username_objetivo}/"
+        profile_url = self.session.profile_url(username_objetivo)
 
         print(f"Navegando directamente a: {profile_url}")
-        self.driver.get(profile_url)
 
         try:
-            # Esperar a que el header del perfil (donde están las stats) esté presente
-            wait.until(EC.presence_of_element_located((By.XPATH, "//header")))
+            with get_metrics().timer('navegacion', pagina='objetivo'):
+                self.driver.get(profile_url)
+                # Esperar a que el header del perfil (donde están las stats) esté presente
+                wait.until(EC.presence_of_element_located((By.XPATH, "//header")))
 
             # Comprobar si la página realmente cargó un perfil (Evita errores de "Page Not Found")
             if "page not found" in self.driver.page_source.lower() or "no se pudo encontrar" in self.driver.page_source.lower():
@@ -176,7 +108,6 @@ class FollowersDownloader:
                 return False
 
             print(f"✅ Perfil de @{username_objetivo} cargado con éxito.")
-            time.sleep(3)
             return True
 
         except TimeoutException:
@@ -190,7 +121,8 @@ class FollowersDownloader:
     def _guardar_a_csv(self, data: list[str], filename: str):
         """Guarda una lista de usernames en un archivo CSV."""
         try:
-            with open(filename, 'w', newline='', encoding='utf-8') as file:
+            with get_metrics().timer('guardado', destino='lista_seguidos'), \
+                    open(filename, 'w', newline='', encoding='utf-8') as file:
                 writer = csv.writer(file)
                 writer.writerow(['username'])
                 writer.writerows([[username] for username in data])
@@ -198,11 +130,26 @@ class FollowersDownloader:
         except Exception as e:
             print(f"\nError al guardar el archivo CSV: {e}")
 
-    # --- Lógica de Scroll y Extracción (Original) ---
-    def _obtener_seguidos(self, limite=500) -> list[str]:
-        """Abre el modal de seguidos y scrollea para obtener la lista."""
+    def _esperar_nuevos_usuarios(self, timeout=ESPERA_RENDER_SCROLL) -> list[str]:
+        """Espera a que el observador registre usernames nuevos y los devuelve ([] si no llega ninguno)."""
+        try:
+            return WebDriverWait(self.driver, timeout, poll_frequency=0.25).until(
+                lambda d: d.execute_script(_COLLECTOR_DRAIN_SCRIPT)
+            )
+        except TimeoutException:
+            return []
+
+    # --- Lógica de Scroll y Extracción (incremental) ---
+    def _obtener_seguidos(self, limite=500, on_usernames=None) -> list[str]:
+        """
+        Abre el modal de seguidos y scrollea para obtener la lista.
+
+        Si se pasa on_usernames, se llama con cada lote de usernames nuevos en cuanto se
+        descubren (para que la Fase 2 empiece sin esperar al final del scroll).
+        """
         wait = self._wait_for(15)
         seguidos_set = set()
+        seguidos_list = []  # en orden de aparición
 
         # Paso 1: Abrir el modal
         try:
@@ -212,13 +159,12 @@ class FollowersDownloader:
             )
             self.driver.execute_script("arguments[0].click();", seguidos_link)
             print("✅ Se abrió el modal de seguidos.")
-            time.sleep(3)
 
-            # Paso 2: Detectar el contenedor con scroll
+            # Paso 2: Detectar el contenedor con scroll (se espera a que el modal lo renderice)
             modal = wait.until(EC.presence_of_element_located((By.XPATH, "//div[@role='dialog']")))
             # Intenta encontrar el contenedor desplazable. Este XPath puede cambiar si Instagram actualiza la interfaz.
-            scroll_container = modal.find_element(By.XPATH,
-                                                  ".//div[contains(@style,'height')]//div[contains(@style,'overflow')][1]")
+            scroll_container = wait.until(lambda d: modal.find_element(
+                By.XPATH, ".//div[contains(@style,'height')]//div[contains(@style,'overflow')][1]"))
 
             if not scroll_container:
                 print("No se encontró el contenedor desplazable del modal.")
@@ -231,21 +177,20 @@ class FollowersDownloader:
             no_progress_count = 0
             last_count = 0
 
+            # Observador en la página: registra los usernames nuevos a medida que se renderizan
+            self.driver.execute_script(_COLLECTOR_INSTALL_SCRIPT, scroll_container, self.session.host)
+            nuevos = self._esperar_nuevos_usuarios()
+
             while len(seguidos_set) < limite:
-                # 1. Extraer usuarios visibles
-                links = scroll_container.find_elements(By.XPATH,
-                                                       ".//a[contains(@href,'/') and not(contains(@tabindex, '-1'))]")
-
-                for a in links:
-                    try:
-                        href = a.get_attribute("href")
-                        if href and "instagram.com" in href:
-                            # Filtramos para obtener solo el username
-                            username = href.split("/")[-2]
-                            if username and username not in seguidos_set:
-                                seguidos_set.add(username)
-                    except Exception:
-                        continue
+                # 1. Añadir solo el lote de usuarios nuevos
+                lote = []
+                for username in nuevos:
+                    if username and username not in seguidos_set:
+                        seguidos_set.add(username)
+                        seguidos_list.append(username)
+                        lote.append(username)
+                if lote and on_usernames:
+                    on_usernames(lote)
 
                 if len(seguidos_set) >= limite:
                     break
@@ -260,17 +205,25 @@ class FollowersDownloader:
 
                 last_count = len(seguidos_set)
 
-                # 3. Realizar Scroll y esperar
-                self.driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight;", scroll_container)
-                time.sleep(random.uniform(3.0, 4.5))
+                if self.stop_requested.is_set():
+                    print(f"\n⏹️ Scroll detenido a petición con {len(seguidos_set)} usuarios capturados.")
+                    break
+
+                # 3. Respetar el ritmo, hacer scroll y esperar a que se rendericen usuarios nuevos
+                self.scroll_pacer.wait()
+                with get_metrics().timer('scroll') as timer:
+                    self.driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight;", scroll_container)
+                    nuevos = self._esperar_nuevos_usuarios()
+                    timer.set(resultado='nuevos' if nuevos else 'sin_nuevos')
 
                 # 4. Condición de salida
                 if no_progress_count >= max_scroll_attempts_without_new_users:
                     print(f"\n⚠️ Límite de reintentos ({max_scroll_attempts_without_new_users}) alcanzado.")
                     break
 
-            seguidos_list = list(seguidos_set)
             print(f"\n✅ Total de seguidos recolectados: {len(seguidos_list)}")
+            get_metrics().count('usuarios_recolectados', len(seguidos_list))
+            print(self.scroll_pacer.report())
             return seguidos_list
 
         except Exception as e:
@@ -278,8 +231,9 @@ class FollowersDownloader:
             return []
 
     # --- Método de Ejecución Principal ---
-    def download_and_save_followers(self, perfil_objetivo: str, limite: int, csv_filename: str):
-        """Descarga la lista inicial de seguidos y la guarda en un CSV."""
+    def download_and_save_followers(self, perfil_objetivo: str, limite: int, csv_filename: str,
+                                    on_usernames=None):
+        """Descarga la lista inicial de seguidos y la guarda en un CSV (on_usernames: ver _obtener_seguidos)."""
 
         if not self._login_instagram():
             print("Login fallido. No se puede continuar.")
@@ -290,15 +244,12 @@ class FollowersDownloader:
             return
 
         print(f"Comenzando el scraping de seguidos de {perfil_objetivo}...")
-        seguidos_usernames = self._obtener_seguidos(limite=limite)
+        seguidos_usernames = self._obtener_seguidos(limite=limite, on_usernames=on_usernames)
 
-        if seguidos_usernames:
+        if self.stop_requested.is_set():
+            # Una lista a medias no debe pasar por completa en la siguiente ejecución
+            print("⏹️ Fase 1 detenida antes de terminar: la lista de seguidos no se guarda.")
+        elif seguidos_usernames:
             self._guardar_a_csv(seguidos_usernames, csv_filename)
         else:
             print("⚠️ No se pudieron obtener seguidos.")
-
-    def close_driver(self):
-        """Cierra el driver de Selenium."""
-        if self.driver:
-            self.driver.quit()
-            print("Cerrando navegador del Downloader.")
\ No newline at end of file
@@ -1,9 +1,13 @@
 # main_app.py
+# Las dependencias pesadas (Selenium, pandas, matplotlib...) se importan dentro de cada fase:
+# el menú y la ayuda arrancan al instante y `analizar` no carga el navegador.
+import argparse
 import os
+import queue
 import sys
-from followers_downloader import FollowersDownloader
-from profile_scraper import ProfileScraper
-from data_analyzer import DataAnalyzer
+import threading
+from metrics import configure_metrics
+from pacing import PacingScheduler
 
 # --- CONFIGURACIÓN GLOBAL ---
 # ¡IMPORTANTE! Reemplaza con tus credenciales
@@ -14,55 +18,343 @@ PASSWORD = os.getenv("IG_TEST_PASS", "Lunita1780L")
 CUENTA_OBJETIVO = "nayeli.nxx"  # <--- Perfil a analizar
 LIMITE_SEGUIDOS = 300  # Límite para el primer scraping (para no tardar demasiado)
 
+# Sitio de trabajo: Instagram o un servidor local de fixtures (ver fixture_server.py)
+URL_BASE = os.getenv("IG_BASE_URL", "https://www.instagram.com/")
+
+# Sesión de navegador compartida por las fases (cookies y ruta del driver se guardan en disco)
+NAVEGADOR_OCULTO = False
+ARCHIVO_COOKIES = "session_cookies.json"
+ARCHIVO_RUTA_DRIVER = ".chromedriver_path"
+
+# Formato de trabajo de la Fase 2 ('parquet', 'sqlite', 'csv' o 'xlsx')
+FORMATO_SALIDA = "parquet"
+DIRECTORIO_SALIDA = "."  # Carpeta de la lista de seguidos, los datos, el reporte y el gráfico
+EXPORTAR_XLSX = True  # Exportar además un XLSX de reporte al terminar la Fase 2
+REANUDAR = True  # Fase 2: omitir los perfiles ya guardados de una ejecución interrumpida
+
+# Caché de perfiles compartida entre ejecuciones y cuentas objetivo (None para desactivarla)
+CACHE_PERFILES = "profile_cache.sqlite"
+CACHE_TTL_SEGUNDOS = None  # TTL por estado ('OK', 'PRIVADA', 'NO_EXISTE'...); None = DEFAULT_STATUS_TTLS
+CACHE_MAX_ENTRADAS = 200_000
+
+# Ritmo de peticiones (segundos entre cargas). Las esperas de carga van aparte: se espera a
+# que la página muestre lo que se necesita, no un tiempo fijo.
+PAUSA_ENTRE_PERFILES = (10, 15)  # Fase 2, tras cada carga; con varios navegadores es el límite del total
+PAUSA_SCROLL = (3.0, 4.5)  # Fase 1: entre scrolls del modal de seguidos (incluye el renderizado)
+
+# Fase 2 en paralelo: navegadores (procesos) simultáneos que comparten PAUSA_ENTRE_PERFILES
+NUM_NAVEGADORES = 1
+
+# Proceso completo (opción 0): la Fase 2 empieza con los primeros usernames de la Fase 1 en
+# lugar de esperar al CSV. Usa el pool (al menos un navegador aparte del de la Fase 1).
+FASES_SOLAPADAS = True
+
+# Analizar el HTML de cada perfil en procesos aparte (lxml) mientras el navegador sigue
+PARSEO_FUERA_DEL_NAVEGADOR = False
+PROCESOS_PARSEO = 2
+
+# Archivo comprimido del HTML de cada perfil (None para desactivarlo). Permite
+# reconstruir la salida de la Fase 2 sin navegador si cambian los selectores.
+ARCHIVO_PAGINAS = "page_archive"
+
+# Historial de conteos por perfil: al terminar cada Fase 2, una captura con los perfiles que cargó
+# (None para desactivarlo).
+# Consultas: python follower_history.py cambios --desde 2026-10-01
+HISTORIAL_SEGUIDORES = "follower_history"
+
+# Fase 2 con análisis de Benford en vivo a medida que llegan los perfiles
+ANALISIS_EN_VIVO = True
+INFORME_CADA = 25  # Recalcular las pruebas cada N perfiles
+GRAFICO_CADA = 50  # Regenerar el gráfico cada N perfiles (None para no hacerlo)
+PARADA_ANTICIPADA = None  # Mínimo de conteos válidos para parar si el veredicto ya es estable
+
+# Métricas de duración por fase, login, navegación, extracción, scroll, guardado y pausas
+# (None para desactivar cada salida). El JSON-lines acumula eventos de todas las ejecuciones.
+ARCHIVO_METRICAS = "metricas.jsonl"
+ARCHIVO_PROMETHEUS = "metricas.prom"  # Formato textfile (node_exporter --collector.textfile)
+
+# Fase 3: leer por chunks y acumular solo histogramas (memoria constante)
+ANALISIS_STREAMING = True
+TAMANO_CHUNK = 100_000
+# Fase 3: guardar los histogramas junto a los datos y, en el siguiente análisis, leer solo lo que cambió
+ANALISIS_INCREMENTAL = True
+
+# Subcomandos de la línea de comandos (con alias en inglés) y su opción del menú
+COMANDOS = {
+    'descargar': (1, ['download'], "Fase 1: recolectar los nombres de usuario seguidos"),
+    'perfiles': (2, ['scrape'], "Fase 2: recolectar la información de cada perfil (requiere Fase 1)"),
+    'analizar': (3, ['analyze'], "Fase 3: análisis de Benford y gráfico (requiere Fase 2)"),
+    'completo': (0, ['all'], "Proceso completo (1 -> 2 -> 3)"),
+    'reprocesar': (5, ['reparse'], "Reconstruir la Fase 2 desde las páginas archivadas, sin navegador"),
+}
+
 
 class MainApp:
     """Clase principal que coordina las tres fases del programa."""
 
-    def __init__(self, username, password, target_account, limit):
+    def __init__(self, username, password, target_account, limit, streaming=ANALISIS_STREAMING,
+                 output_format=FORMATO_SALIDA, export_xlsx=EXPORTAR_XLSX, resume=REANUDAR,
+                 workers=NUM_NAVEGADORES, base_url=URL_BASE, headless=NAVEGADOR_OCULTO,
+                 pacing=PAUSA_ENTRE_PERFILES, scroll_pacing=PAUSA_SCROLL, metrics_file=ARCHIVO_METRICAS,
+                 prometheus_file=ARCHIVO_PROMETHEUS, output_dir=DIRECTORIO_SALIDA, chunksize=TAMANO_CHUNK,
+                 incremental=ANALISIS_INCREMENTAL, overlap=FASES_SOLAPADAS):
+        from storage import FORMAT_EXTENSIONS, resolve_format
+
         self.username = username
         self.password = password
         self.target_account = target_account
         self.limit = limit
+        self.streaming = streaming
+        self.output_format = resolve_format(output_format)
+        self.export_xlsx = export_xlsx
+        self.resume = resume
+        self.workers = workers
+        self.base_url = base_url
+        self.headless = headless
+        self.pacing = pacing
+        self.scroll_pacing = scroll_pacing
+        self.chunksize = chunksize
+        self.incremental = incremental
+        self.overlap = overlap  # Opción 0: Fases 1 y 2 solapadas
+        self.session = None  # BrowserSession compartida, se crea al primer uso
+        self.metrics = configure_metrics(metrics_file, prometheus_file)
 
         # Archivos de salida dinámicos
-        self.following_list_csv = f"{target_account}_following_list.csv"
-        self.output_data_file = f"{target_account}_profile_data.xlsx"  # Cambiado a XLSX
-        self.graph_filename = f"{target_account}_benford_analysis.png"
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir or "."
+        self.data_extension = FORMAT_EXTENSIONS[self.output_format]
+        (self.following_list_csv, self.output_data_file,
+         self.report_xlsx_file, self.graph_filename) = self._target_files(target_account)
 
         print(f"🌟 **Iniciando Análisis de Benford para seguidos de:** {target_account}")
 
+    def _output_path(self, filename: str) -> str:
+        return os.path.normpath(os.path.join(self.output_dir, filename))
+
+    def _target_files(self, target: str) -> tuple[str, str, str, str]:
+        """Lista de seguidos (CSV), datos de la Fase 2, reporte XLSX y gráfico de una cuenta objetivo."""
+        return (self._output_path(f"{target}_following_list.csv"),
+                self._output_path(f"{target}_profile_data{self.data_extension}"),
+                self._output_path(f"{target}_profile_data.xlsx"),
+                self._output_path(f"{target}_benford_analysis.png"))
+
+    def _following_lists(self) -> dict[str, str]:
+        """CSV de la Fase 1 de cada cuenta objetivo."""
+        return {self.target_account: self.following_list_csv}
+
+    def _read_following(self) -> list[str] | None:
+        """
+        Usernames de las listas de la Fase 1 que existen, sin repetir (cada perfil se carga una
+        sola vez aunque lo sigan varias cuentas); None si no hay ninguna.
+        """
+        from profile_scraper import ProfileScraper
+
+        lists = self._following_lists()
+        existing = [csv_file for csv_file in lists.values() if os.path.exists(csv_file)]
+        if not existing:
+            return None
+        for target, csv_file in lists.items():
+            if csv_file not in existing:
+                print(f"⚠️ No hay lista de seguidos de {target} ('{csv_file}'); se omite.")
+        reader = ProfileScraper(None)
+        return list(dict.fromkeys(u for csv_file in existing for u in reader.read_usernames_from_csv(csv_file)))
+
+    def _get_session(self) -> "BrowserSession":
+        """Sesión de navegador única compartida por las Fases 1 y 2."""
+        if self.session is None:
+            from browser_session import BrowserSession
+
+            self.session = BrowserSession(self.username, self.password, headless=self.headless,
+                                          cookies_file=ARCHIVO_COOKIES, driver_path_file=ARCHIVO_RUTA_DRIVER,
+                                          base_url=self.base_url)
+        return self.session
+
+    def close(self):
+        """Cierra el navegador compartido si llegó a abrirse."""
+        if self.session:
+            self.session.close()
+            self.session = None
+
     # --- Métodos de Fase Individual ---
 
     def _run_phase_1_download(self):
         """FASE 1: Descarga de Nombres de Usuario."""
         print("\n--- 💻 Fase 1: Descarga de Nombres de Usuario (Seguidos) ---")
-        downloader = FollowersDownloader(self.username, self.password)
+        from followers_downloader import FollowersDownloader
+
+        downloader = FollowersDownloader(self._get_session(),
+                                         scroll_pacer=PacingScheduler("scroll", *self.scroll_pacing))
         try:
-            downloader.download_and_save_followers(self.target_account, self.limit, self.following_list_csv)
+            self._download_following(downloader)
         except Exception as e:
             print(f"Error en la Fase 1: {e}")
-        finally:
-            downloader.close_driver()
+
+    def _download_following(self, downloader, on_usernames=None):
+        """Descarga la lista de seguidos de la cuenta objetivo (on_usernames: ver _obtener_seguidos)."""
+        downloader.download_and_save_followers(self.target_account, self.limit, self.following_list_csv,
+                                               on_usernames=on_usernames)
+
+    def _build_scraper(self) -> "ProfileScraper":
+        """ProfileScraper de la Fase 2 con la caché, el parseo offline y el archivo de páginas configurados."""
+        from concurrent.futures import ProcessPoolExecutor
+
+        from page_archive import PageArchive
+        from profile_cache import ProfileCache
+        from profile_scraper import ProfileScraper
+
+        cache = (ProfileCache(CACHE_PERFILES, status_ttls=CACHE_TTL_SEGUNDOS, max_entries=CACHE_MAX_ENTRADAS)
+                 if CACHE_PERFILES else None)
+        parser_executor = ProcessPoolExecutor(PROCESOS_PARSEO) if PARSEO_FUERA_DEL_NAVEGADOR else None
+        archive = PageArchive(ARCHIVO_PAGINAS) if ARCHIVO_PAGINAS else None
+        return ProfileScraper(self._get_session(), cache=cache, parser_executor=parser_executor,
+                              archive=archive, pacer=PacingScheduler("perfil", *self.pacing))
+
+    def _close_scraper(self, scraper: "ProfileScraper"):
+        """Libera los recursos creados por _build_scraper."""
+        if scraper.parser_executor:
+            scraper.parser_executor.shutdown()
+        if scraper.archive:
+            scraper.archive.close()
+        if scraper.cache:
+            print(f"🗃️ Caché de perfiles: {scraper.cache.hits} aciertos, {scraper.cache.misses} fallos.")
+            scraper.cache.close()
+
+    def _build_pool(self, workers: int) -> "ScraperPool":
+        from scraper_pool import ScraperPool
+
+        return ScraperPool(self.username, self.password, workers=workers, pacing=self.pacing,
+                           cookies_file=ARCHIVO_COOKIES, driver_path_file=ARCHIVO_RUTA_DRIVER,
+                           archive_root=ARCHIVO_PAGINAS, base_url=self.base_url)
+
+    def _build_live_analyzer(self) -> "LiveBenfordAnalyzer | None":
+        if not ANALISIS_EN_VIVO:
+            return None
+        from pipeline import LiveBenfordAnalyzer
+
+        return LiveBenfordAnalyzer(INFORME_CADA, stop_after=PARADA_ANTICIPADA, plot_every=GRAFICO_CADA,
+                                   graph_filename=self.graph_filename)
 
     def _run_phase_2_scrape_counts(self):
         """FASE 2: Recopilación de Información Completa de Perfiles."""
-        if not os.path.exists(self.following_list_csv):
-            print(f"\nNecesitas ejecutar la Fase 1 primero. Archivo '{self.following_list_csv}' no encontrado.")
+        usernames_to_count = self._read_following()
+        if usernames_to_count is None:
+            missing = "', '".join(self._following_lists().values())
+            print(f"\nNecesitas ejecutar la Fase 1 primero. Archivo '{missing}' no encontrado.")
             return
 
         print("\n--- Fase 2: Recopilación de Información de Perfiles (Seguidores, Seguidos, Biografía) ---")
-        scraper = ProfileScraper(self.username, self.password)
-        usernames_to_count = scraper.read_usernames_from_csv(self.following_list_csv)
+        scraper = self._build_scraper()
 
         if usernames_to_count:
             try:
-                scraper.scrape_follower_counts(usernames_to_count, self.output_data_file)
+                pool = None
+                if self.workers > 1:
+                    pool = self._build_pool(self.workers)
+                    # Un login previo deja las cookies en disco para que los workers no lo repitan
+                    if not os.path.exists(ARCHIVO_COOKIES):
+                        self._get_session().login()
+                scraper.scrape_follower_counts(usernames_to_count, self.output_data_file, resume=self.resume,
+                                               pool=pool, live_analyzer=self._build_live_analyzer())
+                self._export_report()
+                self._record_history(scraper)
             except Exception as e:
                 print(f"Error en la Fase 2: {e}")
             finally:
-                scraper.close_driver()
+                self._close_scraper(scraper)
         else:
             print("No hay usuarios para procesar. Terminando Fase 2.")
+            self._close_scraper(scraper)
+
+    def _run_phases_1_2_streaming(self):
+        """
+        FASES 1 + 2 solapadas: la Fase 1 hace scroll en el navegador principal (en un hilo) y
+        cada username descubierto pasa por una cola a los navegadores del pool de la Fase 2.
+        El CSV de la Fase 1 se sigue escribiendo al terminar el scroll; si la Fase 2 para antes,
+        el scroll se detiene y la lista incompleta no se guarda.
+        """
+        print("\n--- 💻 Fases 1 + 2 solapadas: los perfiles se procesan a medida que aparecen ---")
+        session = self._get_session()
+        # El login en el navegador principal deja las cookies que reutilizan los workers del pool
+        if not session.login():
+            print("Login fallido. No se puede continuar.")
+            return
+
+        usernames = queue.Queue()
+
+        def on_usernames(batch):
+            for username in batch:
+                usernames.put(username)
+
+        from followers_downloader import FollowersDownloader
+
+        downloader = FollowersDownloader(session, scroll_pacer=PacingScheduler("scroll", *self.scroll_pacing))
+
+        def phase_1():
+            try:
+                self._download_following(downloader, on_usernames=on_usernames)
+            except Exception as e:
+                print(f"Error en la Fase 1: {e}")
+            finally:
+                usernames.put(None)  # Fin de la lista
+
+        producer = threading.Thread(target=phase_1, name="fase-1", daemon=True)
+        scraper = self._build_scraper()
+        try:
+            producer.start()
+            scraper.scrape_streaming(usernames, self.output_data_file, self._build_pool(max(self.workers, 1)),
+                                     resume=self.resume, live_analyzer=self._build_live_analyzer())
+            self._export_report()
+            self._record_history(scraper)
+        except Exception as e:
+            print(f"Error en la Fase 2: {e}")
+        finally:
+            # Si la Fase 2 terminó antes (parada anticipada o error), el scroll no sigue hasta el final
+            downloader.stop()
+            producer.join()
+            self._close_scraper(scraper)
+
+    def _export_report(self):
+        """Paso de reporte opcional: copia los datos de la Fase 2 a un XLSX."""
+        if not self.export_xlsx or self.output_format == 'xlsx':
+            return
+        from storage import export_xlsx, open_store
+
+        store = open_store(self.output_data_file)
+        if store.exists():
+            export_xlsx(store, self.report_xlsx_file)
+
+    def _record_history(self, scraper):
+        """
+        Añade al historial de seguidores una captura con los perfiles que cargó esta Fase 2, cada
+        uno con la fecha de su carga (los de la caché o ya hechos al reanudar no cuentan).
+        """
+        if not HISTORIAL_SEGUIDORES:
+            return
+        from follower_history import FollowerHistory
+
+        history = FollowerHistory(HISTORIAL_SEGUIDORES)
+        try:
+            history.record_profiles(scraper.fetched, target=self.target_account)
+        finally:
+            history.close()
+
+    def _run_reparse_archive(self):
+        """Reconstruye la salida de la Fase 2 desde las páginas archivadas (sin navegador)."""
+        if not ARCHIVO_PAGINAS or not os.path.exists(ARCHIVO_PAGINAS):
+            print(f"\nNo existe el archivo de páginas '{ARCHIVO_PAGINAS}'.")
+            return
+
+        print("\n--- ♻️ Re-procesado de Páginas Archivadas ---")
+        from page_archive import PageArchive, reparse_archive
+
+        usernames = self._read_following()
+        archive = PageArchive(ARCHIVO_PAGINAS)
+        try:
+            if reparse_archive(archive, self.output_data_file, usernames=usernames):
+                self._export_report()
+        finally:
+            archive.close()
 
     def _run_phase_3_analyze(self):
         """FASE 3: Limpieza y Análisis de Benford."""
@@ -71,26 +363,50 @@ class MainApp:
             return
 
         print("\n--- Fase 3: Limpieza, Análisis de Benford y Gráfico ---")
+        from data_analyzer import DataAnalyzer
+
         analyzer = DataAnalyzer(self.output_data_file)
-        analyzer.clean_and_prepare_data()
-        analyzer.analyze_and_plot_first_digit(self.graph_filename)
+        if self.streaming:
+            analyzer.analyze_streaming(self.graph_filename, chunksize=self.chunksize, incremental=self.incremental)
+        else:
+            analyzer.clean_and_prepare_data()
+            analyzer.analyze_and_plot_first_digit(self.graph_filename)
 
     def run_phase(self, phase_to_run):
         """Ejecuta una fase específica."""
+        try:
+            self._dispatch_phase(phase_to_run)
+        finally:
+            self.close()
+            print("\n" + self.metrics.summary())
+            self.metrics.write_prometheus()
+            self.metrics.close()
+
+    def _timed_phase(self, phase, run):
+        """Ejecuta una fase midiendo su duración (y actualiza el archivo de Prometheus)."""
+        with self.metrics.timer('fase', fase=phase):
+            run()
+        self.metrics.write_prometheus()
 
+    def _dispatch_phase(self, phase_to_run):
         if phase_to_run == 1:
-            self._run_phase_1_download()
+            self._timed_phase(1, self._run_phase_1_download)
         elif phase_to_run == 2:
-            self._run_phase_2_scrape_counts()
+            self._timed_phase(2, self._run_phase_2_scrape_counts)
         elif phase_to_run == 3:
-            self._run_phase_3_analyze()
+            self._timed_phase(3, self._run_phase_3_analyze)
+        elif phase_to_run == 5:
+            self._timed_phase(5, self._run_reparse_archive)
         elif phase_to_run == 0:
             # Ejecutar completo
-            self._run_phase_1_download()
-            self._run_phase_2_scrape_counts()
-            self._run_phase_3_analyze()
+            if self.overlap:
+                self._timed_phase('1+2', self._run_phases_1_2_streaming)
+            else:
+                self._timed_phase(1, self._run_phase_1_download)
+                self._timed_phase(2, self._run_phase_2_scrape_counts)
+            self._timed_phase(3, self._run_phase_3_analyze)
         else:
-            print("\n Opción no válida. Por favor, selecciona 0, 1, 2 o 3.")
+            print("\n Opción no válida. Por favor, selecciona 0, 1, 2, 3 o 5.")
 
 
 # ----------------------------------------------------------------------
@@ -107,12 +423,13 @@ def display_menu():
     print("  [2] 🖱️ FASE 2: Recolectar Info Completa (Seguidores, Seguidos, Biografía) (Requiere Fase 1)")
     print("  [3] 📈 FASE 3: Análisis de Benford y Gráfico (Requiere Fase 2)")
     print("  [0] ✨ EJECUTAR PROCESO COMPLETO (1 -> 2 -> 3)")
+    print("  [5] ♻️ RE-PROCESAR páginas archivadas sin navegador (reconstruye la Fase 2)")
     print("  [4] 🛑 Salir")
     print("=" * 40)
 
     while True:
         try:
-            choice = input("Ingresa tu opción (0-4): ").strip()
+            choice = input("Ingresa tu opción (0-5): ").strip()
             if choice == '4':
                 sys.exit(0)
             return int(choice)
@@ -120,22 +437,88 @@ def display_menu():
             print("Entrada inválida. Por favor, ingresa un número.")
 
 
-if __name__ == '__main__':
+def build_parser() -> argparse.ArgumentParser:
+    """Parser de la línea de comandos: un subcomando por fase y las opciones comunes."""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('-o', '--objetivo', default=CUENTA_OBJETIVO, help="Cuenta objetivo a analizar")
+    common.add_argument('-l', '--limite', type=int, default=LIMITE_SEGUIDOS,
+                        help="Máximo de seguidos a recolectar en la Fase 1")
+    common.add_argument('-f', '--formato', default=FORMATO_SALIDA,
+                        help="Formato de trabajo de la Fase 2: parquet, sqlite, csv o xlsx")
+    common.add_argument('--sin-xlsx', action='store_true', help="No exportar el XLSX de reporte")
+    common.add_argument('-d', '--dir-salida', default=DIRECTORIO_SALIDA,
+                        help="Carpeta de los archivos de la cuenta objetivo")
+    common.add_argument('-n', '--navegadores', type=int, default=NUM_NAVEGADORES,
+                        help="Navegadores en paralelo para la Fase 2")
+    common.add_argument('--oculto', action='store_true', default=NAVEGADOR_OCULTO,
+                        help="Navegador sin ventana (headless)")
+    common.add_argument('--url-base', default=URL_BASE, help="Sitio de trabajo (Instagram o un servidor de fixtures)")
+    common.add_argument('--sin-reanudar', action='store_true',
+                        help="Fase 2: volver a procesar los perfiles ya guardados")
+    common.add_argument('--sin-streaming', action='store_true',
+                        help="Fase 3: cargar los datos completos en memoria en lugar de leer por chunks")
+    common.add_argument('--chunk', type=int, default=TAMANO_CHUNK, help="Fase 3: filas por chunk en streaming")
+    common.add_argument('--sin-incremental', action='store_true',
+                        help="Fase 3: recalcular desde cero sin usar el estado del análisis anterior")
 
-    phase = -1  # Valor inicial que indica que se necesita preguntar
+    parser = argparse.ArgumentParser(
+        description="Analizador de seguidos con la Ley de Benford. Sin subcomando muestra el menú interactivo.")
+    subparsers = parser.add_subparsers(dest='comando', metavar='COMANDO')
+    for name, (phase, aliases, help_text) in COMANDOS.items():
+        subparser = subparsers.add_parser(name, aliases=aliases, help=help_text, parents=[common])
+        subparser.set_defaults(fase=phase)
+    subparsers.add_parser('menu', help="Menú interactivo (por defecto)", parents=[common]).set_defaults(fase=None)
 
-    # 1. Verificar si hay argumentos en línea de comandos (Ejecución silenciosa)
-    if len(sys.argv) > 1:
-        try:
-            phase = int(sys.argv[1])
-        except ValueError:
-            print("❌ El argumento debe ser un número entero (0, 1, 2 o 3).")
+    batch = subparsers.add_parser('lote', aliases=['batch'], parents=[common],
+                                  help="Varias cuentas objetivo: cada perfil compartido se carga una sola vez")
+    batch.add_argument('objetivos', nargs='*', help="Cuentas objetivo del lote")
+    batch.add_argument('-a', '--archivo-objetivos', help="Archivo de texto con una cuenta objetivo por línea")
+    batch.add_argument('--nombre-lote', default="lote", help="Prefijo del dataset compartido de la Fase 2")
+    batch.add_argument('--fase', type=int, choices=(0, 1, 2, 3, 5), default=0,
+                       help="Fase del lote a ejecutar (por defecto 0, el proceso completo)")
+    batch.set_defaults(lote=True)
+    # Sin subcomando: menú con las opciones por defecto
+    parser.set_defaults(fase=None, lote=False, **{action.dest: action.default for action in common._actions})
+    return parser
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+
+    # Compatibilidad con la ejecución silenciosa anterior: `python main_app.py 3`
+    if argv and argv[0].isdigit():
+        legacy = {str(phase): name for name, (phase, _, _) in COMANDOS.items()}
+        if argv[0] not in legacy:
+            print("❌ El argumento debe ser un número entero (0, 1, 2, 3 o 5).")
             sys.exit(1)
+        argv[0] = legacy[argv[0]]
 
-    app = MainApp(USER, PASSWORD, CUENTA_OBJETIVO, LIMITE_SEGUIDOS)
+    args = build_parser().parse_args(argv)
 
-    # 2. Si no hay argumento, mostrar el menú interactivo
-    if phase == -1:
+    # Sin subcomando, mostrar el menú interactivo (antes de cargar nada pesado)
+    phase = args.fase
+    if phase is None:
         phase = display_menu()
 
-    app.run_phase(phase)
\ No newline at end of file
+    options = dict(streaming=not args.sin_streaming, output_format=args.formato, export_xlsx=not args.sin_xlsx,
+                   resume=not args.sin_reanudar, workers=args.navegadores, base_url=args.url_base,
+                   headless=args.oculto, output_dir=args.dir_salida, chunksize=args.chunk,
+                   incremental=not args.sin_incremental)
+    try:
+        if args.lote:
+            from batch_app import BatchApp, read_targets_file
+
+            targets = list(args.objetivos)
+            if args.archivo_objetivos:
+                targets += read_targets_file(args.archivo_objetivos)
+            app = BatchApp(USER, PASSWORD, targets, args.limite, batch_name=args.nombre_lote, **options)
+        else:
+            app = MainApp(USER, PASSWORD, args.objetivo, args.limite, **options)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+    app.run_phase(phase)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+# metrics.py
+import json
+import os
+import threading
+import time
+
+# Prefijo de las métricas en el archivo de texto de Prometheus
+PROMETHEUS_PREFIX = "benford_scraper"
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _prometheus_labels(key: tuple) -> str:
+    if not key:
+        return ""
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in key)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + "}"
+
+
+class _Timer:
+    """Context manager que mide un bloque y lo registra al salir (con las etiquetas añadidas dentro)."""
+
+    def __init__(self, metrics, name: str, labels: dict):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+        self.start = None
+
+    def set(self, **labels):
+        """Añade o cambia etiquetas antes de registrar (p. ej. el estado del resultado)."""
+        self.labels.update(labels)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.labels.setdefault('estado', 'EXCEPCION')
+        self.metrics.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Metrics:
+    """
+    Registro de duraciones y conteos con etiquetas.
+
+    Cada observación se añade como un evento al archivo JSON-lines (si hay ruta) y se acumula
+    en memoria (n, suma, máximo) para el resumen y el archivo de texto de Prometheus.
+    """
+
+    def __init__(self, jsonl_path: str | None = None, prometheus_path: str | None = None,
+                 run_id: str | None = None):
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self.run_id = run_id or time.strftime('%Y%m%d-%H%M%S')
+        self._lock = threading.Lock()
+        self._file = None
+        self._durations = {}  # (nombre, etiquetas) -> [n, suma, máximo]
+        self._counters = {}   # (nombre, etiquetas) -> valor
+
+    def timer(self, name: str, **labels) -> _Timer:
+        """Mide la duración de un bloque `with`."""
+        return _Timer(self, name, labels)
+
+    def observe(self, name: str, seconds: float, **labels):
+        """Registra una duración ya medida."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            stats = self._durations.setdefault(key, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+        self._emit({'tipo': 'duracion', 'nombre': name, 'segundos': round(seconds, 6), **labels})
+
+    def count(self, name: str, value: int = 1, **labels):
+        """Incrementa un contador."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        self._emit({'tipo': 'conteo', 'nombre': name, 'valor': value, **labels})
+
+    def _emit(self, event: dict):
+        if not self.jsonl_path:
+            return
+        line = json.dumps({'ts': round(time.time(), 3), 'ejecucion': self.run_id, 'pid': os.getpid(), **event},
+                          ensure_ascii=False, default=str)
+        with self._lock:
+            if self._file is None:
+                # Modo append con búfer de línea: varios procesos pueden escribir en el mismo archivo
+                self._file = open(self.jsonl_path, 'a', encoding='utf-8', buffering=1)
+            self._file.write(line + "\n")
+
+    def snapshot(self) -> dict:
+        """Acumulados en memoria (duraciones y contadores) serializables, p. ej. para enviarlos desde un worker."""
+        with self._lock:
+            return {'duraciones': {key: list(stats) for key, stats in self._durations.items()},
+                    'conteos': dict(self._counters)}
+
+    def merge(self, snapshot: dict):
+        """
+        Suma los acumulados de otro proceso (ver snapshot) al resumen y al archivo de Prometheus.
+        No emite eventos: el otro proceso ya los escribió en el JSON-lines.
+        """
+        with self._lock:
+            for key, (n, total, maximum) in snapshot['duraciones'].items():
+                stats = self._durations.setdefault(key, [0, 0.0, 0.0])
+                stats[0] += n
+                stats[1] += total
+                stats[2] = max(stats[2], maximum)
+            for key, value in snapshot['conteos'].items():
+                self._counters[key] = self._counters.get(key, 0) + value
+
+    def totals(self) -> dict:
+        """Segundos totales y número de observaciones por nombre de métrica (sin etiquetas)."""
+        totals = {}
+        with self._lock:
+            for (name, _), (n, total, _) in self._durations.items():
+                entry = totals.setdefault(name, [0, 0.0])
+                entry[0] += n
+                entry[1] += total
+        return {name: {'n': n, 'segundos': total} for name, (n, total) in totals.items()}
+
+    def summary(self) -> str:
+        """Resumen legible: en qué se fue el tiempo."""
+        totals = self.totals()
+        if not totals:
+            return "📏 Sin métricas registradas."
+        lines = ["📏 Tiempo por actividad (total | n | media):"]
+        for name, entry in sorted(totals.items(), key=lambda item: -item[1]['segundos']):
+            average = entry['segundos'] / entry['n'] if entry['n'] else 0.0
+            lines.append(f"   {name:<22} {entry['segundos']:10.1f} s | {entry['n']:6d} | {average:8.2f} s")
+        if totals.get('fase', {}).get('segundos') and 'pausa' in totals:
+            phases, pauses = totals['fase']['segundos'], totals['pausa']['segundos']
+            lines.append(f"   Pausas de ritmo: {pauses:.1f} s de {phases:.1f} s de fases "
+                         f"({100 * pauses / phases:.0f}%); trabajo real: {phases - pauses:.1f} s")
+        with self._lock:
+            counters = sorted(self._counters.items())
+        for (name, labels), value in counters:
+            label_text = ", ".join(f"{k}={v}" for k, v in labels)
+            lines.append(f"   {name}[{label_text}]: {value}")
+        return "\n".join(lines)
+
+    def write_prometheus(self):
+        """Escribe las métricas acumuladas en formato textfile de Prometheus (reemplazo atómico)."""
+        if not self.prometheus_path:
+            return
+        with self._lock:
+            durations = sorted(self._durations.items())
+            counters = sorted(self._counters.items())
+
+        lines = []
+        for name in sorted({name for (name, _) in dict(durations)}):
+            metric = f"{PROMETHEUS_PREFIX}_{name}_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for (metric_name, labels), (n, total, _) in durations:
+                if metric_name == name:
+                    lines.append(f"{metric}_sum{_prometheus_labels(labels)} {total:.6f}")
+                    lines.append(f"{metric}_count{_prometheus_labels(labels)} {n}")
+        for name in sorted({name for (name, _) in dict(counters)}):
+            metric = f"{PROMETHEUS_PREFIX}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for (metric_name, labels), value in counters:
+                if metric_name == name:
+                    lines.append(f"{metric}{_prometheus_labels(labels)} {value}")
+
+        tmp_path = f"{self.prometheus_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.prometheus_path)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# Registro del proceso: los módulos lo consultan con get_metrics() en cada uso,
+# así que configure_metrics() surte efecto aunque se llame después de importarlos.
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    return _metrics
+
+
+def configure_metrics(jsonl_path: str | None = None, prometheus_path: str | None = None,
+                      run_id: str | None = None) -> Metrics:
+    """Sustituye el registro del proceso por uno que escribe en las rutas indicadas."""
+    global _metrics
+    _metrics.close()
+    _metrics = Metrics(jsonl_path, prometheus_path, run_id)
+    return _metrics
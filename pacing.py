@@ -0,0 +1,117 @@
+# pacing.py
+import multiprocessing as mp
+import random
+import time
+
+from metrics import get_metrics
+
+# Pausa (segundos) tras cada carga de perfil: el presupuesto de peticiones de una sesión
+# (los mismos 10-15 s que se esperaban después de cada perfil antes de PacingScheduler)
+DEFAULT_PROFILE_PACING = (10, 15)
+# Intervalo entre scrolls del modal de seguidos, contado desde el scroll anterior (la espera de
+# renderizado queda dentro, igual que en la pausa fija de 3-4,5 s original)
+DEFAULT_SCROLL_PACING = (3.0, 4.5)
+
+
+class PacingScheduler:
+    """
+    Política de ritmo explícita: separa dos peticiones consecutivas un intervalo aleatorio.
+
+    El intervalo se cuenta desde el inicio de la petición anterior (wait), así que el trabajo
+    hecho entretanto (p. ej. esperar el renderizado tras un scroll) cuenta y solo se duerme lo
+    que falta. Si se llama a done() al terminar la petición, se cuenta desde ese momento: la
+    carga no consume la pausa (perfiles: 10-15 s después de cada carga). Lleva la cuenta de lo
+    esperado.
+    """
+
+    def __init__(self, name: str, min_delay: float, max_delay: float):
+        self.name = name
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self._last_request = None
+        self.waits = 0
+        self.total_slept = 0.0
+
+    def wait(self) -> float:
+        """Espera hasta el siguiente turno y lo marca como usado; devuelve los segundos dormidos."""
+        remaining = 0.0
+        # La primera petición no tiene a nadie con quien espaciarse
+        if self._last_request is not None:
+            elapsed = time.monotonic() - self._last_request
+            remaining = max(random.uniform(self.min_delay, self.max_delay) - elapsed, 0.0)
+        if remaining > 0:
+            time.sleep(remaining)
+        self._last_request = time.monotonic()
+        self.waits += 1
+        self.total_slept += remaining
+        get_metrics().observe('pausa', remaining, politica=self.name)
+        return remaining
+
+    def done(self):
+        """Marca el final de la petición en curso: el siguiente intervalo empieza ahora."""
+        self._last_request = time.monotonic()
+
+    def report(self) -> str:
+        """Resumen de las pausas realizadas."""
+        average = self.total_slept / self.waits if self.waits else 0.0
+        return (f"⏱️ Pausas '{self.name}': {self.waits} turnos, {self.total_slept:.1f} s en espera "
+                f"(media {average:.1f} s, política {self.min_delay}-{self.max_delay} s).")
+
+
+class SharedRequestBudget:
+    """
+    Presupuesto global de peticiones compartido entre procesos.
+
+    Reparte "turnos" separados por un intervalo aleatorio dentro de (min, max) segundos,
+    de modo que el total de cargas de página de todos los navegadores nunca supera
+    el ritmo permitido a una sola sesión. Con done() al terminar cada carga, el siguiente
+    turno queda además al menos un intervalo después de ese final, como en una sola sesión
+    que espera tras cada perfil.
+    """
+
+    def __init__(self, min_interval: float, max_interval: float, context=None, name: str = "global"):
+        context = context or mp.get_context()
+        self.name = name
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._lock = context.Lock()
+        self._next_slot = context.Value('d', 0.0, lock=False)
+        self.waits = 0
+        self.total_slept = 0.0
+
+    def wait(self, stop=None) -> float:
+        """
+        Bloquea hasta el siguiente turno libre; devuelve los segundos esperados. Con `stop`
+        (un Event) la espera termina en cuanto se activa.
+        """
+        with self._lock:
+            now = time.time()
+            slot = max(now, self._next_slot.value)
+            self._next_slot.value = slot + random.uniform(self.min_interval, self.max_interval)
+        wait = slot - now
+        if wait > 0:
+            if stop is not None:
+                stop.wait(wait)
+            else:
+                time.sleep(wait)
+        self.waits += 1
+        self.total_slept += max(wait, 0.0)
+        get_metrics().observe('pausa', max(wait, 0.0), politica=self.name)
+        return wait
+
+    def done(self):
+        """Marca el final de una carga: ningún turno empieza antes de un intervalo desde ahora."""
+        with self._lock:
+            self._next_slot.value = max(self._next_slot.value,
+                                        time.time() + random.uniform(self.min_interval, self.max_interval))
+
+    def add_waits(self, waits: int, seconds: float):
+        """Suma las pausas de otro proceso (p. ej. un worker del pool) a las de este."""
+        self.waits += waits
+        self.total_slept += seconds
+
+    def report(self) -> str:
+        """Resumen de las pausas de este proceso (y de las sumadas con add_waits)."""
+        average = self.total_slept / self.waits if self.waits else 0.0
+        return (f"⏱️ Pausas '{self.name}': {self.waits} turnos, {self.total_slept:.1f} s en espera "
+                f"(media {average:.1f} s, presupuesto {self.min_interval}-{self.max_interval} s).")
@@ -0,0 +1,156 @@
+# page_archive.py
+import gzip
+import hashlib
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import zstandard
+except ImportError:  # zstd es opcional; gzip siempre está disponible
+    zstandard = None
+
+_EXTENSIONS = {'zstd': '.html.zst', 'gzip': '.html.gz'}
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, compression: str) -> bytes:
+    if compression == 'zstd':
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class PageArchive:
+    """
+    Archivo en disco del HTML de cada perfil descargado.
+
+    Cada página se guarda comprimida una sola vez por contenido (nombre = SHA-256), y un
+    índice SQLite relaciona username + momento de descarga con ese contenido.
+    """
+
+    def __init__(self, root: str = "page_archive", compression: str | None = None):
+        self.root = root
+        if compression is None:
+            compression = 'zstd' if zstandard else 'gzip'
+        if compression == 'zstd' and zstandard is None:
+            print("⚠️ zstandard no está instalado; el archivo de páginas usará gzip.")
+            compression = 'gzip'
+        self.compression = compression
+
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(root, 'index.sqlite'), timeout=30)
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS paginas ("
+                "username TEXT NOT NULL, obtenido REAL NOT NULL, digest TEXT NOT NULL, "
+                "compresion TEXT NOT NULL, PRIMARY KEY (username, obtenido))"
+            )
+
+    def _object_path(self, digest: str, compression: str) -> str:
+        return os.path.join(self.root, 'objects', digest[:2], digest + _EXTENSIONS[compression])
+
+    def store(self, username: str, page_html: str, fetched_at: float | None = None) -> str:
+        """Guarda el HTML de un perfil (sin duplicar contenidos idénticos); devuelve su digest."""
+        data = page_html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest, self.compression)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as file:
+                file.write(_compress(data, self.compression))
+            os.replace(tmp_path, path)
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO paginas VALUES (?, ?, ?, ?)",
+                (username, fetched_at or time.time(), digest, self.compression),
+            )
+        return digest
+
+    def load(self, digest: str, compression: str) -> str:
+        """HTML de un contenido archivado."""
+        return load_page(self.root, digest, compression)
+
+    def latest_entries(self, usernames=None) -> list[tuple[str, float, str, str]]:
+        """(username, obtenido, digest, compresión) de la descarga más reciente de cada perfil."""
+        rows = self.conn.execute(
+            "SELECT username, MAX(obtenido), digest, compresion FROM paginas GROUP BY username"
+        ).fetchall()
+        if usernames is not None:
+            wanted = set(usernames)
+            rows = [row for row in rows if row[0] in wanted]
+        return rows
+
+    def history(self, username: str) -> list[tuple[float, str]]:
+        """(obtenido, digest) de todas las descargas de un perfil, de la más antigua a la más reciente."""
+        return self.conn.execute(
+            "SELECT obtenido, digest FROM paginas WHERE username = ? ORDER BY obtenido", (username,)
+        ).fetchall()
+
+    def close(self):
+        self.conn.close()
+
+
+def load_page(root: str, digest: str, compression: str) -> str:
+    """Lee y descomprime un contenido del archivo (función de módulo para usarla en procesos)."""
+    path = os.path.join(root, 'objects', digest[:2], digest + _EXTENSIONS[compression])
+    with open(path, 'rb') as file:
+        return _decompress(file.read(), compression).decode('utf-8')
+
+
+def _reparse_entry(args) -> "ProfileRecord":
+    """Worker: carga una página archivada y la analiza con el parser offline."""
+    from profile_parser import parse_profile_html
+    from profile_record import ProfileRecord, ProfileStatus
+
+    root, username, digest, compression = args
+    try:
+        return parse_profile_html(load_page(root, digest, compression), username)
+    except Exception as e:
+        print(f"Error al re-procesar {username}: {e}")
+        return ProfileRecord.failed(username, ProfileStatus.ERROR_DESCONOCIDO)
+
+
+def reparse_archive(archive: PageArchive, output_file: str, usernames=None, workers: int | None = None,
+                    chunksize: int = 5_000) -> int:
+    """
+    Reconstruye la salida de la Fase 2 a partir de las páginas archivadas, sin abrir el navegador.
+
+    Usa la descarga más reciente de cada perfil y reparte el análisis entre procesos.
+    Devuelve el número de perfiles escritos.
+    """
+    from storage import open_store, records_frame
+
+    entries = archive.latest_entries(usernames)
+    if not entries:
+        print("⚠️ No hay páginas archivadas para re-procesar.")
+        return 0
+
+    print(f"♻️ Re-procesando {len(entries)} perfiles archivados...")
+    tasks = [(archive.root, username, digest, compression) for username, _, digest, compression in entries]
+
+    with ProcessPoolExecutor(workers) as executor:
+        results = executor.map(_reparse_entry, tasks, chunksize=64)
+
+        def frames():
+            batch = []
+            for record in results:
+                batch.append(record)
+                if len(batch) >= chunksize:
+                    yield records_frame(batch)
+                    batch = []
+            if batch:
+                yield records_frame(batch)
+
+        open_store(output_file).write_frames(frames())
+
+    print(f"🎉 Salida reconstruida desde el archivo de páginas en: **{output_file}**")
+    return len(entries)
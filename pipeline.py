@@ -0,0 +1,161 @@
+# pipeline.py
+# Consumidores en segundo plano de la Fase 2: el bucle del navegador produce registros,
+# un hilo los persiste por lotes y otro actualiza el análisis de Benford a medida que llegan.
+import queue
+import threading
+from collections import deque
+
+import numpy as np
+
+from benford import BenfordReport, benford_report
+from digit_stats import DigitAccumulator
+from metrics import get_metrics
+
+_FIN = object()  # Marcador de fin de la cola
+
+
+class _QueueConsumer(threading.Thread):
+    """Hilo que consume registros de su cola en lotes (lo acumulado, hasta batch_size)."""
+
+    def __init__(self, name: str, batch_size: int):
+        super().__init__(name=name, daemon=True)
+        self.batch_size = batch_size
+        self.error = None
+        self._queue = queue.Queue()
+
+    def put(self, record):
+        self._queue.put(record)
+
+    def _process(self, batch: list):
+        raise NotImplementedError
+
+    def run(self):
+        finished = False
+        while not finished:
+            # Bloquear hasta el siguiente registro y añadir sin esperar lo que ya esté en cola
+            batch = []
+            item = self._queue.get()
+            while item is not _FIN:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            finished = item is _FIN
+            if batch:
+                try:
+                    self._process(batch)
+                except Exception as e:
+                    # Se guarda el error y se relanza en close(): no se pierde en silencio
+                    self.error = e
+
+    def close(self):
+        """Procesa lo pendiente y termina el hilo; relanza el error del hilo si lo hubo."""
+        if self.is_alive():
+            self._queue.put(_FIN)
+            self.join()
+        if self.error is not None:
+            raise self.error
+
+
+class BackgroundWriter(_QueueConsumer):
+    """Persiste los perfiles en el journal desde un hilo aparte (un commit por lote)."""
+
+    def __init__(self, journal, batch_size: int = 50):
+        super().__init__("escritor-journal", batch_size)
+        self.journal = journal
+        self.written = 0
+
+    def _process(self, batch: list):
+        with get_metrics().timer('guardado', destino='journal'):
+            self.journal.append(batch)
+        self.written += len(batch)
+
+
+class LiveBenfordAnalyzer(_QueueConsumer):
+    """
+    Actualiza los histogramas de dígitos con cada lote de perfiles y, cada `report_every`
+    perfiles, recalcula las pruebas de Benford e imprime una línea con el estado.
+
+    `stop_after` (mínimo de conteos válidos) activa la parada anticipada: el resultado se
+    considera claro cuando el veredicto MAD del primer dígito se repite `stable_reports` veces.
+    Con `plot_every` el gráfico se regenera cada tantos perfiles (ver plot_if_due).
+    """
+
+    def __init__(self, report_every: int = 25, stop_after: int | None = None, stable_reports: int = 3,
+                 plot_every: int | None = None, graph_filename: str | None = None, batch_size: int = 200):
+        super().__init__("analisis-en-vivo", batch_size)
+        self.report_every = report_every
+        self.stop_after = stop_after
+        self.plot_every = plot_every
+        self.graph_filename = graph_filename
+        self.accumulator = DigitAccumulator()
+        self.report: BenfordReport | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._verdicts = deque(maxlen=stable_reports)
+
+    def seed(self, journal, since: int = 0):
+        """
+        Parte de los conteos que esta ejecución ya guardó en el journal (al reanudar: las filas
+        posteriores a la marca `since`); llamar antes de start().
+        """
+        if not journal.exists():
+            return
+        self.accumulator.update(journal.changes_since(since, columns=['seguidores'])['seguidores'])
+
+    def _process(self, batch: list):
+        # Conteos enteros de los ProfileRecord; NaN donde el perfil no tiene conteo
+        values = np.array([np.nan if record.seguidores is None else record.seguidores for record in batch],
+                          dtype=np.float64)
+        with self._lock:
+            self.accumulator.update(values)
+        self._pending += len(batch)
+        if self._pending >= self.report_every:
+            self._pending = 0
+            self._update_report()
+
+    def _update_report(self):
+        report = benford_report(self.snapshot())
+        first = report.first_digit
+        if not first.n:
+            return
+        with self._lock:
+            self.report = report
+            self._verdicts.append(first.mad_conformity)
+        print(f"📈 Benford en vivo [n={first.n}]: chi2 p={first.chi_square_p:.3f}, MAD={first.mad:.4f} "
+              f"({first.mad_conformity}), {'conforme' if first.conforms else 'no conforme'}.")
+
+    def snapshot(self) -> DigitAccumulator:
+        """Copia de los histogramas acumulados hasta ahora."""
+        with self._lock:
+            return DigitAccumulator().merge(self.accumulator)
+
+    def plot_if_due(self, processed: int) -> bool:
+        """
+        Regenera el gráfico si toca (cada plot_every perfiles procesados).
+
+        Se llama desde el bucle productor con una copia de los histogramas, para que dibujar
+        no retrase a este hilo consumidor.
+        """
+        if not self.plot_every or not self.graph_filename or processed % self.plot_every:
+            return False
+        from report_renderer import render_benford_chart
+
+        render_benford_chart(self.snapshot().first_digit_frequencies(), self.graph_filename)
+        return True
+
+    @property
+    def conclusive(self) -> bool:
+        """El veredicto ya no cambia: hay suficientes conteos y las últimas evaluaciones coinciden."""
+        with self._lock:
+            if self.stop_after is None or self.accumulator.valid < self.stop_after:
+                return False
+            return len(self._verdicts) == self._verdicts.maxlen and len(set(self._verdicts)) == 1
+
+    def close(self) -> BenfordReport | None:
+        super().close()
+        self._update_report()
+        return self.report
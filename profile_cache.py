@@ -0,0 +1,121 @@
+# profile_cache.py
+import json
+import sqlite3
+import time
+
+from profile_record import RETRYABLE_STATUSES, ProfileRecord
+
+HORA = 3600
+DIA = 24 * HORA
+
+# TTL por estado del perfil (segundos). Los fallos transitorios (TIMEOUT, ERROR_DESCONOCIDO)
+# no se guardan: se reintentan siempre, igual que al reanudar una Fase 2.
+DEFAULT_STATUS_TTLS = {
+    'OK': 3 * DIA,
+    'PRIVADA': 14 * DIA,
+    'NO_EXISTE': 30 * DIA,
+    'NO_ENCONTRADO': 1 * DIA,
+}
+_NO_CACHEABLES = {status.name for status in RETRYABLE_STATUSES}
+# Inserciones entre dos comprobaciones de max_entries (la caché puede excederlo en tantas entradas)
+INSERCIONES_POR_PODA = 500
+
+
+class ProfileCache:
+    """Caché persistente (SQLite) de perfiles ya extraídos, compartida entre ejecuciones y objetivos."""
+
+    TABLE = 'perfiles_cache'
+
+    def __init__(self, path: str = "profile_cache.sqlite", ttl: float | None = None,
+                 status_ttls: dict | None = None, max_entries: int = 200_000):
+        self.path = path
+        self.status_ttls = dict(DEFAULT_STATUS_TTLS)
+        if ttl is not None:
+            self.status_ttls['OK'] = ttl
+        self.status_ttls.update(status_ttls or {})
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0  # Inserciones desde la última poda
+
+        self.conn = sqlite3.connect(path, timeout=30)
+        with self.conn:
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.TABLE} ("
+                "username TEXT PRIMARY KEY, registro TEXT NOT NULL, estado TEXT NOT NULL, "
+                "obtenido REAL NOT NULL, accedido REAL NOT NULL)"
+            )
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_accedido ON {self.TABLE} (accedido)")
+
+    def _ttl(self, status: str) -> float:
+        # Entradas de fallos transitorios guardadas por versiones anteriores: siempre caducadas
+        if status in _NO_CACHEABLES:
+            return 0
+        return self.status_ttls.get(status, self.status_ttls['OK'])
+
+    def get(self, username: str) -> ProfileRecord | None:
+        """Devuelve el registro guardado si sigue vigente según el TTL de su estado."""
+        row = self.conn.execute(
+            f"SELECT registro, estado, obtenido FROM {self.TABLE} WHERE username = ?", (username,)
+        ).fetchone()
+        now = time.time()
+        if row is None or now - row[2] > self._ttl(row[1]):
+            self.misses += 1
+            return None
+
+        with self.conn:
+            self.conn.execute(f"UPDATE {self.TABLE} SET accedido = ? WHERE username = ?", (now, username))
+        self.hits += 1
+        # Las entradas de versiones anteriores (con sentinelas) se convierten al registro tipado
+        return ProfileRecord.from_dict(json.loads(row[0]))
+
+    def put(self, record: ProfileRecord):
+        """
+        Guarda (o actualiza) un registro con la hora actual como momento de obtención. Los
+        fallos transitorios no se guardan.
+        """
+        if record.estado in RETRYABLE_STATUSES:
+            return
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO {self.TABLE} VALUES (?, ?, ?, ?, ?)",
+                (record.username, json.dumps(record.to_dict(), ensure_ascii=False), record.estado.name, now, now),
+            )
+        self._puts += 1
+        if self._puts >= INSERCIONES_POR_PODA:
+            self._evict()
+
+    def _evict(self):
+        """
+        Elimina las entradas usadas hace más tiempo si se supera max_entries. Se hace cada
+        INSERCIONES_POR_PODA inserciones y al cerrar, no en cada put: contar la tabla entera
+        cuesta más cuanto mayor es la caché.
+        """
+        self._puts = 0
+        count = self.conn.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            with self.conn:
+                self.conn.execute(
+                    f"DELETE FROM {self.TABLE} WHERE username IN "
+                    f"(SELECT username FROM {self.TABLE} ORDER BY accedido LIMIT ?)", (excess,)
+                )
+
+    def purge_expired(self) -> int:
+        """Borra todas las entradas caducadas; devuelve cuántas se eliminaron."""
+        now = time.time()
+        removed = 0
+        with self.conn:
+            for status in set(self.status_ttls) | {row[0] for row in self.conn.execute(
+                    f"SELECT DISTINCT estado FROM {self.TABLE}")}:
+                removed += self.conn.execute(
+                    f"DELETE FROM {self.TABLE} WHERE estado = ? AND obtenido < ?",
+                    (status, now - self._ttl(status)),
+                ).rowcount
+        return removed
+
+    def close(self):
+        if self._puts:
+            self._evict()
+        self.conn.close()
@@ -0,0 +1,160 @@
+# profile_parser.py
+import json
+import re
+
+from lxml import html as lxml_html
+
+from count_parser import ESPACIOS_MILES, parse_count
+from profile_record import ProfileRecord, ProfileStatus
+from profile_selectors import (
+    BIO_FALLBACK_RULES,
+    BIO_FALLBACK_SELECTOR,
+    BIO_RULES,
+    BIO_SELECTORS,
+    FOLLOWERS_SELECTORS,
+    FOLLOWING_SELECTORS,
+    NOT_FOUND_TEXTS,
+    PRIVATE_INDICATORS,
+    looks_like_bio,
+)
+
+# Objeto JSON embebido del perfil: solo se usa el que tiene "username" igual al objetivo (la
+# página también incluye JSON de cuentas sugeridas y del usuario con sesión iniciada)
+_JSON_TOKENS = re.compile(r'"(?:[^"\\]|\\.)*"|[{}]')
+_JSON_FOLLOWERS_KEYS = ('follower_count', 'edge_followed_by')
+_JSON_FOLLOWING_KEYS = ('following_count', 'edge_follow')
+
+# Meta descripción: "1,234 Followers, 567 Following, 89 Posts" / "1.234 seguidores, 567 seguidos..."
+_COUNT = rf'(\d[\d.,{ESPACIOS_MILES}]*\s*(?:mill\.?|mil|[KkMm])?)'
+_META_FOLLOWERS = re.compile(_COUNT + r'\s+(?:Followers|seguidores)', re.IGNORECASE)
+_META_FOLLOWING = re.compile(_COUNT + r'\s+(?:Following|seguidos)', re.IGNORECASE)
+_META_XPATH = "//meta[@property='og:description' or @name='description']/@content"
+
+
+def _text(node) -> str:
+    return (node.text_content() if hasattr(node, 'text_content') else str(node)).strip()
+
+
+def first_count(candidates) -> int | None:
+    """Primer candidato (en orden de selectores) que se pueda convertir a número (K, M, "mil"...)."""
+    return next((n for n in map(parse_count, candidates) if n is not None), None)
+
+
+def _count_candidates(tree, selectors) -> list[str]:
+    """Textos con dígitos de los selectores, en orden (lo mismo que countCandidates en el navegador)."""
+    return [text for selector in selectors for text in map(_text, tree.xpath(selector))
+            if any(c.isdigit() for c in text)]
+
+
+def _dom_bio(tree) -> str:
+    for selector in BIO_SELECTORS:
+        for node in tree.xpath(selector):
+            if looks_like_bio(_text(node), BIO_RULES):
+                return _text(node)
+    for node in tree.xpath(BIO_FALLBACK_SELECTOR):
+        if looks_like_bio(_text(node), BIO_FALLBACK_RULES):
+            return _text(node)
+    return ""
+
+
+def target_profile_json(scripts, username: str) -> dict | None:
+    """
+    Objeto JSON cuyo "username" es el perfil objetivo, buscado en los textos de los <script>.
+
+    Se localiza la clave y se toma el objeto que la contiene directamente (contando llaves
+    fuera de las cadenas); si no es JSON válido o no aparece, None y se usan meta y DOM.
+    """
+    key = re.compile(r'"username"\s*:\s*' + re.escape(json.dumps(username)))
+    for script in scripts:
+        keys = {match.start() for match in key.finditer(script)}
+        if not keys:
+            continue
+        opened, owner = [], None
+        for token in _JSON_TOKENS.finditer(script):
+            value = token.group()
+            if value == '{':
+                opened.append(token.start())
+            elif value == '}':
+                if not opened:
+                    continue
+                start = opened.pop()
+                if start != owner:
+                    continue
+                owner = None
+                try:
+                    data = json.loads(script[start:token.end()])
+                except ValueError:
+                    continue
+                if isinstance(data, dict) and data.get('username') == username:
+                    return data
+            elif token.start() in keys and opened and owner is None:
+                owner = opened[-1]
+    return None
+
+
+def _json_count(data: dict | None, keys) -> int | None:
+    """Conteo exacto del JSON del perfil (formato nuevo: follower_count; antiguo: edge_followed_by.count)."""
+    if not data:
+        return None
+    flat, edge = keys
+    value = data.get(flat)
+    if value is None and isinstance(data.get(edge), dict):
+        value = data[edge].get('count')
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+def _meta_count(meta: str, pattern) -> int | None:
+    match = pattern.search(meta)
+    return parse_count(match.group(1)) if match else None
+
+
+def build_profile_record(username: str, status: ProfileStatus, data: dict | None, meta: str,
+                         followers: list[str], following: list[str], dom_bio: str) -> ProfileRecord:
+    """
+    Registro de un perfil a partir de lo extraído de su página, con el mismo orden de preferencia
+    en el navegador (ProfileScraper._read_profile) y offline (parse_profile_html):
+
+    - estado: el que detectó el DOM (privada / inexistente) o is_private del JSON del perfil;
+    - conteos: JSON del perfil (exactos), meta descripción y, por último, candidatos del DOM;
+    - biografía: la del JSON del perfil o, si no hay, la del DOM.
+    """
+    if status == ProfileStatus.OK and data and data.get('is_private') is True:
+        status = ProfileStatus.PRIVADA
+    if status != ProfileStatus.OK:
+        return ProfileRecord.failed(username, status)
+
+    counts = []
+    for keys, pattern, candidates in ((_JSON_FOLLOWERS_KEYS, _META_FOLLOWERS, followers),
+                                      (_JSON_FOLLOWING_KEYS, _META_FOLLOWING, following)):
+        count = _json_count(data, keys)
+        if count is None:
+            count = _meta_count(meta, pattern)
+        counts.append(count if count is not None else first_count(candidates))
+
+    bio = (data or {}).get('biography')
+    bio = bio.strip() if isinstance(bio, str) else ""
+    # Sin conteo de seguidores el registro queda como NO_ENCONTRADO
+    return ProfileRecord.from_counts(username, *counts, bio or dom_bio)
+
+
+def parse_profile_html(page_html: str, username: str) -> ProfileRecord:
+    """Construye, a partir del HTML de un perfil, el mismo registro que ProfileScraper._read_profile."""
+    if not page_html:
+        return ProfileRecord.failed(username, ProfileStatus.ERROR_DESCONOCIDO)
+
+    tree = lxml_html.fromstring(page_html)
+
+    # Cuenta privada o inexistente (mismo orden que EXTRACTION_SCRIPT)
+    status = ProfileStatus.OK
+    if any(tree.xpath(xpath) for xpath in PRIVATE_INDICATORS):
+        status = ProfileStatus.PRIVADA
+    elif any(text in page_html for text in NOT_FOUND_TEXTS):
+        status = ProfileStatus.NO_EXISTE
+
+    quoted = json.dumps(username)
+    scripts = [script for script in tree.xpath("//script/text()") if quoted in script]
+    return build_profile_record(
+        username, status, target_profile_json(scripts, username), " ".join(tree.xpath(_META_XPATH)),
+        _count_candidates(tree, FOLLOWERS_SELECTORS), _count_candidates(tree, FOLLOWING_SELECTORS),
+        _dom_bio(tree) if status == ProfileStatus.OK else "",
+    )
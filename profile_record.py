@@ -0,0 +1,103 @@
+# profile_record.py
+# Registro tipado de un perfil de la Fase 2: conteos enteros, estado en una columna aparte y
+# biografía propia (sin cadenas sentinela mezcladas con los números).
+from enum import IntEnum
+
+
+class ProfileStatus(IntEnum):
+    """Estado de la extracción de un perfil (columna 'estado', int8). El nombre es el sentinela antiguo."""
+    OK = 0
+    PRIVADA = 1
+    NO_EXISTE = 2
+    NO_ENCONTRADO = 3
+    TIMEOUT = 4
+    ERROR_DESCONOCIDO = 5
+
+    @classmethod
+    def from_text(cls, value) -> "ProfileStatus | None":
+        """Estado a partir de su nombre ('PRIVADA', ...) o de su número; None si no es un estado."""
+        if isinstance(value, str) and not value.strip().isdigit():
+            return cls.__members__.get(value.strip().upper())
+        try:
+            return cls(int(value))
+        except (TypeError, ValueError):
+            return None
+
+
+# Estados que se vuelven a intentar al reanudar un scraping interrumpido
+RETRYABLE_STATUSES = (ProfileStatus.TIMEOUT, ProfileStatus.ERROR_DESCONOCIDO)
+
+
+class ProfileRecord:
+    """
+    Un perfil extraído. `seguidores`/`seguidos` son enteros o None (sin conteo); `estado` dice por
+    qué falta un conteo (privada, inexistente, timeout...). Con __slots__ cada registro ocupa
+    unos pocos punteros en lugar de un dict de cadenas.
+    """
+
+    __slots__ = ('username', 'seguidores', 'seguidos', 'biografia', 'estado')
+
+    def __init__(self, username: str, seguidores: int | None = None, seguidos: int | None = None,
+                 biografia: str = "", estado: ProfileStatus = ProfileStatus.OK):
+        self.username = username
+        self.seguidores = seguidores
+        self.seguidos = seguidos
+        self.biografia = biografia
+        self.estado = ProfileStatus(estado)
+
+    @classmethod
+    def failed(cls, username: str, status: ProfileStatus) -> "ProfileRecord":
+        """Registro sin datos de un perfil que no se pudo extraer."""
+        return cls(username, estado=status)
+
+    @classmethod
+    def from_counts(cls, username: str, followers: int | None, following: int | None,
+                    biografia: str = "") -> "ProfileRecord":
+        """Registro de un perfil cargado; sin conteo de seguidores queda como NO_ENCONTRADO."""
+        status = ProfileStatus.OK if followers is not None else ProfileStatus.NO_ENCONTRADO
+        return cls(username, followers, following, biografia or "", status)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ProfileRecord":
+        """Registro a partir de un dict tipado o del formato antiguo (sentinelas en las columnas)."""
+        from count_parser import parse_count
+
+        status = ProfileStatus.from_text(data['estado']) if data.get('estado') is not None else None
+        if status is None:
+            # Formato antiguo: el sentinela de 'seguidores' es el estado y se repite en la biografía
+            status = ProfileStatus.from_text(str(data.get('seguidores') or ''))
+            if status is None:
+                followers = parse_count(data.get('seguidores'))
+                return cls.from_counts(data['username'], followers, parse_count(data.get('seguidos')),
+                                       _text(data.get('biografia')))
+            if status != ProfileStatus.OK:
+                return cls.failed(data['username'], status)
+        return cls(data['username'], parse_count(data.get('seguidores')), parse_count(data.get('seguidos')),
+                   _text(data.get('biografia')), status)
+
+    def to_dict(self) -> dict:
+        return {column: getattr(self, column) for column in self.__slots__}
+
+    def as_tuple(self) -> tuple:
+        """Valores en el orden de las columnas de la Fase 2 (estado como entero)."""
+        return self.username, self.seguidores, self.seguidos, self.biografia, int(self.estado)
+
+    def count_text(self, value: int | None) -> str:
+        """Conteo para mostrar: el número o, si falta, el nombre del estado."""
+        if value is not None:
+            return str(value)
+        return self.estado.name if self.estado != ProfileStatus.OK else ProfileStatus.NO_ENCONTRADO.name
+
+    def __eq__(self, other):
+        if not isinstance(other, ProfileRecord):
+            return NotImplemented
+        return self.as_tuple() == other.as_tuple()
+
+    def __repr__(self):
+        return (f"ProfileRecord({self.username!r}, seguidores={self.seguidores!r}, seguidos={self.seguidos!r}, "
+                f"estado={self.estado.name})")
+
+
+def _text(value) -> str:
+    """Biografía como texto ('' si falta o es NaN/NA)."""
+    return value if isinstance(value, str) else ""
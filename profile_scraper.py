@@ -1,115 +1,64 @@
 # profile_scraper.py
 import os
-import time
-import random
 import csv
-from selenium import webdriver
-from selenium.webdriver import Chrome
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
+import queue
+import time
+from collections import deque
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+from browser_session import BrowserSession
+from metrics import get_metrics
+from pacing import DEFAULT_PROFILE_PACING, PacingScheduler
+from pipeline import BackgroundWriter
+from profile_parser import build_profile_record, parse_profile_html, target_profile_json
+from profile_record import RETRYABLE_STATUSES, ProfileRecord, ProfileStatus
+from profile_selectors import EXTRACTION_ARGS, EXTRACTION_SCRIPT, READY_ARGS, READY_SCRIPT
+from storage import SQLiteStore, journal_path, open_store
+
+# Tiempo máximo (segundos) que se espera a que el perfil muestre conteos o su estado
+ESPERA_PERFIL_LISTO = 8
+
+# Estados que se vuelven a intentar al reanudar un scraping interrumpido
+ESTADOS_REINTENTABLES = RETRYABLE_STATUSES
+
 
 class ProfileScraper:
     """Clase para el login y el scraping de conteos de seguidores de una lista de usuarios."""
 
-    def __init__(self, username, password):
-        self.username = username
-        self.password = password
-        self.driver = None
+    def __init__(self, session: BrowserSession, cache=None, parser_executor=None, archive=None, pacer=None):
+        self.session = session
+        # Política de ritmo entre cargas de perfil (en el pool la sustituye el presupuesto compartido)
+        self.pacer = pacer or PacingScheduler("perfil", *DEFAULT_PROFILE_PACING)
+        self.archive = archive  # PageArchive opcional: guarda el HTML de cada perfil descargado
+        self.cache = cache  # ProfileCache opcional compartida entre ejecuciones
+        # Executor opcional (hilos o procesos): el HTML se analiza fuera del navegador
+        self.parser_executor = parser_executor
+        # (username, seguidores, seguidos, fecha) de los perfiles OK cargados en esta ejecución
+        # (sin los de la caché ni los omitidos al reanudar), para el historial de seguidores
+        self.fetched = []
+
+    @property
+    def driver(self):
+        return self.session.driver
 
     # --- Métodos de Utilidad ---
-    def _init_driver(self, headless=True):
-        """Inicializa y configura el driver de Chrome."""
-        options = webdriver.ChromeOptions()
-        options.add_argument("--window-size=1600,900")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument(
-            "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36"
-        )
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-
-        if headless:
-            options.add_argument("--headless=new")
-
-        service = Service(ChromeDriverManager().install())
-        self.driver = Chrome(service=service, options=options)
-        return self.driver
-
     def _wait_for(self, timeout=15):
         """Función de conveniencia para WebDriverWait."""
-        return WebDriverWait(self.driver, timeout)
-
-    def _login_instagram(self) -> bool:
-        """Realiza el login en Instagram (similar a la lógica del Downloader)."""
-        if not self.driver:
-            self._init_driver(headless=True)  # Usamos headless aquí para ser más rápido
-
-        wait = self._wait_for(20)
-        self.driver.get("https://www.instagram.com/")
-
-        try:
-            user_input = wait.until(EC.presence_of_element_located((By.NAME, "username")))
-            pass_input = wait.until(EC.presence_of_element_located((By.NAME, "password")))
-        except Exception:
-            return False
-
-        user_input.send_keys(self.username)
-        pass_input.send_keys(self.password)
+        return self.session.wait_for(timeout)
 
-        try:
-            submit_btn = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[./div[text()='Iniciar sesión']]")))
-            submit_btn.click()
-        except Exception:
-            return False
+    def login(self) -> bool:
+        """Inicia (o reutiliza) la sesión compartida del navegador."""
+        return self.session.login()
 
+    def _wait_until_profile_ready(self, timeout=ESPERA_PERFIL_LISTO):
+        """Espera a que el perfil renderice sus conteos (o el aviso de privada/inexistente)."""
         try:
-            wait.until(lambda d: "instagram.com" in d.current_url and "login" not in d.current_url)
-            time.sleep(3)
-            print("✅ Login exitoso (Scraper).")
-            
-            # Intentar cerrar pop-ups si existen (sin bloquear si falla)
-            try:
-                time.sleep(2)
-                # Buscar y cerrar pop-ups de notificaciones
-                popup_selectors = [
-                    "//button[contains(text(), 'Ahora no')]",
-                    "//button[contains(text(), 'Not Now')]",
-                    "//button[contains(text(), 'No ahora')]"
-                ]
-                
-                for selector in popup_selectors:
-                    try:
-                        elements = self.driver.find_elements(By.XPATH, selector)
-                        for element in elements:
-                            if element and element.is_displayed():
-                                self.driver.execute_script("arguments[0].click();", element)
-                                time.sleep(1)
-                                break
-                    except Exception:
-                        continue
-            except Exception:
-                # Ignorar errores de pop-ups, no son críticos
-                pass
-            
-            return True
-
-        except Exception as e:
-            print(f"Fallo al detectar la sesión iniciada (Scraper): {e}")
-            # Verificar si realmente estamos logueados
-            try:
-                if "instagram.com" in self.driver.current_url and "login" not in self.driver.current_url:
-                    print("⚠️ Login exitoso pero hubo un problema menor. Continuando...")
-                    return True
-            except:
-                pass
-            return False
+            self._wait_for(timeout).until(lambda d: d.execute_script(READY_SCRIPT, *READY_ARGS))
+        except TimeoutException:
+            # Se extrae igualmente: lo que falte quedará como NO_ENCONTRADO
+            pass
 
     def read_usernames_from_csv(self, filename: str) -> list[str]:
         """Lee la lista de usernames desde el archivo CSV generado en la Fase 1."""
@@ -130,240 +79,312 @@ class ProfileScraper:
             print(f"Error al leer el CSV: {e}")
             return []
 
-    def _extract_number_from_text(self, text: str) -> str:
-        """Extrae números de un texto, manejando K, M, etc."""
-        if not text:
-            return ""
-        # Limpiar y extraer números
-        text = text.replace(',', '').replace('.', '').strip()
-        numbers = ''.join(filter(str.isdigit, text))
-        return numbers if numbers else ""
-
-    def _get_profile_info(self, username: str) -> dict:
-        """Extrae información completa del perfil: seguidores, seguidos, biografía."""
-        wait = self._wait_for(10)
-        profile_url = f"https://www.instagram.com/{username}/"
-        self.driver.get(profile_url)
+    def fetch_profile(self, username: str) -> ProfileRecord:
+        """Carga un perfil y extrae su información completa: seguidores, seguidos, biografía."""
+        with get_metrics().timer('perfil', fuente='navegador') as timer:
+            result = self._read_profile(username)
+            timer.set(estado=result.estado.name)
+        return result
 
-        result = {
-            'username': username,
-            'seguidores': '',
-            'seguidos': '',
-            'biografia': ''
-        }
+    def _read_profile(self, username: str) -> ProfileRecord:
+        """Carga el perfil en el navegador y extrae sus datos (un registro sin conteos y con su estado si falla)."""
+        metrics = get_metrics()
+        wait = self._wait_for(10)
 
         try:
-            wait.until(EC.presence_of_element_located((By.TAG_NAME, "header")))
-            time.sleep(random.uniform(2, 3))
-
-            # Detectar cuenta privada primero
-            private_indicators = [
-                "//*[contains(text(), 'Esta cuenta es privada')]",
-                "//*[contains(text(), 'This account is private')]",
-                "//*[contains(@class, 'rkEop')]"
-            ]
-
-            for indicator in private_indicators:
-                try:
-                    if self.driver.find_elements(By.XPATH, indicator):
-                        result['seguidores'] = "PRIVADA"
-                        result['seguidos'] = "PRIVADA"
-                        result['biografia'] = "PRIVADA"
-                        return result
-                except:
-                    pass
-
-            # Detectar cuenta inexistente
-            if "Lo sentimos, no pudimos encontrar" in self.driver.page_source or "Sorry, this page isn't available" in self.driver.page_source:
-                result['seguidores'] = "NO_EXISTE"
-                result['seguidos'] = "NO_EXISTE"
-                result['biografia'] = "NO_EXISTE"
-                return result
-
-            # Extraer SEGUIDORES (followers)
-            followers_selectors = [
-                "//a[contains(@href, '/followers')]//span",
-                "//a[contains(@href, '/followers')]",
-                "//header//section//li[2]//span",
-                "//header//ul//li[2]//span",
-            ]
-            
-            for selector in followers_selectors:
-                try:
-                    elements = self.driver.find_elements(By.XPATH, selector)
-                    for element in elements:
-                        text = element.text.strip()
-                        if text and any(char.isdigit() for char in text):
-                            numbers = self._extract_number_from_text(text)
-                            if numbers:
-                                result['seguidores'] = numbers
-                                break
-                    if result['seguidores']:
-                        break
-                except:
-                    continue
-
-            # Extraer SEGUIDOS (following)
-            following_selectors = [
-                "//a[contains(@href, '/following')]//span",
-                "//a[contains(@href, '/following')]",
-                "//header//section//li[3]//span",
-                "//header//ul//li[3]//span",
-            ]
-            
-            for selector in following_selectors:
-                try:
-                    elements = self.driver.find_elements(By.XPATH, selector)
-                    for element in elements:
-                        text = element.text.strip()
-                        if text and any(char.isdigit() for char in text):
-                            numbers = self._extract_number_from_text(text)
-                            if numbers:
-                                result['seguidos'] = numbers
-                                break
-                    if result['seguidos']:
-                        break
-                except:
-                    continue
-
-            # Extraer BIOGRAFÍA (description)
-            # La biografía en Instagram está generalmente en un div específico dentro del header
-            bio_selectors = [
-                "//header//section//div[contains(@class, '-vDIg')]//span",
-                "//header//div[contains(@class, '-vDIg')]//span",
-                "//header//section//div[contains(@class, '_aacl')]//span",
-                "//header//div[contains(@class, '_aacl')]//span",
-                "//header//section//div//h1/following-sibling::div//span",
-                "//header//section//div//span[not(ancestor::a)]",
-            ]
-            
-            for selector in bio_selectors:
-                try:
-                    elements = self.driver.find_elements(By.XPATH, selector)
-                    for element in elements:
-                        text = element.text.strip()
-                        # La biografía generalmente tiene más de 5 caracteres y menos de 500
-                        # No contiene números al inicio y no es un enlace
-                        if text and 5 < len(text) < 500:
-                            # Verificar que no sea estadísticas o enlaces
-                            if (not any(char.isdigit() for char in text[:10]) and 
-                                not text.startswith('http') and 
-                                'seguidores' not in text.lower() and 
-                                'seguidos' not in text.lower() and
-                                'following' not in text.lower() and
-                                'followers' not in text.lower() and
-                                'publicaciones' not in text.lower() and
-                                'posts' not in text.lower()):
-                                result['biografia'] = text
-                                break
-                    if result['biografia']:
-                        break
-                except:
-                    continue
-
-            # Si no se encontró biografía con los selectores anteriores, intentar método alternativo
-            if not result['biografia']:
-                try:
-                    # Buscar en el header cualquier texto que parezca biografía
-                    header = self.driver.find_element(By.TAG_NAME, "header")
-                    # Buscar divs que contengan la biografía (generalmente después del nombre de usuario)
-                    divs = header.find_elements(By.XPATH, ".//div//span")
-                    for div in divs:
-                        text = div.text.strip()
-                        if text and 10 < len(text) < 500:
-                            # Filtrar textos que no son biografía
-                            if (not any(char.isdigit() for char in text[:10]) and 
-                                'seguidores' not in text.lower() and 
-                                'seguidos' not in text.lower() and
-                                'following' not in text.lower() and
-                                'followers' not in text.lower() and
-                                not text.startswith('http')):
-                                result['biografia'] = text
-                                break
-                except:
-                    pass
-
-            # Si aún no hay valores, marcar como no encontrado
-            if not result['seguidores']:
-                result['seguidores'] = "NO_ENCONTRADO"
-            if not result['seguidos']:
-                result['seguidos'] = "NO_ENCONTRADO"
-            if not result['biografia']:
-                result['biografia'] = ""
-
-            return result
+            with metrics.timer('navegacion'):
+                self.driver.get(self.session.profile_url(username))
+                wait.until(EC.presence_of_element_located((By.TAG_NAME, "header")))
+                self._wait_until_profile_ready()
+            if self.archive:
+                with metrics.timer('guardado', destino='archivo_paginas'):
+                    self.archive.store(username, self.driver.page_source)
+
+            # Una sola llamada al navegador: estado de la cuenta, candidatos de conteo, biografía,
+            # meta descripción y JSON embebido que menciona al perfil
+            with metrics.timer('extraccion'):
+                extracted = self.driver.execute_script(EXTRACTION_SCRIPT, *EXTRACTION_ARGS, username)
+
+            status = ProfileStatus[extracted['status']]
+            if status != ProfileStatus.OK:
+                return ProfileRecord.failed(username, status)
+            # Misma preferencia de fuentes que el análisis offline (parse_profile_html)
+            return build_profile_record(username, status, target_profile_json(extracted['scripts'], username),
+                                        extracted['meta'], extracted['followers'], extracted['following'],
+                                        extracted['bio'])
 
         except TimeoutException:
-            result['seguidores'] = "TIMEOUT"
-            result['seguidos'] = "TIMEOUT"
-            result['biografia'] = "TIMEOUT"
-            return result
+            return ProfileRecord.failed(username, ProfileStatus.TIMEOUT)
         except Exception as e:
             print(f"Error al procesar {username}: {e}")
-            result['seguidores'] = "ERROR_DESCONOCIDO"
-            result['seguidos'] = "ERROR_DESCONOCIDO"
-            result['biografia'] = "ERROR_DESCONOCIDO"
-            return result
-
-    def _save_results_to_file(self, data: list[dict], filename: str):
-        """Guarda la lista de diccionarios en CSV o XLSX según la extensión del archivo."""
-        if not data:
-            return
-        
-        # Determinar formato según extensión
-        if filename.endswith('.xlsx'):
-            self._save_to_xlsx(data, filename)
-        else:
-            self._save_to_csv(data, filename)
+            return ProfileRecord.failed(username, ProfileStatus.ERROR_DESCONOCIDO)
 
-    def _save_to_csv(self, data: list[dict], filename: str):
-        """Guarda los datos en formato CSV."""
-        fieldnames = ['username', 'seguidores', 'seguidos', 'biografia']
+    def _save_results_to_file(self, journal: SQLiteStore, filename: str):
+        """Vuelca el journal al archivo final con el backend que corresponde a su extensión."""
         try:
-            with open(filename, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.DictWriter(file, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(data)
+            with get_metrics().timer('guardado', destino='salida'):
+                open_store(filename).write_frames(journal.iter_chunks())
             print(f"\n🎉 Resultados guardados exitosamente en: **{filename}**")
+            return True
         except Exception as e:
-            print(f"\nError al guardar el archivo CSV: {e}")
+            print(f"\nError al guardar el archivo '{filename}': {e}")
+            # Fallback a CSV si falla el formato elegido
+            csv_filename = os.path.splitext(filename)[0] + '.csv'
+            if csv_filename != filename:
+                return self._save_results_to_file(journal, csv_filename)
+            return False
 
-    def _save_to_xlsx(self, data: list[dict], filename: str):
-        """Guarda los datos en formato XLSX."""
+    def _open_journal(self, output_file: str, resume: bool) -> tuple[SQLiteStore, int]:
+        """
+        Prepara el almacén donde se guarda cada perfil nada más procesarlo y devuelve
+        (journal, marca): lo guardado después de la marca es de esta ejecución.
+
+        Si la salida ya es SQLite se escribe directamente en ella; si no, en un journal
+        SQLite junto al archivo de salida que se vuelca al final. Con resume solo se continúa
+        una ejecución interrumpida (su marca sigue registrada); una salida ya completada nunca
+        cuenta como reanudable, así que cada Fase 2 nueva vuelve a extraer todos los perfiles
+        (en cualquier formato: una salida SQLite también se vacía al empezar).
+        """
+        store = open_store(output_file)
+        journal = store if isinstance(store, SQLiteStore) else SQLiteStore(journal_path(output_file))
+
+        mark = journal.pending_run() if resume else None
+        if mark is None:
+            # Sin ejecución pendiente se empieza de cero: ni los restos de un journal ni los
+            # perfiles de la salida SQLite anterior (que pueden ya no estar en la lista) se conservan
+            journal.clear()
+            mark = journal.start_run()
+        return journal, mark
+
+    def _fetch_profile_page(self, username: str) -> str | None:
+        """Carga el perfil y devuelve su HTML una vez presente el header (None si no carga a tiempo)."""
+        with get_metrics().timer('navegacion') as timer:
+            self.driver.get(self.session.profile_url(username))
+            try:
+                self._wait_for(10).until(EC.presence_of_element_located((By.TAG_NAME, "header")))
+            except TimeoutException:
+                timer.set(estado='TIMEOUT')
+                return None
+            self._wait_until_profile_ready()
+            page_html = self.driver.page_source
+        if self.archive:
+            with get_metrics().timer('guardado', destino='archivo_paginas'):
+                self.archive.store(username, page_html)
+        return page_html
+
+    def _submit_parse(self, username: str):
+        """Descarga la página y encarga su análisis al executor; el navegador sigue libre."""
         try:
-            import pandas as pd
-            df = pd.DataFrame(data)
-            # Asegurar el orden de las columnas
-            df = df[['username', 'seguidores', 'seguidos', 'biografia']]
-            df.to_excel(filename, index=False, engine='openpyxl')
-            print(f"\n🎉 Resultados guardados exitosamente en: **{filename}**")
+            page_html = self._fetch_profile_page(username)
         except Exception as e:
-            print(f"\nError al guardar el archivo XLSX: {e}")
-            # Fallback a CSV si falla XLSX
-            csv_filename = filename.replace('.xlsx', '.csv')
-            self._save_to_csv(data, csv_filename)
-
-    # --- Método de Ejecución Principal ---
-    def scrape_follower_counts(self, usernames_list: list[str], output_file: str):
-        """Método principal para ejecutar el scraping completo de perfiles."""
-        if not self._login_instagram():
+            print(f"Error al procesar {username}: {e}")
+            page_html = ""
+        if page_html is None:
+            return None
+        return self.parser_executor.submit(parse_profile_html, page_html, username)
+
+    @staticmethod
+    def _parse_result(future, username: str) -> ProfileRecord:
+        """Resultado de un análisis offline (o el registro de error si falló)."""
+        if future is None:
+            status = ProfileStatus.TIMEOUT
+        else:
+            try:
+                return future.result()
+            except Exception as e:
+                print(f"Error al analizar el HTML de {username}: {e}")
+                status = ProfileStatus.ERROR_DESCONOCIDO
+        return ProfileRecord.failed(username, status)
+
+    def _iter_profiles(self, usernames: list[str]):
+        """Obtiene los perfiles en serie con este navegador; produce (registro, de_caché)."""
+        logged_in = False
+        parsing = deque()  # (future, username) pendientes de análisis offline
+
+        for i, username in enumerate(usernames):
+            print(f"\n--- Procesando {i + 1}/{len(usernames)}: @{username} ---")
+            cached = self.cache.get(username) if self.cache else None
+            if cached is not None:
+                yield cached, True
+                continue
+
+            # Login solo cuando hace falta cargar una página
+            if not logged_in:
+                if not self.login():
+                    print("Login fallido. Se guardan los perfiles procesados hasta ahora.")
+                    break
+                logged_in = True
+            self.pacer.wait()
+
+            if self.parser_executor is None:
+                profile_info = self.fetch_profile(username)
+                # La pausa entre perfiles empieza al terminar la carga
+                self.pacer.done()
+                yield profile_info, False
+                continue
+
+            parsing.append((self._submit_parse(username), username))
+            self.pacer.done()
+            while parsing and (parsing[0][0] is None or parsing[0][0].done()):
+                yield self._parse_result(*parsing.popleft()), False
+
+        while parsing:
+            yield self._parse_result(*parsing.popleft()), False
+
+    def _iter_profiles_pool(self, usernames: list[str], pool):
+        """Resuelve primero la caché y reparte el resto entre los navegadores del pool."""
+        pool.start()
+        for username in usernames:
+            cached = self.cache.get(username) if self.cache else None
+            if cached is not None:
+                yield cached, True
+            else:
+                pool.submit(username)
+        pool.close_input()
+        for profile_info in pool.results():
+            yield profile_info, False
+
+    def _iter_profiles_streaming(self, usernames, pool, completados: set):
+        """
+        Como _iter_profiles_pool, pero los usernames llegan de una cola mientras la Fase 1
+        sigue haciendo scroll (None marca el final): se envían al pool según llegan y los
+        resultados se producen en cuanto están listos.
+        """
+        pool.start()
+        vistos = set(completados)
+        while True:
+            try:
+                username = usernames.get(timeout=0.5)
+            except queue.Empty:
+                username = ''
+            if username is None:
+                break
+            if username and username not in vistos:
+                vistos.add(username)
+                cached = self.cache.get(username) if self.cache else None
+                if cached is not None:
+                    yield cached, True
+                else:
+                    pool.submit(username)
+            for profile_info in pool.ready():
+                yield profile_info, False
+        pool.close_input()
+        for profile_info in pool.results():
+            yield profile_info, False
+
+    def _consume_profiles(self, profiles, journal: SQLiteStore, mark: int, total, pool=None,
+                          live_analyzer=None) -> tuple[int, bool]:
+        """
+        Guarda (desde un hilo escritor, sin bloquear el navegador) y analiza en vivo los perfiles
+        que se van obteniendo; devuelve (procesados, completo): completo es False si se paró antes.
+        """
+        writer = BackgroundWriter(journal)
+        writer.start()
+        if live_analyzer:
+            live_analyzer.seed(journal, since=mark)
+            live_analyzer.start()
+
+        metrics = get_metrics()
+        processed = 0
+        complete = True
+        try:
+            for profile_info, from_cache in profiles:
+                processed += 1
+                username = profile_info.username
+                if from_cache:
+                    print(f"   -> @{username} obtenido de la caché (sin cargar la página).")
+                else:
+                    if self.cache:
+                        self.cache.put(profile_info)
+                    if profile_info.estado == ProfileStatus.OK:
+                        self.fetched.append((username, profile_info.seguidores, profile_info.seguidos, time.time()))
+                metrics.count('perfiles', estado=profile_info.estado.name,
+                              fuente='cache' if from_cache else 'navegador')
+
+                writer.put(profile_info)
+                print(f"✅ [{processed}/{total}] @{username} -> Seguidores: {profile_info.count_text(profile_info.seguidores)}, Seguidos: {profile_info.count_text(profile_info.seguidos)}, Bio: {profile_info.biografia[:50] if profile_info.biografia else 'N/A'}...")
+
+                if live_analyzer:
+                    live_analyzer.put(profile_info)
+                    live_analyzer.plot_if_due(processed)
+                    if live_analyzer.conclusive:
+                        print("🛑 El resultado de Benford ya es estable: se detiene el scraping "
+                              "(los perfiles restantes quedan para una ejecución reanudada).")
+                        if pool:
+                            pool.stop()
+                        complete = False
+                        break
+        finally:
+            # Todo lo producido queda en disco antes de volcar la salida (también si se interrumpe)
+            writer.close()
+            if live_analyzer:
+                live_analyzer.close()
+        pacer = pool.budget if pool else self.pacer
+        if pacer.waits:
+            print(pacer.report())
+        return processed, complete
+
+    def _finish_output(self, journal: SQLiteStore, output_file: str, changed: bool, complete: bool = True):
+        """
+        Vuelca el journal al archivo de salida (si hubo cambios o falta) y, si la ejecución se
+        completó, la da por terminada (el journal aparte se elimina). Si se paró antes, el
+        journal sigue pendiente para que la siguiente ejecución la reanude.
+        """
+        if journal.path == output_file:
+            print(f"\n🎉 Resultados guardados exitosamente en: **{output_file}**")
+        elif journal.exists():
+            if (changed or not os.path.exists(output_file)) and not self._save_results_to_file(journal, output_file):
+                return
+        if not complete:
             return
+        if journal.path == output_file:
+            journal.finish_run()
+        else:
+            journal.clear()
 
-        resultados = []
-        print(f"Comenzando a escanear {len(usernames_list)} perfiles...")
-
-        for i, username in enumerate(usernames_list):
-            print(f"\n--- Procesando {i + 1}/{len(usernames_list)}: @{username} ---")
-            time.sleep(random.uniform(10, 15))
-            profile_info = self._get_profile_info(username)
-
-            resultados.append(profile_info)
-            print(f"✅ @{username} -> Seguidores: {profile_info['seguidores']}, Seguidos: {profile_info['seguidos']}, Bio: {profile_info['biografia'][:50] if profile_info['biografia'] else 'N/A'}...")
-
-        self._save_results_to_file(resultados, output_file)
-
-    def close_driver(self):
-        """Cierra el driver de Selenium."""
-        if self.driver:
-            self.driver.quit()
-            print("Cerrando navegador del Scraper.")
\ No newline at end of file
+    # --- Método de Ejecución Principal ---
+    def scrape_follower_counts(self, usernames_list: list[str], output_file: str, resume: bool = True,
+                               pool=None, live_analyzer=None):
+        """
+        Método principal para ejecutar el scraping completo de perfiles.
+
+        Cada perfil se guarda en disco al terminar de procesarlo (desde un hilo escritor, sin
+        bloquear el navegador). Con resume=True, si la Fase 2 anterior se interrumpió, se omiten los
+        usernames que ya registró (salvo TIMEOUT/ERROR, que se reintentan). Si se pasa un ScraperPool, las páginas
+        se cargan en sus navegadores en paralelo; con un LiveBenfordAnalyzer las pruebas de
+        Benford se actualizan a medida que llegan los perfiles.
+        """
+        journal, mark = self._open_journal(output_file, resume)
+        completados = journal.usernames(exclude_status=ESTADOS_REINTENTABLES, since=mark)
+        pendientes = [u for u in usernames_list if u not in completados]
+
+        if completados:
+            print(f"⏩ Reanudando: {len(usernames_list) - len(pendientes)} perfiles ya procesados se omiten.")
+
+        if pendientes:
+            print(f"Comenzando a escanear {len(pendientes)} perfiles...")
+            profiles = self._iter_profiles_pool(pendientes, pool) if pool else self._iter_profiles(pendientes)
+            processed, complete = self._consume_profiles(profiles, journal, mark, len(pendientes), pool,
+                                                         live_analyzer)
+            # Un login fallido corta la serie: lo que falte queda para una ejecución reanudada
+            complete = complete and processed == len(pendientes)
+        else:
+            complete = True
+            print("✅ Todos los perfiles ya estaban procesados.")
+
+        self._finish_output(journal, output_file, bool(pendientes), complete)
+
+    def scrape_streaming(self, usernames, output_file: str, pool, resume: bool = True, live_analyzer=None):
+        """
+        Fase 2 solapada con la Fase 1: consume los usernames de una cola (queue.Queue, None al
+        final) a medida que la Fase 1 los descubre y los reparte entre los navegadores del pool.
+        """
+        journal, mark = self._open_journal(output_file, resume)
+        completados = journal.usernames(exclude_status=ESTADOS_REINTENTABLES, since=mark)
+        if completados:
+            print(f"⏩ Reanudando: {len(completados)} perfiles ya procesados se omitirán.")
+
+        print("Comenzando a escanear perfiles a medida que llegan de la Fase 1...")
+        profiles = self._iter_profiles_streaming(usernames, pool, completados)
+        processed, complete = self._consume_profiles(profiles, journal, mark, "?", pool, live_analyzer)
+        self._finish_output(journal, output_file, processed > 0, complete)
@@ -0,0 +1,163 @@
+# profile_selectors.py
+# Selectores y reglas de extracción de un perfil, compartidos por todas las vías de extracción.
+
+# Indicadores de cuenta privada
+PRIVATE_INDICATORS = [
+    "//*[contains(text(), 'Esta cuenta es privada')]",
+    "//*[contains(text(), 'This account is private')]",
+    "//*[contains(@class, 'rkEop')]",
+]
+
+# Textos de la página de perfil inexistente
+NOT_FOUND_TEXTS = [
+    "Lo sentimos, no pudimos encontrar",
+    "Sorry, this page isn't available",
+]
+
+# SEGUIDORES (followers), en orden de preferencia
+FOLLOWERS_SELECTORS = [
+    "//a[contains(@href, '/followers')]//span",
+    "//a[contains(@href, '/followers')]",
+    "//header//section//li[2]//span",
+    "//header//ul//li[2]//span",
+]
+
+# SEGUIDOS (following), en orden de preferencia
+FOLLOWING_SELECTORS = [
+    "//a[contains(@href, '/following')]//span",
+    "//a[contains(@href, '/following')]",
+    "//header//section//li[3]//span",
+    "//header//ul//li[3]//span",
+]
+
+# BIOGRAFÍA: la biografía en Instagram está generalmente en un div específico dentro del header
+BIO_SELECTORS = [
+    "//header//section//div[contains(@class, '-vDIg')]//span",
+    "//header//div[contains(@class, '-vDIg')]//span",
+    "//header//section//div[contains(@class, '_aacl')]//span",
+    "//header//div[contains(@class, '_aacl')]//span",
+    "//header//section//div//h1/following-sibling::div//span",
+    "//header//section//div//span[not(ancestor::a)]",
+]
+# Método alternativo: cualquier span dentro de un div del header
+BIO_FALLBACK_SELECTOR = "//header//div//span"
+
+# Reglas para aceptar un texto como biografía (longitudes exclusivas y palabras excluidas)
+BIO_RULES = {
+    'min_length': 5,
+    'max_length': 500,
+    'excluded_words': ['seguidores', 'seguidos', 'following', 'followers', 'publicaciones', 'posts'],
+}
+BIO_FALLBACK_RULES = {
+    'min_length': 10,
+    'max_length': 500,
+    'excluded_words': ['seguidores', 'seguidos', 'following', 'followers'],
+}
+
+
+def looks_like_bio(text: str, rules: dict) -> bool:
+    """Comprueba si un texto parece biografía (no estadísticas ni enlaces)."""
+    if not text or not rules['min_length'] < len(text) < rules['max_length']:
+        return False
+    if any(char.isdigit() for char in text[:10]) or text.startswith('http'):
+        return False
+    lowered = text.lower()
+    return not any(word in lowered for word in rules['excluded_words'])
+
+
+# Extracción completa en una sola llamada execute_script. Recibe los selectores como
+# argumentos (más el username objetivo al final) y aplica la misma cadena de alternativas que
+# looks_like_bio. Devuelve además la meta descripción y los <script> que mencionan al objetivo:
+# el registro se construye con profile_parser.build_profile_record, igual que offline.
+EXTRACTION_SCRIPT = """
+const [privateIndicators, notFoundTexts, followersSelectors, followingSelectors,
+       bioSelectors, bioFallbackSelector, bioRules, bioFallbackRules, username] = arguments;
+
+function nodes(xpath) {
+    const found = [];
+    try {
+        const snapshot = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let i = 0; i < snapshot.snapshotLength; i++) found.push(snapshot.snapshotItem(i));
+    } catch (e) {}
+    return found;
+}
+function text(node) { return (node.innerText || node.textContent || '').trim(); }
+
+function countCandidates(selectors) {
+    const candidates = [];
+    for (const selector of selectors) {
+        for (const node of nodes(selector)) {
+            const value = text(node);
+            if (value && /\\d/.test(value)) candidates.push(value);
+        }
+    }
+    return candidates;
+}
+
+function looksLikeBio(value, rules) {
+    if (!value || !(rules.min_length < value.length && value.length < rules.max_length)) return false;
+    if (/\\d/.test(value.slice(0, 10)) || value.startsWith('http')) return false;
+    const lowered = value.toLowerCase();
+    return !rules.excluded_words.some(word => lowered.includes(word));
+}
+
+function findBio() {
+    for (const selector of bioSelectors) {
+        for (const node of nodes(selector)) {
+            const value = text(node);
+            if (looksLikeBio(value, bioRules)) return value;
+        }
+    }
+    for (const node of nodes(bioFallbackSelector)) {
+        const value = text(node);
+        if (looksLikeBio(value, bioFallbackRules)) return value;
+    }
+    return '';
+}
+
+if (privateIndicators.some(xpath => nodes(xpath).length > 0)) return {status: 'PRIVADA'};
+const html = document.documentElement.outerHTML;
+if (notFoundTexts.some(value => html.includes(value))) return {status: 'NO_EXISTE'};
+
+const quoted = JSON.stringify(username);
+return {
+    status: 'OK',
+    followers: countCandidates(followersSelectors),
+    following: countCandidates(followingSelectors),
+    bio: findBio(),
+    meta: Array.from(document.querySelectorAll("meta[property='og:description'], meta[name='description']"))
+        .map(node => node.getAttribute('content') || '').join(' '),
+    scripts: Array.from(document.scripts).map(node => node.textContent || '').filter(value => value.includes(quoted)),
+};
+"""
+
+EXTRACTION_ARGS = [
+    PRIVATE_INDICATORS,
+    NOT_FOUND_TEXTS,
+    FOLLOWERS_SELECTORS,
+    FOLLOWING_SELECTORS,
+    BIO_SELECTORS,
+    BIO_FALLBACK_SELECTOR,
+    BIO_RULES,
+    BIO_FALLBACK_RULES,
+]
+
+# Condición de "perfil listo para extraer": ya se renderizó el conteo de seguidores,
+# el aviso de cuenta privada o el de página inexistente. Sustituye a la pausa fija tras el header.
+READY_SCRIPT = """
+const [readyXpaths, notFoundTexts] = arguments;
+if (document.readyState !== 'complete') return false;
+for (const xpath of readyXpaths) {
+    try {
+        const found = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null);
+        if (found.singleNodeValue) return true;
+    } catch (e) {}
+}
+const body = document.body ? document.body.innerText || '' : '';
+return notFoundTexts.some(value => body.includes(value));
+"""
+
+READY_ARGS = [
+    FOLLOWERS_SELECTORS[:2] + PRIVATE_INDICATORS,
+    NOT_FOUND_TEXTS,
+]
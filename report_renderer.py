@@ -0,0 +1,204 @@
+# report_renderer.py
+# Gráficos de Benford con la API orientada a objetos de matplotlib (sin pyplot ni estado global)
+# y generación por lotes de los gráficos y un resumen HTML de muchas cuentas objetivo.
+#
+#   python report_renderer.py resultados/ --salida informes/ --svg --html
+import argparse
+import glob
+import html
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benford import EXPECTED
+
+TITULO_GRAFICO = 'Distribución del Primer Dígito de Seguidores (Análisis de Benford)'
+# Sufijo de los archivos de datos de la Fase 2 ({objetivo}_profile_data.<ext>, ver main_app.py)
+SUFIJO_DATOS = "_profile_data"
+
+
+class BenfordChart:
+    """
+    Plantilla de gráfico reutilizable: la figura, los ejes, la curva teórica y las etiquetas
+    se crean una sola vez; cada render solo cambia la altura de las barras y el título.
+
+    Cada instancia tiene su propia figura (sin pyplot), así que procesos distintos pueden
+    dibujar a la vez; dentro de un proceso una instancia no debe usarse desde dos hilos.
+    """
+
+    def __init__(self, figsize=(10, 6)):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(figsize=figsize)
+        FigureCanvasAgg(self.figure)
+        self.axes = self.figure.add_subplot()
+
+        # Gráfico de barras de las frecuencias reales (alturas a 0 hasta el primer render)
+        self.bars = self.axes.bar(range(1, 10), [0] * 9, color='teal', alpha=0.7, label='Frecuencia Real')
+
+        # Distribución teórica de Benford (%)
+        digits, probabilities = EXPECTED['first_digit']
+        self.axes.plot(digits, probabilities * 100, marker='o', linestyle='--', color='red',
+                       label='Ley de Benford Teórica')
+
+        self.axes.set_title(TITULO_GRAFICO)
+        self.axes.set_xlabel('Primer Dígito (1 al 9)')
+        self.axes.set_ylabel('Frecuencia (%)')
+        self.axes.set_xticks(range(1, 10))
+        self.axes.grid(axis='y', linestyle='--')
+        self.axes.legend()
+        self.figure.tight_layout()
+
+    def render(self, frequencies, filename: str, title: str | None = None):
+        """Dibuja las frecuencias (%) del primer dígito y guarda el gráfico (formato según la extensión)."""
+        # Asegurar que el índice coincida (1-9)
+        frequencies = frequencies.reindex(range(1, 10), fill_value=0)
+        for bar, value in zip(self.bars, frequencies.values):
+            bar.set_height(value)
+        self.axes.set_title(title or TITULO_GRAFICO)
+        self.axes.relim()
+        self.axes.autoscale_view()
+        self.figure.savefig(filename)
+
+
+# Plantilla del proceso: se crea con el primer gráfico y la reutilizan los siguientes
+_chart = None
+_chart_lock = threading.Lock()
+
+
+def render_benford_chart(frequencies, filename: str, title: str | None = None):
+    """Guarda un gráfico de Benford reutilizando la plantilla del proceso."""
+    global _chart
+    with _chart_lock:
+        if _chart is None:
+            _chart = BenfordChart()
+        _chart.render(frequencies, filename, title)
+
+
+def discover_targets(directory: str) -> list[tuple[str, str]]:
+    """(objetivo, archivo de datos) de cada salida de la Fase 2 en la carpeta; un archivo por objetivo."""
+    from storage import FORMAT_EXTENSIONS
+
+    found = {}
+    # Prioridad del formato de trabajo sobre el XLSX de reporte (orden de FORMAT_EXTENSIONS)
+    for extension in FORMAT_EXTENSIONS.values():
+        for path in sorted(glob.glob(os.path.join(directory, f"*{SUFIJO_DATOS}{extension}"))):
+            target = os.path.basename(path)[:-len(SUFIJO_DATOS + extension)]
+            found.setdefault(target, path)
+    return sorted(found.items())
+
+
+def _render_target(task) -> dict:
+    """Analiza los datos de un objetivo y dibuja sus gráficos; se ejecuta en un proceso del pool."""
+    from benford import benford_report
+    from data_analyzer import DataAnalyzer
+
+    target, data_file, output_dir, chart_formats, chunksize, incremental = task
+    summary = {'objetivo': target, 'archivo': data_file, 'graficos': {}, 'error': None}
+    start = time.perf_counter()
+    try:
+        # Con incremental, solo las filas nuevas o cambiadas desde el análisis anterior
+        accumulator, read = DataAnalyzer(data_file).digit_counts(chunksize, incremental=incremental)
+        first = benford_report(accumulator).first_digit
+        summary.update(registros=accumulator.rows, leidos=read, n=first.n, chi2_p=first.chi_square_p,
+                       mad=first.mad, conformidad=first.mad_conformity, conforme=first.conforms if first.n else None)
+        if first.n:
+            title = f"Primer Dígito de Seguidores de @{target} (Benford, n={first.n})"
+            for chart_format in chart_formats:
+                filename = os.path.join(output_dir, f"{target}_benford_analysis.{chart_format}")
+                # Sin cambios en los datos, el gráfico anterior sigue valiendo
+                if read or not os.path.exists(filename):
+                    render_benford_chart(accumulator.first_digit_frequencies(), filename, title)
+                summary['graficos'][chart_format] = filename
+    except Exception as e:
+        summary['error'] = f"{type(e).__name__}: {e}"
+    summary['segundos'] = time.perf_counter() - start
+    return summary
+
+
+def write_html_summary(summaries: list[dict], filename: str):
+    """Índice HTML con el veredicto de cada objetivo y su gráfico (SVG si lo hay, si no PNG)."""
+    directory = os.path.dirname(os.path.abspath(filename))
+    rows = []
+    for summary in summaries:
+        chart = summary['graficos'].get('svg') or summary['graficos'].get('png')
+        if summary['error']:
+            verdict = f"❌ {summary['error']}"
+        elif not summary.get('n'):
+            verdict = "Sin datos suficientes"
+        else:
+            verdict = (f"{'✅ Conforme' if summary['conforme'] else '⚠️ No conforme'} "
+                       f"(chi2 p={summary['chi2_p']:.3f}, MAD={summary['mad']:.4f}, {summary['conformidad']})")
+        image = (f'<img src="{html.escape(os.path.relpath(chart, directory))}" width="480" loading="lazy">'
+                 if chart else "")
+        rows.append(f"<tr><td>{html.escape(summary['objetivo'])}</td><td>{summary.get('n') or 0}</td>"
+                    f"<td>{html.escape(verdict)}</td><td>{image}</td></tr>")
+
+    document = f"""<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>Análisis de Benford por cuenta</title>
+<style>body{{font-family:sans-serif}} table{{border-collapse:collapse}} td,th{{border:1px solid #ccc;padding:4px 8px}}</style>
+</head><body>
+<h1>Análisis de Benford por cuenta objetivo</h1>
+<p>{len(summaries)} cuentas · generado el {time.strftime('%Y-%m-%d %H:%M:%S')}</p>
+<table><tr><th>Cuenta</th><th>Conteos válidos</th><th>Primer dígito</th><th>Gráfico</th></tr>
+{chr(10).join(rows)}
+</table></body></html>
+"""
+    with open(filename, 'w', encoding='utf-8') as file:
+        file.write(document)
+
+
+def render_reports(targets, output_dir: str, chart_formats=('png',), html_summary: bool = True,
+                   workers: int | None = None, chunksize: int = 100_000, incremental: bool = True) -> list[dict]:
+    """
+    Genera los gráficos de Benford de muchos objetivos repartiendo el trabajo entre procesos
+    (cada proceso reutiliza su plantilla de figura). `targets` es una lista de
+    (objetivo, archivo de datos). Con incremental cada objetivo parte del estado de su análisis
+    anterior y solo se redibujan los gráficos cuyos datos cambiaron. Devuelve un resumen por
+    objetivo, en el mismo orden.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [(target, data_file, output_dir, tuple(chart_formats), chunksize, incremental)
+             for target, data_file in targets]
+    if not tasks:
+        print("⚠️ No hay datos de la Fase 2 para generar informes.")
+        return []
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    print(f"🖼️ Generando informes de {len(tasks)} cuentas con {workers} procesos...")
+    if workers == 1:
+        summaries = [_render_target(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            # Lotes de varias cuentas por envío: menos ida y vuelta entre procesos
+            summaries = list(executor.map(_render_target, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+    for summary in summaries:
+        if summary['error']:
+            print(f"❌ {summary['objetivo']}: {summary['error']}")
+    if html_summary:
+        index = os.path.join(output_dir, "index.html")
+        write_html_summary(summaries, index)
+        print(f"📄 Resumen HTML guardado en: **{index}**")
+    print(f"🎉 Informes generados: {sum(1 for s in summaries if s['graficos'])} de {len(summaries)} cuentas.")
+    return summaries
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Gráficos de Benford y resumen HTML de muchas cuentas en paralelo.")
+    parser.add_argument('directorio', nargs='?', default=".",
+                        help=f"Carpeta con los archivos <objetivo>{SUFIJO_DATOS}.<ext> de la Fase 2")
+    parser.add_argument('--salida', help="Carpeta de los gráficos y del resumen (por defecto la de los datos)")
+    parser.add_argument('--svg', action='store_true', help="Guardar también cada gráfico en SVG")
+    parser.add_argument('--sin-png', action='store_true', help="No guardar los gráficos en PNG")
+    parser.add_argument('--html', action='store_true', help="Escribir el resumen index.html")
+    parser.add_argument('--procesos', type=int, default=None, help="Procesos en paralelo (por defecto, uno por núcleo)")
+    parser.add_argument('--sin-incremental', action='store_true',
+                        help="Recalcular cada cuenta desde cero sin usar el estado del análisis anterior")
+    args = parser.parse_args()
+
+    formats = [fmt for fmt, enabled in (('png', not args.sin_png), ('svg', args.svg)) if enabled]
+    render_reports(discover_targets(args.directorio), args.salida or args.directorio, chart_formats=formats,
+                   html_summary=args.html, workers=args.procesos, incremental=not args.sin_incremental)
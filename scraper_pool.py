@@ -0,0 +1,185 @@
+# scraper_pool.py
+import multiprocessing as mp
+import queue
+import time
+
+from browser_session import BASE_URL, BrowserSession
+from metrics import configure_metrics, get_metrics
+from pacing import DEFAULT_PROFILE_PACING, SharedRequestBudget
+from page_archive import PageArchive
+from profile_scraper import ProfileScraper
+
+# Mensajes de los workers hacia el proceso principal
+_PERFIL = 'perfil'
+_FIN = 'fin'
+# Segundos que stop() espera a que cada worker cierre su navegador antes de forzarlo
+ESPERA_PARADA = 60
+
+
+def _worker_main(worker_id, session_kwargs, archive_root, tasks, results, budget, stop, metrics_config):
+    """
+    Proceso worker: un navegador propio que consume usernames de la cola compartida hasta el
+    marcador de fin o hasta que se activa `stop` (el perfil en curso se termina). Sale siempre
+    por el finally: cierra el navegador y avisa de su fin.
+    """
+    # Los eventos del worker van al mismo JSON-lines del proceso principal (append)
+    metrics_file, run_id = metrics_config
+    configure_metrics(metrics_file, run_id=run_id)
+    session = BrowserSession(**session_kwargs)
+    archive = PageArchive(archive_root) if archive_root else None
+    scraper = ProfileScraper(session, archive=archive)
+    try:
+        # Con las cookies y la ruta del driver en disco, el arranque no repite el login
+        if not scraper.login():
+            print(f"❌ [Worker {worker_id}] Login fallido; el worker se detiene.")
+            return
+
+        while not stop.is_set():
+            try:
+                target = tasks.get(timeout=1)
+            except queue.Empty:
+                continue
+            if target is None:
+                break
+            budget.wait(stop)
+            if stop.is_set():
+                break
+            profile_info = scraper.fetch_profile(target)
+            budget.done()
+            results.put((_PERFIL, profile_info))
+    except Exception as e:
+        print(f"❌ [Worker {worker_id}] Error inesperado: {e}")
+    finally:
+        session.close()
+        # Las métricas y pausas del worker viajan con su aviso de fin y se suman en el proceso principal
+        results.put((_FIN, (worker_id, get_metrics().snapshot(), budget.waits, budget.total_slept)))
+        get_metrics().close()
+
+
+class ScraperPool:
+    """Pool de N navegadores en procesos separados que comparten cola de trabajo y presupuesto."""
+
+    def __init__(self, username, password, workers: int = 2, pacing: tuple = DEFAULT_PROFILE_PACING,
+                 headless: bool = True, cookies_file="session_cookies.json",
+                 driver_path_file=".chromedriver_path", archive_root=None, base_url=BASE_URL):
+        self.workers = workers
+        self.archive_root = archive_root
+        # Cada worker crea su propia BrowserSession con estos parámetros
+        self.session_kwargs = {
+            'username': username,
+            'password': password,
+            'headless': headless,
+            'cookies_file': cookies_file,
+            'driver_path_file': driver_path_file,
+            'base_url': base_url,
+        }
+        self._context = mp.get_context('spawn')
+        self.budget = SharedRequestBudget(*pacing, context=self._context, name="perfil (pool)")
+        self._stop = self._context.Event()
+        self._tasks = None
+        self._results = None
+        self._processes = []
+        self._finished = 0  # Workers que ya avisaron de su fin
+
+    def start(self):
+        """Arranca los procesos worker (cada uno abre su navegador y hace login)."""
+        if self._processes:
+            return
+        self._tasks = self._context.Queue()
+        self._results = self._context.Queue()
+        self._finished = 0
+        self._stop.clear()
+        metrics = get_metrics()
+        metrics_config = (metrics.jsonl_path, metrics.run_id)
+        for worker_id in range(self.workers):
+            process = self._context.Process(
+                target=_worker_main,
+                args=(worker_id, self.session_kwargs, self.archive_root, self._tasks, self._results, self.budget,
+                      self._stop, metrics_config),
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+        print(f"🚀 Pool de scraping iniciado con {self.workers} navegadores.")
+
+    def submit(self, username: str):
+        """Añade un username a la cola compartida."""
+        self._tasks.put(username)
+
+    def close_input(self):
+        """Indica que no habrá más usernames (un marcador de fin por worker)."""
+        for _ in self._processes:
+            self._tasks.put(None)
+
+    def _receive(self, timeout: float | None):
+        """Siguiente registro de los workers (None si no llega a tiempo o si era un aviso de fin)."""
+        kind, payload = self._results.get(timeout=timeout) if timeout else self._results.get_nowait()
+        if kind == _FIN:
+            _, metrics, waits, slept = payload
+            get_metrics().merge(metrics)
+            self.budget.add_waits(waits, slept)
+            self._finished += 1
+            return None
+        return payload
+
+    def ready(self) -> list:
+        """Registros ya recibidos, sin esperar (para intercalar con el envío de usernames)."""
+        records = []
+        while True:
+            try:
+                record = self._receive(None)
+            except queue.Empty:
+                return records
+            if record is not None:
+                records.append(record)
+
+    def results(self):
+        """Produce los registros a medida que llegan, hasta que terminen todos los workers."""
+        while self._finished < len(self._processes):
+            try:
+                record = self._receive(timeout=5)
+            except queue.Empty:
+                # Un worker que muere sin avisar no debe bloquear al resto
+                if not any(p.is_alive() for p in self._processes):
+                    break
+                continue
+            if record is not None:
+                yield record
+        self.join()
+
+    def stop(self, timeout: float = ESPERA_PARADA):
+        """
+        Detiene los workers sin esperar a que vacíen la cola (p. ej. en una parada anticipada).
+
+        Cada worker termina el perfil en curso, cierra su navegador (y su chromedriver) y avisa
+        de su fin con sus métricas. Los registros que lleguen mientras tanto se descartan: la
+        ejecución queda pendiente y se obtienen al reanudar. Solo se fuerza (terminate) a los
+        workers que no terminen en `timeout` segundos.
+        """
+        if not self._processes:
+            return
+        self._stop.set()
+        self.close_input()  # Despierta a los workers que esperan un username
+        # Los usernames sin consumir no deben bloquear la salida de este proceso
+        self._tasks.cancel_join_thread()
+        deadline = time.monotonic() + timeout
+        while self._finished < len(self._processes) and time.monotonic() < deadline:
+            try:
+                # Vaciar la cola de resultados: un worker no termina mientras lo que envió siga sin leer
+                self._receive(timeout=1)
+            except queue.Empty:
+                if not any(p.is_alive() for p in self._processes):
+                    break
+        for process in self._processes:
+            process.join(timeout=max(deadline - time.monotonic(), 1))
+            if process.is_alive():
+                print(f"⚠️ Un worker del pool no terminó en {timeout:.0f} s; se fuerza su cierre.")
+                process.terminate()
+                process.join(timeout=5)
+        self._processes = []
+
+    def join(self):
+        """Espera a que terminen los procesos worker."""
+        for process in self._processes:
+            process.join(timeout=30)
+        self._processes = []
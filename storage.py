@@ -0,0 +1,527 @@
+# storage.py
+import csv
+import os
+import secrets
+import sqlite3
+
+import pandas as pd
+
+from profile_record import ProfileRecord, ProfileStatus
+
+# Esquema de los datos de la Fase 2 (columna -> tipo): conteos enteros (<NA> si faltan) y el
+# estado de la extracción aparte (ver profile_record.ProfileStatus)
+PROFILE_SCHEMA = {
+    'username': 'string',
+    'seguidores': 'Int64',
+    'seguidos': 'Int64',
+    'biografia': 'string',
+    'estado': 'int8',
+}
+PROFILE_COLUMNS = list(PROFILE_SCHEMA)
+# Columnas de conteo (followers_count es el nombre antiguo de 'seguidores')
+COUNT_COLUMNS = ('seguidores', 'seguidos', 'followers_count')
+
+# Extensión de archivo por formato de salida
+FORMAT_EXTENSIONS = {
+    'parquet': '.parquet',
+    'sqlite': '.sqlite',
+    'csv': '.csv',
+    'xlsx': '.xlsx',
+}
+
+
+def _as_int64(values: pd.Series) -> pd.Series:
+    """Columna de conteos como Int64; los textos (archivos antiguos, CSV/XLSX) se convierten con parse_counts."""
+    if pd.api.types.is_integer_dtype(values.dtype):
+        return values.astype('Int64')
+    from count_parser import parse_counts
+    return parse_counts(values).round().astype('Int64')
+
+
+def _as_status(values: pd.Series) -> pd.Series:
+    """Columna de estado como int8 (acepta los nombres, p. ej. en el XLSX de reporte)."""
+    if not pd.api.types.is_integer_dtype(values.dtype):
+        values = values.map(ProfileStatus.from_text, na_action='ignore').astype('Int64')
+    return values.fillna(ProfileStatus.OK).astype('int8')
+
+
+def typed_profiles(df: pd.DataFrame, legacy: bool | None = None) -> pd.DataFrame:
+    """
+    Convierte un DataFrame de perfiles al esquema tipado (solo las columnas que tenga).
+
+    Con legacy (por defecto: si no hay columna 'estado') acepta el formato antiguo, con
+    sentinelas como 'PRIVADA' en las columnas de conteo y en la biografía: el estado sale del
+    sentinela de 'seguidores', los conteos pasan a enteros y las biografías sentinela a vacías.
+    """
+    df = df.copy(deep=False)
+    if legacy is None:
+        legacy = 'estado' not in df.columns
+    followers = next((c for c in ('seguidores', 'followers_count') if c in df.columns), None)
+
+    if legacy and followers is not None and not pd.api.types.is_numeric_dtype(df[followers].dtype):
+        status = df[followers].astype('string').str.strip().str.upper().map(
+            ProfileStatus.__members__, na_action='ignore')
+        df['estado'] = status.map(int, na_action='ignore').astype('Int64').fillna(ProfileStatus.OK).astype('int8')
+    for column in COUNT_COLUMNS:
+        if column in df.columns:
+            df[column] = _as_int64(df[column])
+    if legacy and followers is not None:
+        if 'estado' not in df.columns:
+            df['estado'] = pd.Series(ProfileStatus.OK, index=df.index, dtype='int8')
+        # Perfil cargado pero sin conteo de seguidores
+        missing = (df['estado'] == ProfileStatus.OK) & df[followers].isna()
+        df.loc[missing, 'estado'] = ProfileStatus.NO_ENCONTRADO
+        if 'biografia' in df.columns:
+            df['biografia'] = df['biografia'].where(df['estado'] == ProfileStatus.OK, "")
+    if 'estado' in df.columns:
+        df['estado'] = _as_status(df['estado'])
+    return df.astype({c: t for c, t in PROFILE_SCHEMA.items() if c in df.columns and c not in COUNT_COLUMNS})
+
+
+def records_frame(records) -> pd.DataFrame:
+    """DataFrame tipado a partir de registros (ProfileRecord o dicts, también del formato antiguo)."""
+    rows = [_record(record).as_tuple() for record in records]
+    return pd.DataFrame(rows, columns=PROFILE_COLUMNS).astype(PROFILE_SCHEMA)
+
+
+def _record(record) -> ProfileRecord:
+    return record if isinstance(record, ProfileRecord) else ProfileRecord.from_dict(record)
+
+
+class ProfileStore:
+    """
+    Interfaz común de los backends de almacenamiento de perfiles.
+
+    read/iter_chunks devuelven siempre el esquema tipado (PROFILE_SCHEMA), también con archivos
+    del formato antiguo; cada backend implementa _read/_iter_chunks sobre el archivo tal cual.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def columns(self) -> list[str]:
+        """Columnas disponibles en el archivo."""
+        raise NotImplementedError
+
+    def write(self, records: list):
+        """Sobrescribe el archivo con la lista de registros (ProfileRecord o dicts)."""
+        raise NotImplementedError
+
+    def _read(self, columns: list[str] | None) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def _iter_chunks(self, columns: list[str] | None, chunksize: int):
+        raise NotImplementedError
+
+    def _source_columns(self, columns: list[str] | None) -> tuple[list[str] | None, bool]:
+        """Columnas a leer del archivo y si está en el formato antiguo (sin columna 'estado')."""
+        available = self.columns()
+        legacy = 'estado' not in available
+        if columns is None or not legacy or 'estado' not in columns:
+            return columns, legacy
+        # Formato antiguo: el estado se deduce del sentinela de 'seguidores'
+        source = [c for c in columns if c != 'estado']
+        followers = next((c for c in ('seguidores', 'followers_count') if c in available), 'seguidores')
+        return source + ([followers] if followers not in source else []), legacy
+
+    @staticmethod
+    def _typed(df: pd.DataFrame, columns, legacy: bool) -> pd.DataFrame:
+        df = typed_profiles(df, legacy)
+        return df[columns] if columns is not None else df
+
+    def read(self, columns: list[str] | None = None) -> pd.DataFrame:
+        """Lee solo las columnas pedidas (todas si columns es None)."""
+        source, legacy = self._source_columns(columns)
+        return self._typed(self._read(source), columns, legacy)
+
+    def iter_chunks(self, columns: list[str] | None = None, chunksize: int = 100_000):
+        """Lee las columnas pedidas en DataFrames de como mucho chunksize filas."""
+        source, legacy = self._source_columns(columns)
+        for chunk in self._iter_chunks(source, chunksize):
+            yield self._typed(chunk, columns, legacy)
+
+    def write_frames(self, frames):
+        """Sobrescribe el archivo a partir de un iterable de DataFrames (por chunks)."""
+        frames = [frame for frame in frames]
+        records = pd.concat(frames).to_dict('records') if frames else []
+        self.write(records)
+
+    def usernames(self, exclude_status=()) -> set[str]:
+        """Usernames guardados, omitiendo los registros cuyo estado esté en exclude_status."""
+        if not self.exists():
+            return set()
+        names = set()
+        for chunk in self.iter_chunks(columns=['username', 'estado']):
+            chunk = chunk[~chunk['estado'].isin([int(status) for status in exclude_status])]
+            names.update(chunk['username'].dropna())
+        return names
+
+    @staticmethod
+    def _frame(frame: pd.DataFrame) -> pd.DataFrame:
+        """DataFrame a escribir: esquema tipado y columnas en orden (acepta el formato antiguo)."""
+        return typed_profiles(frame).reindex(columns=PROFILE_COLUMNS).astype(PROFILE_SCHEMA)
+
+
+class CsvStore(ProfileStore):
+    """Backend CSV (compatibilidad con archivos anteriores)."""
+
+    def columns(self) -> list[str]:
+        with open(self.path, newline='', encoding='utf-8') as file:
+            return next(csv.reader(file), [])
+
+    def write(self, records: list):
+        records_frame(records).to_csv(self.path, index=False)
+
+    def _dtypes(self):
+        """Tipos de lectura: los del esquema si el archivo es tipado; texto si es del formato antiguo."""
+        return PROFILE_SCHEMA if 'estado' in self.columns() else str
+
+    def _read(self, columns) -> pd.DataFrame:
+        return pd.read_csv(self.path, usecols=columns, dtype=self._dtypes())
+
+    def write_frames(self, frames):
+        header = True
+        with open(self.path, 'w', newline='', encoding='utf-8') as file:
+            for frame in frames:
+                self._frame(frame).to_csv(file, header=header, index=False)
+                header = False
+            if header:
+                csv.writer(file).writerow(PROFILE_COLUMNS)
+
+    def _iter_chunks(self, columns, chunksize):
+        yield from pd.read_csv(self.path, usecols=columns, dtype=self._dtypes(), chunksize=chunksize)
+
+
+class XlsxStore(ProfileStore):
+    """Backend XLSX; pensado como exportación para reportes, no como formato de trabajo."""
+
+    def columns(self) -> list[str]:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(self.path, read_only=True)
+        try:
+            header = next(workbook.active.iter_rows(values_only=True), ())
+            return [c for c in header if c is not None]
+        finally:
+            workbook.close()
+
+    def write(self, records: list):
+        records_frame(records).to_excel(self.path, index=False, engine='openpyxl')
+
+    def _read(self, columns) -> pd.DataFrame:
+        return pd.read_excel(self.path, usecols=columns, engine='openpyxl')
+
+    def _iter_chunks(self, columns, chunksize):
+        """Recorre la hoja fila a fila (openpyxl read-only) sin cargarla completa."""
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(self.path, read_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = list(next(rows, ()))
+            wanted = columns or [c for c in header if c is not None]
+            indexes = [header.index(c) for c in wanted]
+
+            batch = []
+            for row in rows:
+                batch.append([row[i] if i < len(row) else None for i in indexes])
+                if len(batch) >= chunksize:
+                    yield pd.DataFrame(batch, columns=wanted, dtype=object)
+                    batch = []
+            if batch:
+                yield pd.DataFrame(batch, columns=wanted, dtype=object)
+        finally:
+            workbook.close()
+
+
+class ParquetStore(ProfileStore):
+    """Backend Parquet columnar (requiere pyarrow)."""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        import pyarrow  # noqa: F401  (falla pronto si no está instalado)
+
+    @staticmethod
+    def arrow_schema():
+        import pyarrow as pa
+        return pa.schema([('username', pa.string()), ('seguidores', pa.int64()), ('seguidos', pa.int64()),
+                          ('biografia', pa.string()), ('estado', pa.int8())])
+
+    @staticmethod
+    def _to_pandas(table) -> pd.DataFrame:
+        import pyarrow as pa
+        # Enteros con nulos como Int64 (sin pasar por float64)
+        return table.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+
+    def columns(self) -> list[str]:
+        import pyarrow.parquet as pq
+        return pq.read_schema(self.path).names
+
+    def write(self, records: list):
+        self.write_frames([records_frame(records)])
+
+    def write_frames(self, frames):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = self.arrow_schema()
+        with pq.ParquetWriter(self.path, schema) as writer:
+            for frame in frames:
+                writer.write_table(pa.Table.from_pandas(self._frame(frame), schema=schema, preserve_index=False))
+
+    def _read(self, columns) -> pd.DataFrame:
+        import pyarrow.parquet as pq
+        return self._to_pandas(pq.read_table(self.path, columns=columns))
+
+    def _iter_chunks(self, columns, chunksize):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(self.path).iter_batches(batch_size=chunksize, columns=columns):
+            yield self._to_pandas(batch)
+
+
+class SQLiteStore(ProfileStore):
+    """
+    Backend SQLite (librería estándar) con una tabla tipada por perfil.
+
+    Cada inserción recibe un número de secuencia creciente (columna interna `seq`, también al
+    reemplazar un perfil) y cada tabla creada desde cero una generación nueva (PRAGMA
+    user_version): con ambos se pueden leer solo las filas nuevas o cambiadas desde una marca
+    (ver changes_since y digit_state.py).
+    """
+
+    TABLE = 'perfiles'
+    RUN_TABLE = 'ejecucion'  # Marca de la Fase 2 en curso (ver start_run)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def _table_columns(self, conn: sqlite3.Connection) -> list[str]:
+        return [row[1] for row in conn.execute(f"PRAGMA table_info({self.TABLE})")]
+
+    def _create_table(self, conn: sqlite3.Connection):
+        existing = self._table_columns(conn)
+        if not existing:
+            # Tabla nueva (o reescrita): las marcas de secuencia anteriores ya no valen
+            conn.execute(f"PRAGMA user_version = {secrets.randbelow(2 ** 31 - 1) + 1}")
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.TABLE} ("
+            "username TEXT PRIMARY KEY, seguidores INTEGER, seguidos INTEGER, biografia TEXT, "
+            "estado INTEGER NOT NULL DEFAULT 0, seq INTEGER)"
+        )
+        if existing and 'estado' not in existing:
+            self._migrate(conn)
+            return
+        if existing and 'seq' not in existing:
+            conn.execute(f"ALTER TABLE {self.TABLE} ADD COLUMN seq INTEGER")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.TABLE}_seq ON {self.TABLE} (seq)")
+
+    def _migrate(self, conn: sqlite3.Connection):
+        """Convierte una tabla del formato antiguo (todo TEXT, con sentinelas) al esquema tipado."""
+        legacy = typed_profiles(pd.read_sql_query(f"SELECT * FROM {self.TABLE}", conn), legacy=True)
+        conn.execute(f"DROP TABLE {self.TABLE}")
+        self._create_table(conn)
+        self._insert_frame(conn, legacy)
+
+    def columns(self) -> list[str]:
+        with self._connect() as conn:
+            return [c for c in self._table_columns(conn) if c != 'seq']
+
+    def _insert(self, conn: sqlite3.Connection, rows):
+        start = conn.execute(f"SELECT coalesce(max(seq), 0) FROM {self.TABLE}").fetchone()[0]
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {self.TABLE} ({', '.join(PROFILE_COLUMNS)}, seq) VALUES (?, ?, ?, ?, ?, ?)",
+            (row + (seq,) for seq, row in enumerate(rows, start + 1)),
+        )
+
+    def _insert_frame(self, conn: sqlite3.Connection, frame: pd.DataFrame):
+        frame = self._frame(frame).astype(object)
+        self._insert(conn, frame.where(frame.notna(), None).itertuples(index=False, name=None))
+
+    def write(self, records: list):
+        self.write_frames([records_frame(records)])
+
+    def write_frames(self, frames):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(f"DROP TABLE IF EXISTS {self.TABLE}")
+                conn.execute(f"DROP TABLE IF EXISTS {self.RUN_TABLE}")
+                self._create_table(conn)
+                for frame in frames:
+                    self._insert_frame(conn, frame)
+        finally:
+            conn.close()
+
+    def append(self, records: list):
+        """Inserta (o reemplaza por username) registros y los confirma en disco de inmediato."""
+        conn = self._connect()
+        try:
+            with conn:
+                self._create_table(conn)
+                self._insert(conn, (_record(record).as_tuple() for record in records))
+        finally:
+            conn.close()
+
+    def clear(self):
+        """Elimina todos los registros guardados."""
+        if self.exists():
+            os.remove(self.path)
+
+    def usernames(self, exclude_status=(), since: int | None = None) -> set[str]:
+        """
+        Usernames guardados, omitiendo los registros cuyo estado esté en exclude_status y, con
+        since, los guardados antes de esa marca de secuencia.
+        """
+        if not self.exists():
+            return set()
+        conn = self._connect()
+        try:
+            with conn:
+                self._create_table(conn)
+            conditions, params = [], [int(s) for s in exclude_status]
+            if exclude_status:
+                conditions.append(f"estado NOT IN ({', '.join('?' * len(exclude_status))})")
+            if since is not None:
+                conditions.append("seq > ?")
+                params.append(since)
+            query = f"SELECT username FROM {self.TABLE}"
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            return {row[0] for row in conn.execute(query, params)}
+        finally:
+            conn.close()
+
+    def start_run(self) -> int:
+        """
+        Registra el inicio de una Fase 2 y devuelve su marca: lo insertado después de la marca
+        es de esta ejecución. La marca se conserva hasta finish_run, así que si la ejecución se
+        interrumpe, pending_run la devuelve para reanudarla.
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                self._create_table(conn)
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {self.RUN_TABLE} (marca INTEGER NOT NULL)")
+                conn.execute(f"DELETE FROM {self.RUN_TABLE}")
+                mark = conn.execute(f"SELECT coalesce(max(seq), 0) FROM {self.TABLE}").fetchone()[0]
+                conn.execute(f"INSERT INTO {self.RUN_TABLE} VALUES (?)", (mark,))
+            return mark
+        finally:
+            conn.close()
+
+    def pending_run(self) -> int | None:
+        """Marca de una Fase 2 empezada y no terminada (None si no la hay)."""
+        if not self.exists():
+            return None
+        conn = self._connect()
+        try:
+            if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                (self.RUN_TABLE,)).fetchone():
+                return None
+            row = conn.execute(f"SELECT marca FROM {self.RUN_TABLE}").fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+
+    def finish_run(self):
+        """Da por terminada la Fase 2 en curso: la siguiente ya no la reanuda."""
+        if not self.exists():
+            return
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(f"DROP TABLE IF EXISTS {self.RUN_TABLE}")
+        finally:
+            conn.close()
+
+    def _select(self, columns) -> str:
+        return f"SELECT {', '.join(columns or self.columns())} FROM {self.TABLE}"
+
+    def generation(self) -> int:
+        """Identificador de la tabla actual: cambia cada vez que se crea o se reescribe entera."""
+        conn = self._connect()
+        try:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+        finally:
+            conn.close()
+
+    def watermark(self) -> int:
+        """Último número de secuencia asignado (0 si la tabla no lleva secuencia)."""
+        conn = self._connect()
+        try:
+            if 'seq' not in self._table_columns(conn):
+                return 0
+            return conn.execute(f"SELECT coalesce(max(seq), 0) FROM {self.TABLE}").fetchone()[0]
+        finally:
+            conn.close()
+
+    def changes_since(self, seq: int, columns: list[str] | None = None) -> pd.DataFrame:
+        """Filas insertadas o reemplazadas después de la marca `seq` (tipadas, con su columna seq)."""
+        columns = list(columns or self.columns())
+        conn = self._connect()
+        try:
+            df = pd.read_sql_query(f"{self._select(columns + ['seq'])} WHERE seq > ? ORDER BY seq", conn,
+                                   params=(seq,))
+        finally:
+            conn.close()
+        return typed_profiles(df, legacy=False)
+
+    def _read(self, columns) -> pd.DataFrame:
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(self._select(columns), conn)
+        finally:
+            conn.close()
+
+    def _iter_chunks(self, columns, chunksize):
+        conn = self._connect()
+        try:
+            yield from pd.read_sql_query(self._select(columns), conn, chunksize=chunksize)
+        finally:
+            conn.close()
+
+
+_STORES_BY_EXTENSION = {
+    '.parquet': ParquetStore,
+    '.sqlite': SQLiteStore,
+    '.db': SQLiteStore,
+    '.csv': CsvStore,
+    '.xlsx': XlsxStore,
+}
+
+
+def resolve_format(output_format: str) -> str:
+    """Valida el formato y recurre a SQLite si Parquet no está disponible."""
+    if output_format not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Formato de salida no soportado: {output_format}")
+    if output_format == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("⚠️ pyarrow no está instalado; se usará SQLite como formato de salida.")
+            return 'sqlite'
+    return output_format
+
+
+def journal_path(output_path: str) -> str:
+    """Archivo SQLite donde se van guardando los resultados perfil a perfil."""
+    return f"{output_path}.journal.sqlite"
+
+
+def open_store(path: str) -> ProfileStore:
+    """Devuelve el backend adecuado según la extensión del archivo."""
+    extension = os.path.splitext(path)[1].lower()
+    store_class = _STORES_BY_EXTENSION.get(extension, CsvStore)
+    return store_class(path)
+
+
+def export_xlsx(source: ProfileStore, xlsx_path: str):
+    """Exporta un almacén a XLSX como paso de reporte opcional (el estado con su nombre)."""
+    df = source.read()
+    df['estado'] = df['estado'].map(lambda code: ProfileStatus(code).name)
+    df.to_excel(xlsx_path, index=False, engine='openpyxl')
+    print(f"📄 Reporte XLSX exportado en: **{xlsx_path}**")